@@ -4,10 +4,18 @@
 
 """
 
-from clowder.util.app import App, BoolArgument
+from pathlib import Path
+
+from clowder.util.app import App, BoolArgument, SingleArgument
 
 import clowder.cli as cli
 from clowder.log import LOG
+from clowder.util.connectivity import CONNECTIVITY
+from clowder.util.git.cache import GIT_CACHE
+from clowder.util.git.log import GIT_LOG
+from clowder.util.git.remote_refs import REMOTE_REFS
+from clowder.util.profiler import COMMAND_PROFILER
+from clowder.util.tasks import TASK_DURATIONS
 
 
 class ClowderApp(App):
@@ -15,7 +23,11 @@ class ClowderApp(App):
         name = 'clowder-repo'
         entry_point = 'clowder'
         args = [
-            BoolArgument('--debug', '-d', help='print debug output')
+            BoolArgument('--debug', '-d', help='print debug output'),
+            BoolArgument('--offline', help='skip connectivity checks and fail commands that require network access'),
+            BoolArgument('--profile-git', help='print report of spawned git commands at exit'),
+            SingleArgument('--profile-git-json', metavar='<file>', default=None,
+                           help='write records of spawned git commands to json file at exit')
         ]
         subcommands = [
             cli.BranchCommand,
@@ -43,6 +55,39 @@ class ClowderApp(App):
                 self.parsed_args.projects = [self.parsed_args.projects]
         if self.parsed_args.debug:
             LOG.level = LOG.DEBUG
+            GIT_LOG.level = GIT_LOG.DEBUG
+        if self.parsed_args.offline:
+            CONNECTIVITY.offline = True
+        if self.parsed_args.profile_git or self.parsed_args.profile_git_json is not None:
+            COMMAND_PROFILER.enabled = True
+
+    def main(self) -> None:
+        # Git reads are memoized for the lifetime of the command and dropped by mutating git calls
+        GIT_CACHE.enabled = True
+        try:
+            super().main()
+        finally:
+            GIT_CACHE.enabled = False
+            GIT_CACHE.invalidate()
+            GIT_CACHE.report()
+            REMOTE_REFS.save()
+            REMOTE_REFS.report()
+            if not CONNECTIVITY.offline:
+                CONNECTIVITY.save()
+            TASK_DURATIONS.save()
+            if COMMAND_PROFILER.enabled:
+                self._report_profile()
+
+    def _report_profile(self) -> None:
+        from clowder.environment import ENVIRONMENT
+        from clowder.util.git.worker import GIT_WORKERS
+
+        # Close workers so their processes are included in the report
+        GIT_WORKERS.close()
+        if self.parsed_args.profile_git:
+            COMMAND_PROFILER.report(root=ENVIRONMENT.clowder_dir)
+        if self.parsed_args.profile_git_json is not None:
+            COMMAND_PROFILER.write_json(Path(self.parsed_args.profile_git_json[0]))
 
 
 def main() -> None:
@@ -5,8 +5,8 @@
 """
 
 from clowder.util.app import BoolArgument, MutuallyExclusiveArgumentGroup, Subcommand
-from clowder.util.console import CONSOLE
 
+import clowder.util.parallel as parallel
 from clowder.controller import (
     CLOWDER_CONTROLLER,
     print_clowder_name,
@@ -15,7 +15,7 @@ from clowder.controller import (
 )
 from clowder.config import Config
 
-from .util import ProjectsArgument
+from .util import command_jobs, JobsArgument, ProjectsArgument
 
 
 class BranchCommand(Subcommand):
@@ -23,7 +23,8 @@ class BranchCommand(Subcommand):
         name = 'branch'
         help = 'Display current branches'
         args = [
-            ProjectsArgument('projects and groups to show branches for')
+            ProjectsArgument('projects and groups to show branches for'),
+            JobsArgument()
         ]
         mutually_exclusive_args = [
             MutuallyExclusiveArgumentGroup(
@@ -51,6 +52,4 @@ class BranchCommand(Subcommand):
         projects = Config().process_projects_arg(args.projects)
         projects = CLOWDER_CONTROLLER.filter_projects(CLOWDER_CONTROLLER.projects, projects)
 
-        for project in projects:
-            CONSOLE.stdout(project.status())
-            project.branch(local=local, remote=remote)
+        parallel.run_projects(projects, command_jobs(args), lambda p: p.branch(local=local, remote=remote))
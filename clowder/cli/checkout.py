@@ -5,8 +5,8 @@
 """
 
 from clowder.util.app import SingleArgument, Subcommand
-from clowder.util.console import CONSOLE
 
+import clowder.util.parallel as parallel
 from clowder.controller import (
     CLOWDER_CONTROLLER,
     print_clowder_name,
@@ -15,7 +15,7 @@ from clowder.controller import (
 )
 from clowder.config import Config
 
-from .util import ProjectsArgument
+from .util import command_jobs, JobsArgument, ProjectsArgument
 
 
 class CheckoutCommand(Subcommand):
@@ -24,7 +24,8 @@ class CheckoutCommand(Subcommand):
         help = 'Checkout local branch in projects'
         args = [
             SingleArgument('branch', help='branch to checkout'),
-            ProjectsArgument('projects and groups to checkout branches for')
+            ProjectsArgument('projects and groups to checkout branches for'),
+            JobsArgument()
         ]
 
     @valid_clowder_yaml_required
@@ -34,6 +35,5 @@ class CheckoutCommand(Subcommand):
         projects = Config().process_projects_arg(args.projects)
         projects = CLOWDER_CONTROLLER.filter_projects(CLOWDER_CONTROLLER.projects, projects)
 
-        for project in projects:
-            CONSOLE.stdout(project.status())
-            project.checkout(args.branch[0])
+        branch = args.branch[0]
+        parallel.run_projects(projects, command_jobs(args), lambda p: p.checkout(branch))
@@ -5,8 +5,8 @@
 """
 
 from clowder.util.app import ArgumentGroup, BoolArgument, Subcommand
-from clowder.util.console import CONSOLE
 
+import clowder.util.parallel as parallel
 from clowder.controller import (
     CLOWDER_CONTROLLER,
     print_clowder_name,
@@ -15,7 +15,7 @@ from clowder.controller import (
 )
 from clowder.config import Config
 
-from .util import ProjectsArgument
+from .util import command_jobs, JobsArgument, ProjectsArgument
 
 
 class CleanCommand(Subcommand):
@@ -24,7 +24,8 @@ class CleanCommand(Subcommand):
         help = 'Discard current changes in projects'
         args = [
             ProjectsArgument('projects and groups to clean'),
-            BoolArgument('--recursive', '-r', help='clean submodules recursively')
+            BoolArgument('--recursive', '-r', help='clean submodules recursively'),
+            JobsArgument()
         ]
         argument_groups = [
             ArgumentGroup(
@@ -47,17 +48,15 @@ class CleanCommand(Subcommand):
         projects = Config().process_projects_arg(args.projects)
         projects = CLOWDER_CONTROLLER.filter_projects(CLOWDER_CONTROLLER.projects, projects)
 
+        jobs = command_jobs(args)
+
         if args.all:
-            for project in projects:
-                CONSOLE.stdout(project.status())
-                # FIXME: Make sure this behaves as expected
-                project.repo.groom()
+            # FIXME: Make sure this behaves as expected
+            parallel.run_projects(projects, jobs, lambda p: p.repo.groom())
             return
 
-        for project in projects:
-            CONSOLE.stdout(project.status())
-            project.clean(untracked_directories=args.untracked_directories,
-                          force=args.force,
-                          ignored=args.ignored,
-                          untracked_files=args.untracked_files,
-                          submodules=args.submodules)
+        parallel.run_projects(projects, jobs, lambda p: p.clean(untracked_directories=args.untracked_directories,
+                                                                force=args.force,
+                                                                ignored=args.ignored,
+                                                                untracked_files=args.untracked_files,
+                                                                submodules=args.submodules))
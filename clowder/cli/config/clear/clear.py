@@ -17,6 +17,11 @@ from .jobs import ConfigClearJobsCommand
 from .projects import ConfigClearProjectsCommand
 from .protocol import ConfigClearProtocolCommand
 from .rebase import ConfigClearRebaseCommand
+from .remote_cache_ttl import ConfigClearRemoteCacheTtlCommand
+from .source_jobs import ConfigClearSourceJobsCommand
+from .source_rate import ConfigClearSourceRateCommand
+from .stage_stall import ConfigClearStageStallCommand
+from .stage_timeout import ConfigClearStageTimeoutCommand
 
 
 class ConfigClearCommand(Subcommand):
@@ -27,7 +32,12 @@ class ConfigClearCommand(Subcommand):
             ConfigClearJobsCommand,
             ConfigClearProjectsCommand,
             ConfigClearProtocolCommand,
-            ConfigClearRebaseCommand
+            ConfigClearRebaseCommand,
+            ConfigClearRemoteCacheTtlCommand,
+            ConfigClearSourceJobsCommand,
+            ConfigClearSourceRateCommand,
+            ConfigClearStageStallCommand,
+            ConfigClearStageTimeoutCommand
         ]
 
     @valid_clowder_yaml_required
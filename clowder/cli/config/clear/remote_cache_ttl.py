@@ -0,0 +1,29 @@
+"""Clowder command line config controller
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from clowder.util.app import Subcommand
+from clowder.util.console import CONSOLE
+
+from clowder.controller import (
+    print_clowder_name,
+    valid_clowder_yaml_required
+)
+from clowder.config import Config, print_config
+
+
+class ConfigClearRemoteCacheTtlCommand(Subcommand):
+    class Meta:
+        name = 'remote-cache-ttl'
+        help = 'Clear remote cache ttl'
+
+    @valid_clowder_yaml_required
+    @print_clowder_name
+    @print_config
+    def run(self, args) -> None:
+        CONSOLE.stdout(' - Clear remote cache ttl config value')
+        config = Config()
+        config.remote_cache_ttl = None
+        config.save()
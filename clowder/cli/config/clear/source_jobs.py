@@ -0,0 +1,32 @@
+"""Clowder command line config controller
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from clowder.util.app import SingleArgument, Subcommand
+from clowder.util.console import CONSOLE
+
+from clowder.controller import (
+    print_clowder_name,
+    valid_clowder_yaml_required
+)
+from clowder.config import Config, print_config
+
+
+class ConfigClearSourceJobsCommand(Subcommand):
+    class Meta:
+        name = 'source-jobs'
+        help = 'Clear source jobs'
+        args = [
+            SingleArgument('source', help='source name')
+        ]
+
+    @valid_clowder_yaml_required
+    @print_clowder_name
+    @print_config
+    def run(self, args) -> None:
+        CONSOLE.stdout(f' - Clear source jobs config value for {args.source[0]}')
+        config = Config()
+        config.set_source_jobs(args.source[0], None)
+        config.save()
@@ -0,0 +1,32 @@
+"""Clowder command line config controller
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from clowder.util.app import SingleArgument, Subcommand
+from clowder.util.console import CONSOLE
+
+from clowder.controller import (
+    print_clowder_name,
+    valid_clowder_yaml_required
+)
+from clowder.config import Config, print_config
+
+
+class ConfigClearSourceRateCommand(Subcommand):
+    class Meta:
+        name = 'source-rate'
+        help = 'Clear source rate'
+        args = [
+            SingleArgument('source', help='source name')
+        ]
+
+    @valid_clowder_yaml_required
+    @print_clowder_name
+    @print_config
+    def run(self, args) -> None:
+        CONSOLE.stdout(f' - Clear source rate config value for {args.source[0]}')
+        config = Config()
+        config.set_source_rate(args.source[0], None)
+        config.save()
@@ -0,0 +1,33 @@
+"""Clowder command line config controller
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from clowder.util.app import SingleArgument, Subcommand
+from clowder.util.console import CONSOLE
+
+from clowder.controller import (
+    print_clowder_name,
+    valid_clowder_yaml_required
+)
+from clowder.config import Config, print_config, STAGES
+
+
+class ConfigClearStageTimeoutCommand(Subcommand):
+    class Meta:
+        name = 'stage-timeout'
+        help = 'Clear stage timeout'
+        args = [
+            SingleArgument('stage', choices=STAGES, help='stage name')
+        ]
+
+    @valid_clowder_yaml_required
+    @print_clowder_name
+    @print_config
+    def run(self, args) -> None:
+        stage = args.stage[0]
+        CONSOLE.stdout(f' - Clear stage timeout config value for {stage}')
+        config = Config()
+        config.set_stage_timeout(stage, None)
+        config.save()
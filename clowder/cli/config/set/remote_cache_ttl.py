@@ -0,0 +1,32 @@
+"""Clowder command line config controller
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from clowder.util.app import CountArgument, Subcommand
+from clowder.util.console import CONSOLE
+
+from clowder.controller import (
+    print_clowder_name,
+    valid_clowder_yaml_required
+)
+from clowder.config import Config, print_config
+
+
+class ConfigSetRemoteCacheTtlCommand(Subcommand):
+    class Meta:
+        name = 'remote-cache-ttl'
+        help = 'Set seconds cached remote branches and tags are used for'
+        args = [
+            CountArgument('seconds', help='seconds cached remote refs are used for, 0 to disable the cache file')
+        ]
+
+    @valid_clowder_yaml_required
+    @print_clowder_name
+    @print_config
+    def run(self, args) -> None:
+        CONSOLE.stdout(' - Set remote cache ttl config value')
+        config = Config()
+        config.remote_cache_ttl = args.seconds[0]
+        config.save()
@@ -10,6 +10,11 @@ from .jobs import ConfigSetJobsCommand
 from .projects import ConfigSetProjectsCommand
 from .protocol import ConfigSetProtocolCommand
 from .rebase import ConfigSetRebaseCommand
+from .remote_cache_ttl import ConfigSetRemoteCacheTtlCommand
+from .source_jobs import ConfigSetSourceJobsCommand
+from .source_rate import ConfigSetSourceRateCommand
+from .stage_stall import ConfigSetStageStallCommand
+from .stage_timeout import ConfigSetStageTimeoutCommand
 
 
 class ConfigSetCommand(Subcommand):
@@ -20,7 +25,12 @@ class ConfigSetCommand(Subcommand):
             ConfigSetJobsCommand,
             ConfigSetRebaseCommand,
             ConfigSetProjectsCommand,
-            ConfigSetProtocolCommand
+            ConfigSetProtocolCommand,
+            ConfigSetRemoteCacheTtlCommand,
+            ConfigSetSourceJobsCommand,
+            ConfigSetSourceRateCommand,
+            ConfigSetStageStallCommand,
+            ConfigSetStageTimeoutCommand
         ]
 
     def run(self, args) -> None:
@@ -0,0 +1,35 @@
+"""Clowder command line config controller
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from clowder.util.app import CountArgument, SingleArgument, Subcommand
+from clowder.util.console import CONSOLE
+
+from clowder.controller import (
+    SOURCE_CONTROLLER,
+    print_clowder_name,
+    valid_clowder_yaml_required
+)
+from clowder.config import Config, print_config
+
+
+class ConfigSetSourceJobsCommand(Subcommand):
+    class Meta:
+        name = 'source-jobs'
+        help = 'Set max concurrent network git commands for source host'
+        args = [
+            SingleArgument('source', help='source name'),
+            CountArgument('jobs', help='max concurrent network git commands for source host')
+        ]
+
+    @valid_clowder_yaml_required
+    @print_clowder_name
+    @print_config
+    def run(self, args) -> None:
+        source = SOURCE_CONTROLLER.get_source(args.source[0])
+        CONSOLE.stdout(f' - Set source jobs config value for {source.name}')
+        config = Config()
+        config.set_source_jobs(source.name, args.jobs[0])
+        config.save()
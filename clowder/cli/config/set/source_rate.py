@@ -0,0 +1,35 @@
+"""Clowder command line config controller
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from clowder.util.app import SingleArgument, Subcommand
+from clowder.util.console import CONSOLE
+
+from clowder.controller import (
+    SOURCE_CONTROLLER,
+    print_clowder_name,
+    valid_clowder_yaml_required
+)
+from clowder.config import Config, print_config
+
+
+class ConfigSetSourceRateCommand(Subcommand):
+    class Meta:
+        name = 'source-rate'
+        help = 'Set max network git commands started per second for source host'
+        args = [
+            SingleArgument('source', help='source name'),
+            SingleArgument('rate', type=float, help='max network git commands started per second for source host')
+        ]
+
+    @valid_clowder_yaml_required
+    @print_clowder_name
+    @print_config
+    def run(self, args) -> None:
+        source = SOURCE_CONTROLLER.get_source(args.source[0])
+        CONSOLE.stdout(f' - Set source rate config value for {source.name}')
+        config = Config()
+        config.set_source_rate(source.name, args.rate[0])
+        config.save()
@@ -0,0 +1,34 @@
+"""Clowder command line config controller
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from clowder.util.app import SingleArgument, Subcommand
+from clowder.util.console import CONSOLE
+
+from clowder.controller import (
+    print_clowder_name,
+    valid_clowder_yaml_required
+)
+from clowder.config import Config, print_config, STAGES
+
+
+class ConfigSetStageStallCommand(Subcommand):
+    class Meta:
+        name = 'stage-stall'
+        help = 'Set max seconds a command of parallel command stage may run without printing output'
+        args = [
+            SingleArgument('stage', choices=STAGES, help='stage name'),
+            SingleArgument('stall', type=float, help='max seconds a command of stage may run without printing output')
+        ]
+
+    @valid_clowder_yaml_required
+    @print_clowder_name
+    @print_config
+    def run(self, args) -> None:
+        stage = args.stage[0]
+        CONSOLE.stdout(f' - Set stage stall config value for {stage}')
+        config = Config()
+        config.set_stage_stall(stage, args.stall[0])
+        config.save()
@@ -5,8 +5,8 @@
 """
 
 from clowder.util.app import Subcommand
-from clowder.util.console import CONSOLE
 
+import clowder.util.parallel as parallel
 from clowder.controller import (
     CLOWDER_CONTROLLER,
     print_clowder_name,
@@ -15,7 +15,7 @@ from clowder.controller import (
 )
 from clowder.config import Config
 
-from .util import ProjectsArgument
+from .util import command_jobs, JobsArgument, ProjectsArgument
 
 
 class DiffCommand(Subcommand):
@@ -23,7 +23,8 @@ class DiffCommand(Subcommand):
         name = 'diff'
         help = 'Show git diff for projects'
         args = [
-            ProjectsArgument('projects and groups to show diff for')
+            ProjectsArgument('projects and groups to show diff for'),
+            JobsArgument()
         ]
 
     @valid_clowder_yaml_required
@@ -33,6 +34,4 @@ class DiffCommand(Subcommand):
         projects = Config().process_projects_arg(args.projects)
         projects = CLOWDER_CONTROLLER.filter_projects(CLOWDER_CONTROLLER.projects, projects)
 
-        for project in projects:
-            CONSOLE.stdout(project.status())
-            project.diff()
+        parallel.run_projects(projects, command_jobs(args), lambda p: p.diff())
@@ -19,7 +19,7 @@ from clowder.controller import (
 from clowder.config import Config
 from clowder.util.error import CommandArgumentError
 
-from .util import JobsArgument, ProjectsArgument
+from .util import JobsArgument, KeepGoingArgument, parallel_jobs, ProjectsArgument
 
 
 class ForallCommand(Subcommand):
@@ -30,7 +30,8 @@ class ForallCommand(Subcommand):
             SingleArgument('command', default=None,  help='command to run in project directories'),
             ProjectsArgument('projects and groups to run command for'),
             BoolArgument('--ignore-errors', '-i', help='ignore errors in command or script'),
-            JobsArgument()
+            JobsArgument(),
+            KeepGoingArgument()
         ]
 
     @valid_clowder_yaml_required
@@ -52,10 +53,12 @@ class ForallCommand(Subcommand):
 
         check = not args.ignore_errors
 
-        if jobs is not None and jobs != 1 and os.name == "posix":
-            if jobs <= 0:
-                jobs = 4
-            parallel.forall(projects, jobs, command, check)
+        jobs = parallel_jobs(jobs)
+        if args.keep_going and jobs is None:
+            # Run in a pool of one job, so failures are collected instead of stopping the command
+            jobs = 1
+        if jobs is not None and os.name == "posix":
+            parallel.forall(projects, jobs, command, check, keep_going=args.keep_going)
             return
 
         for project in projects:
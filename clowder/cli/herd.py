@@ -6,7 +6,14 @@
 
 import os
 
-from clowder.util.app import Argument, BoolArgument, MutuallyExclusiveArgumentGroup, SingleArgument, Subcommand
+from clowder.util.app import (
+    Argument,
+    BoolArgument,
+    CountArgument,
+    MutuallyExclusiveArgumentGroup,
+    SingleArgument,
+    Subcommand
+)
 from clowder.util.connectivity import network_connection_required
 from clowder.util.git import Protocol
 
@@ -20,7 +27,7 @@ from clowder.controller import (
 )
 from clowder.config import Config
 
-from .util import CountArgument, JobsArgument, ProjectsArgument
+from .util import JobsArgument, KeepGoingArgument, parallel_jobs, ProjectsArgument
 
 
 class HerdCommand(Subcommand):
@@ -30,6 +37,7 @@ class HerdCommand(Subcommand):
         args = [
             ProjectsArgument('projects and groups to herd'),
             JobsArgument(),
+            KeepGoingArgument(),
             BoolArgument('--rebase', '-r', help='use rebase instead of pull'),
             CountArgument('--depth', '-d', help='depth to herd'),
             SingleArgument('--protocol', '-p', default=None, choices=('ssh', 'https'),
@@ -73,10 +81,12 @@ class HerdCommand(Subcommand):
         projects = config.process_projects_arg(args.projects)
         projects = CLOWDER_CONTROLLER.filter_projects(CLOWDER_CONTROLLER.projects, projects, exclude=exclude)
 
-        if jobs is not None and jobs != 1 and os.name == "posix":
-            if jobs <= 0:
-                jobs = 4
-            parallel.herd(projects, jobs, branch, tag, depth, rebase)
+        jobs = parallel_jobs(jobs)
+        if args.keep_going and jobs is None:
+            # Run with a single network slot, so failures are collected instead of stopping the command
+            jobs = 1
+        if jobs is not None and os.name == "posix":
+            parallel.herd(projects, jobs, branch, tag, depth, rebase, keep_going=args.keep_going)
             return
 
         CLOWDER_CONTROLLER.validate_projects_state(projects)
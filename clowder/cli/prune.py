@@ -4,12 +4,14 @@
 
 """
 
-from typing import List
+from typing import List, Optional
 
 from clowder.util.app import Argument, BoolArgument, MutuallyExclusiveArgumentGroup, Subcommand
 from clowder.util.connectivity import network_connection_required
 from clowder.util.console import CONSOLE
+from clowder.util.tasks import Jobs
 
+import clowder.util.parallel as parallel
 from clowder.controller import (
     CLOWDER_CONTROLLER,
     print_clowder_name,
@@ -19,7 +21,7 @@ from clowder.controller import (
 from clowder.config import Config
 from clowder.util.error import CommandArgumentError
 
-from .util import ProjectsArgument
+from .util import command_jobs, JobsArgument, ProjectsArgument
 
 
 class PruneCommand(Subcommand):
@@ -29,7 +31,8 @@ class PruneCommand(Subcommand):
         args = [
             Argument('branch', help='name of branch to remove'),
             ProjectsArgument('projects and groups to prune'),
-            BoolArgument('--force', '-f', help='force prune branches')
+            BoolArgument('--force', '-f', help='force prune branches'),
+            JobsArgument()
         ]
         mutually_exclusive_args = [
             MutuallyExclusiveArgumentGroup(
@@ -52,23 +55,24 @@ class PruneCommand(Subcommand):
             self._prune_remote(args)
             return
 
-        self._prune_impl(args.projects, args.branch, force=args.force, local=True)
+        self._prune_impl(args.projects, args.branch, force=args.force, local=True, jobs=command_jobs(args))
 
     @network_connection_required
     def _prune_all(self, args) -> None:
         """clowder prune all command"""
 
-        self._prune_impl(args.projects, args.branch, force=args.force, local=True, remote=True)
+        self._prune_impl(args.projects, args.branch, force=args.force, local=True, remote=True,
+                         jobs=command_jobs(args))
 
     @network_connection_required
     def _prune_remote(self, args) -> None:
         """clowder prune remote command"""
 
-        self._prune_impl(args.projects, args.branch, remote=True)
+        self._prune_impl(args.projects, args.branch, remote=True, jobs=command_jobs(args))
 
     @staticmethod
     def _prune_impl(project_names: List[str], branch: str, force: bool = False,
-                    local: bool = False, remote: bool = False) -> None:
+                    local: bool = False, remote: bool = False, jobs: Optional[Jobs] = None) -> None:
         """Prune branches
 
         :param List[str] project_names: Project names to prune
@@ -76,6 +80,7 @@ class PruneCommand(Subcommand):
         :param bool force: Force delete branch
         :param bool local: Delete local branch
         :param bool remote: Delete remote branch
+        :param Optional[Jobs] jobs: Number of jobs to use pruning branches in parallel, or None to prune serially
         """
 
         projects = Config().process_projects_arg(project_names)
@@ -105,6 +110,4 @@ class PruneCommand(Subcommand):
         else:
             raise CommandArgumentError('local and remote are both false, but at least one should be true')
 
-        for project in projects:
-            CONSOLE.stdout(project.status())
-            project.prune(branch, force=force, local=local, remote=remote)
+        parallel.run_projects(projects, jobs, lambda p: p.prune(branch, force=force, local=local, remote=remote))
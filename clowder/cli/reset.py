@@ -19,7 +19,7 @@ from clowder.controller import (
 )
 from clowder.config import Config
 
-from .util import JobsArgument, ProjectsArgument
+from .util import JobsArgument, KeepGoingArgument, parallel_jobs, ProjectsArgument
 
 
 class ResetCommand(Subcommand):
@@ -28,7 +28,8 @@ class ResetCommand(Subcommand):
         help = 'Reset branches to upstream commits or check out detached HEADs for tags and shas'
         args = [
             ProjectsArgument('projects and groups to reset'),
-            JobsArgument()
+            JobsArgument(),
+            KeepGoingArgument()
             # SingleArgument('--timestamp', '-t', choices=CLOWDER_CONTROLLER.project_names,
             # default=None, help='project to reset timestamps relative to')
         ]
@@ -57,10 +58,12 @@ class ResetCommand(Subcommand):
         projects = config.process_projects_arg(args.projects)
         projects = CLOWDER_CONTROLLER.filter_projects(CLOWDER_CONTROLLER.projects, projects)
 
-        if jobs is not None and jobs != 1 and os.name == "posix":
-            if jobs <= 0:
-                jobs = 4
-            parallel.reset(projects, jobs, timestamp_project)
+        jobs = parallel_jobs(jobs)
+        if args.keep_going and jobs is None:
+            # Run in a pool of one job, so failures are collected instead of stopping the command
+            jobs = 1
+        if jobs is not None and os.name == "posix":
+            parallel.reset(projects, jobs, timestamp_project, keep_going=args.keep_going)
             return
 
         CLOWDER_CONTROLLER.validate_projects_state(projects)
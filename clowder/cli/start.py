@@ -6,8 +6,8 @@
 
 from clowder.util.app import BoolArgument, SingleArgument, Subcommand
 from clowder.util.connectivity import network_connection_required
-from clowder.util.console import CONSOLE
 
+import clowder.util.parallel as parallel
 from clowder.controller import (
     CLOWDER_CONTROLLER,
     print_clowder_name,
@@ -16,7 +16,7 @@ from clowder.controller import (
 )
 from clowder.config import Config
 
-from .util import ProjectsArgument
+from .util import command_jobs, JobsArgument, ProjectsArgument
 
 
 class StartCommand(Subcommand):
@@ -26,7 +26,8 @@ class StartCommand(Subcommand):
         args = [
             SingleArgument('branch', help='name of branch to create', default=None),
             ProjectsArgument('projects and groups to start branches for'),
-            BoolArgument('--tracking', '-t', help='create remote tracking branch')
+            BoolArgument('--tracking', '-t', help='create remote tracking branch'),
+            JobsArgument()
         ]
 
     @valid_clowder_yaml_required
@@ -56,6 +57,5 @@ class StartCommand(Subcommand):
         projects = CLOWDER_CONTROLLER.filter_projects(CLOWDER_CONTROLLER.projects, projects)
 
         CLOWDER_CONTROLLER.validate_projects_state(projects)
-        for project in projects:
-            CONSOLE.stdout(project.status())
-            project.start(args.branch[0], tracking)
+        branch = args.branch[0]
+        parallel.run_projects(projects, command_jobs(args), lambda p: p.start(branch, tracking))
@@ -7,6 +7,7 @@
 from clowder.util.app import Subcommand
 from clowder.util.console import CONSOLE
 
+import clowder.util.parallel as parallel
 from clowder.controller import (
     CLOWDER_CONTROLLER,
     print_clowder_name,
@@ -15,7 +16,7 @@ from clowder.controller import (
 )
 from clowder.config import Config
 
-from .util import ProjectsArgument
+from .util import command_jobs, JobsArgument, ProjectsArgument
 
 
 class StashCommand(Subcommand):
@@ -23,7 +24,8 @@ class StashCommand(Subcommand):
         name = 'stash'
         help = 'Stash current changes'
         args = [
-            ProjectsArgument('projects and groups to stash changes for')
+            ProjectsArgument('projects and groups to stash changes for'),
+            JobsArgument()
         ]
 
     @valid_clowder_yaml_required
@@ -37,6 +39,4 @@ class StashCommand(Subcommand):
         projects = Config().process_projects_arg(args.projects)
         projects = CLOWDER_CONTROLLER.filter_projects(CLOWDER_CONTROLLER.projects, projects)
 
-        for project in projects:
-            CONSOLE.stdout(project.status())
-            project.stash()
+        parallel.run_projects(projects, command_jobs(args), lambda p: p.stash())
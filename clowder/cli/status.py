@@ -9,6 +9,8 @@
 from clowder.util.app import BoolArgument, Subcommand
 # from clowder.util.connectivity import network_connection_required
 from clowder.util.console import CONSOLE
+from clowder.util.process_watch import TimeLimitExceededError
+from clowder.util.tasks import print_task_results, TasksFailedError
 
 import clowder.util.formatting as fmt
 import clowder.util.parallel as parallel
@@ -21,7 +23,7 @@ from clowder.controller import (
 from clowder.config import Config
 from clowder.environment import ENVIRONMENT
 
-from .util import ProjectsArgument
+from .util import KeepGoingArgument, ProjectsArgument
 
 
 class StatusCommand(Subcommand):
@@ -30,7 +32,8 @@ class StatusCommand(Subcommand):
         help = 'projects and groups to print status of'
         args = [
             ProjectsArgument('projects and groups to show diff for'),
-            BoolArgument('--fetch', '-f', help='fetch projects before printing status')
+            BoolArgument('--fetch', '-f', help='fetch projects before printing status'),
+            KeepGoingArgument()
         ]
 
     @valid_clowder_yaml_required
@@ -39,16 +42,25 @@ class StatusCommand(Subcommand):
         projects = CLOWDER_CONTROLLER.filter_projects(CLOWDER_CONTROLLER.projects, projects)
 
         CONSOLE.enqueue_stdout(fmt.clowder_name(CLOWDER_CONTROLLER.name), newline=True)
+        fetch_results = None
         if args.fetch:
             clowder_repo = None
             if ENVIRONMENT.clowder_git_repo_dir is not None:
                 clowder_repo = ClowderRepo(ENVIRONMENT.clowder_git_repo_dir)
-            parallel.fetch(projects, clowder_repo)
+            fetch_results = parallel.fetch(projects, clowder_repo, keep_going=args.keep_going)
         if ENVIRONMENT.clowder_repo_dir is not None:
             CONSOLE.enqueue_stdout(ClowderRepo(ENVIRONMENT.clowder_repo_dir).status)
 
         project_names = CLOWDER_CONTROLLER.get_formatted_project_names(projects)
         padding = len(max(project_names, key=len))
 
-        CONSOLE.enqueue_stdout(parallel.status(projects, padding))
+        # Header is printed first, then project status is printed line by line as it's ready
         CONSOLE.flush_stdout()
+        parallel.status(projects, padding, lambda status: CONSOLE.stdout(status, force=True))
+
+        # Status of all projects is printed even if some failed to fetch
+        timed_out = any([isinstance(r.error, TimeLimitExceededError) for r in fetch_results or []])
+        if (args.keep_going or timed_out) and fetch_results:
+            print_task_results(fetch_results)
+            if any([not r.succeeded for r in fetch_results]):
+                raise TasksFailedError(fetch_results)
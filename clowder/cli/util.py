@@ -4,20 +4,103 @@
 
 """
 
-from clowder.util.app import Argument, CountArgument
+from argparse import Action, ArgumentTypeError
+from typing import Optional, Tuple
+
+from clowder.util.app import Argument, BoolArgument, SingleArgument
+from clowder.util.tasks import AUTO_JOBS, Jobs
 
 import clowder.util.formatting as fmt
+from clowder.config import Config
 from clowder.controller import CLOWDER_CONTROLLER
 
 
-class JobsArgument(CountArgument):
+def jobs_value(value: str) -> Jobs:
+    """Parse jobs argument
+
+    :param str value: Number of jobs, or auto
+    :return: Number of jobs, or auto
+    :raise ArgumentTypeError:
+    """
+
+    if value == AUTO_JOBS:
+        return AUTO_JOBS
+    try:
+        return int(value)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid jobs value: '{value}', must be an integer or '{AUTO_JOBS}'")
+
+
+def parallel_jobs(jobs: Optional[Jobs]) -> Optional[Jobs]:
+    """Get jobs to run command in parallel with
+
+    :param Optional[Jobs] jobs: Jobs from args or config
+    :return: Number of jobs, auto for values of 0 or less, or None to run serially
+    """
+
+    if jobs is None or jobs == 1:
+        return None
+    if jobs == AUTO_JOBS or jobs <= 0:
+        return AUTO_JOBS
+    return jobs
+
+
+def command_jobs(args) -> Optional[Jobs]:
+    """Get jobs to run command in parallel with from jobs argument and config
+
+    :return: Number of jobs, auto, or None to run serially
+    """
+
+    jobs = None if args.jobs is None else args.jobs[0]
+    jobs_config = Config().jobs
+    jobs = jobs_config if jobs_config is not None else jobs
+    return parallel_jobs(jobs)
+
+
+class JobsArgument(SingleArgument):
 
     def __init__(self, positional: bool = False, *args, **kwargs):
         if positional:
             command_args = ['jobs']
         else:
             command_args = ['--jobs', '-j']
-        super().__init__(*command_args, *args, help='number of jobs to use running command in parallel', **kwargs)
+        super().__init__(*command_args, *args, metavar=f'<n|{AUTO_JOBS}>', default=None, type=jobs_value,
+                         help=f"number of jobs to use running command in parallel, or '{AUTO_JOBS}' to tune "
+                              f"the number of jobs while running", **kwargs)
+
+
+class KeepGoingArgument(BoolArgument):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__('--keep-going', '-k', *args,
+                         help='keep going after a project fails and print a summary of results', **kwargs)
+
+
+class ProjectsAction(Action):
+    """Store projects argument, reading project choices and help from the clowder yaml only when they're used
+
+    Parsers for every command are created on startup, so reading them eagerly would load the workspace for help
+    output and tab completion of other commands
+    """
+
+    @property
+    def choices(self) -> Tuple[str, ...]:
+        return CLOWDER_CONTROLLER.project_choices_with_default
+
+    @choices.setter
+    def choices(self, _) -> None:
+        pass
+
+    @property
+    def help(self) -> str:
+        return fmt.project_options_help_message(self._help_msg)
+
+    @help.setter
+    def help(self, help_msg: str) -> None:
+        self._help_msg: str = help_msg
+
+    def __call__(self, parser, namespace, values, option_string=None) -> None:
+        setattr(namespace, self.dest, values)
 
 
 class ProjectsArgument(Argument):
@@ -26,9 +109,9 @@ class ProjectsArgument(Argument):
         args = ['projects'] + list(args)
         kwargs = dict(
             kwargs,
+            action=ProjectsAction,
             metavar='<project|group>',
-            choices=CLOWDER_CONTROLLER.project_choices_with_default,
-            help=fmt.project_options_help_message(help_msg)
+            help=help_msg
         )
         if requires_arg:
             super().__init__(*args, nargs='+', **kwargs)
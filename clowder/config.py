@@ -7,13 +7,15 @@
 from configparser import ConfigParser
 from enum import auto, unique
 from functools import wraps
-from typing import Any, List, Optional, Tuple
+from typing import Any, List, Optional, Tuple, Union
 
 import clowder.util.filesystem as fs
 from clowder.util.console import CONSOLE
 from clowder.util.enum import AutoLowerName
 from clowder.util.format import Format
 from clowder.util.git import Protocol
+from clowder.util.process_watch import TimeLimits
+from clowder.util.tasks import AUTO_JOBS, Jobs
 
 import clowder.util.formatting as fmt
 from clowder.environment import ENVIRONMENT
@@ -48,12 +50,37 @@ class GitConfigType(AutoLowerName):
     FETCH = auto()
     PROTOCOL = auto()
     REBASE = auto()
+    REMOTE_CACHE_TTL = auto()
 
     @classmethod
     def section_name(cls) -> str:
         return 'git'
 
 
+@unique
+class StageConfigType(AutoLowerName):
+    TIMEOUT = auto()
+    STALL = auto()
+
+    @staticmethod
+    def section_name(stage: str) -> str:
+        return f'stage.{stage}'
+
+
+STAGES: Tuple[str, ...] = ('network', 'local', 'lfs', 'submodules')
+"""Stages of parallel commands that time limits can be configured for"""
+
+
+@unique
+class SourceConfigType(AutoLowerName):
+    JOBS = auto()
+    RATE = auto()
+
+    @staticmethod
+    def section_name(source: str) -> str:
+        return f'source.{source}'
+
+
 class Config:
     """Config class
 
@@ -61,7 +88,8 @@ class Config:
     :ivar Optional[Tuple[str, ...]] projects: Default projects
     :ivar Optional[GitProtocol] protocol: Default protocol
     :ivar Optional[bool] rebase: Default rebase
-    :ivar Optional[int] jobs: Default number of jobs
+    :ivar Optional[Jobs] jobs: Default number of jobs, or auto
+    :ivar Optional[int] remote_cache_ttl: Seconds cached remote refs are used for
     """
 
     def __init__(self):
@@ -93,12 +121,14 @@ class Config:
         #     self.jobs: Optional[int] = defaults.get('jobs', None)
 
     @property
-    def jobs(self) -> Optional[int]:
+    def jobs(self) -> Optional[Jobs]:
         jobs = str(CommandConfigType.JOBS.value)
+        if self._command_config.get(jobs) == AUTO_JOBS:
+            return AUTO_JOBS
         return self._command_config.getint(jobs)
 
     @jobs.setter
-    def jobs(self, jobs: Optional[int]):
+    def jobs(self, jobs: Optional[Jobs]):
         self._set_command_option(CommandConfigType.JOBS, jobs)
 
     @property
@@ -137,6 +167,15 @@ class Config:
     def rebase(self, rebase: Optional[bool]):
         self._set_git_option(GitConfigType.REBASE, rebase)
 
+    @property
+    def remote_cache_ttl(self) -> Optional[int]:
+        remote_cache_ttl = str(GitConfigType.REMOTE_CACHE_TTL.value)
+        return self._git_config.getint(remote_cache_ttl)
+
+    @remote_cache_ttl.setter
+    def remote_cache_ttl(self, remote_cache_ttl: Optional[int]):
+        self._set_git_option(GitConfigType.REMOTE_CACHE_TTL, remote_cache_ttl)
+
     @staticmethod
     def clear() -> None:
         """Clear all config settings"""
@@ -183,6 +222,76 @@ class Config:
         with open(ENVIRONMENT.clowder_config, 'w') as configfile:
             self._config.write(configfile)
 
+    def source_jobs(self, source: str) -> Optional[int]:
+        """Max concurrent network git commands for source host
+
+        :param str source: Source name
+        :return: Configured jobs, or None if not set
+        """
+
+        section = SourceConfigType.section_name(source)
+        if section not in self._config:
+            return None
+        return self._config[section].getint(str(SourceConfigType.JOBS.value))
+
+    def set_source_jobs(self, source: str, jobs: Optional[int]) -> None:
+        self._set_source_option(source, SourceConfigType.JOBS, jobs)
+
+    def source_rate(self, source: str) -> Optional[float]:
+        """Max network git commands started per second for source host
+
+        :param str source: Source name
+        :return: Configured rate, or None if not set
+        """
+
+        section = SourceConfigType.section_name(source)
+        if section not in self._config:
+            return None
+        return self._config[section].getfloat(str(SourceConfigType.RATE.value))
+
+    def set_source_rate(self, source: str, rate: Optional[float]) -> None:
+        self._set_source_option(source, SourceConfigType.RATE, rate)
+
+    def stage_timeout(self, stage: str) -> Optional[float]:
+        """Max seconds a step of stage may run for
+
+        :param str stage: Stage name
+        :return: Configured timeout, or None if not set
+        """
+
+        return self._get_stage_option(stage, StageConfigType.TIMEOUT)
+
+    def set_stage_timeout(self, stage: str, timeout: Optional[float]) -> None:
+        self._set_section_option(StageConfigType.section_name(stage), StageConfigType.TIMEOUT, timeout)
+
+    def stage_stall(self, stage: str) -> Optional[float]:
+        """Max seconds a command of stage may run without printing output
+
+        :param str stage: Stage name
+        :return: Configured stall limit, or None if not set
+        """
+
+        return self._get_stage_option(stage, StageConfigType.STALL)
+
+    def set_stage_stall(self, stage: str, stall: Optional[float]) -> None:
+        self._set_section_option(StageConfigType.section_name(stage), StageConfigType.STALL, stall)
+
+    def stage_time_limits(self, stage: str) -> Optional[TimeLimits]:
+        """Time limits of stage
+
+        :param str stage: Stage name
+        :return: Configured time limits, or None if neither is set
+        """
+
+        time_limits = TimeLimits(timeout=self.stage_timeout(stage), stall=self.stage_stall(stage))
+        return time_limits if time_limits.is_set else None
+
+    def _get_stage_option(self, stage: str, option: StageConfigType) -> Optional[float]:
+        section = StageConfigType.section_name(stage)
+        if section not in self._config:
+            return None
+        return self._config[section].getfloat(str(option.value))
+
     def _set_command_option(self, option: CommandConfigType, value: Optional[Any]) -> None:
         if value is None:
             self._config.remove_option(CommandConfigType.section_name(), option.value)
@@ -195,6 +304,22 @@ class Config:
         else:
             self._git_config[option.value] = str(value)
 
+    def _set_source_option(self, source: str, option: SourceConfigType, value: Optional[Union[int, float]]) -> None:
+        self._set_section_option(SourceConfigType.section_name(source), option, value)
+
+    def _set_section_option(self, section: str, option: Union[SourceConfigType, StageConfigType],
+                            value: Optional[Union[int, float]]) -> None:
+        if value is None:
+            if section not in self._config:
+                return
+            self._config.remove_option(section, option.value)
+            if not self._config[section]:
+                self._config.remove_section(section)
+            return
+        if section not in self._config:
+            self._config[section] = {}
+        self._config[section][option.value] = str(value)
+
     def _validate_config_projects_defined(self, project_options: Tuple[str, ...]) -> None:
         """Validate all projects were defined in clowder yaml file
 
@@ -4,7 +4,13 @@
 
 """
 
-from .clowder_controller import ClowderController, CLOWDER_CONTROLLER, valid_clowder_yaml_required, print_clowder_name
+from .clowder_controller import (
+    ClowderController,
+    CLOWDER_CONTROLLER,
+    LazyClowderController,
+    valid_clowder_yaml_required,
+    print_clowder_name
+)
 from .clowder_repo import ClowderRepo, print_clowder_repo_status, print_clowder_repo_status_fetch
 from .project_repo import ProjectRepo, project_repo_exists
 from .resolved_git_settings import ResolvedGitSettings
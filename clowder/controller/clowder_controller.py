@@ -4,13 +4,17 @@
 
 """
 
+import os
 from functools import wraps
 from pathlib import Path
-from typing import Iterable, Optional, Tuple
+from threading import Lock
+from typing import Any, Iterable, Optional, Tuple
 
+from clowder.util.connectivity import CONNECTIVITY
 from clowder.util.console import CONSOLE
 from clowder.util.format import Format
-from clowder.util.tasks import Task, TaskPool
+from clowder.util.git import REMOTE_REFS, RepoValidation
+from clowder.util.tasks import Task, TASK_DURATIONS, TaskPool
 from clowder.util.util import sorted_tuple
 from clowder.util.yaml import MissingYamlError, Yaml
 
@@ -94,7 +98,9 @@ class ClowderController:
             if ENVIRONMENT.clowder_yaml is None:
                 raise MissingYamlError(f"{Path('clowder.yml')} appears to be missing")
             yaml = Yaml(ENVIRONMENT.clowder_yaml, schema=ENVIRONMENT.clowder_schema)
-            yaml_file = yaml.validate(relative_to=ENVIRONMENT.clowder_dir)
+            cache_dir = ENVIRONMENT.clowder_cache_dir
+            yaml_cache = None if cache_dir is None else cache_dir / 'clowder-yaml.json'
+            yaml_file = yaml.validate(relative_to=ENVIRONMENT.clowder_dir, cache=yaml_cache)
             self._clowder = ClowderBase(yaml_file)
 
             # Register all sources as we come across them
@@ -119,13 +125,37 @@ class ClowderController:
             # Validate all source names have a defined source with url
             SOURCE_CONTROLLER.validate_sources()
 
+            self._configure_caches()
             self.projects = self._get_project_repos()
+            REMOTE_REFS.save()
             self._update_properties()
         except Exception as err:
             LOG.debug('Failed to init clowder controller')
             self.error = err
             self._initialize_properties()
 
+    @staticmethod
+    def _configure_caches() -> None:
+        """Load ls-remote results, connectivity probes and task durations saved by earlier commands, and limits of
+        source hosts
+        """
+
+        from clowder.config import Config
+
+        cache_dir = ENVIRONMENT.clowder_cache_dir
+        try:
+            ttl = Config().remote_cache_ttl
+        except Exception as err:
+            LOG.debug('Failed to read remote cache ttl from config', err)
+            ttl = None
+        REMOTE_REFS.configure(None if cache_dir is None else cache_dir / 'remote-refs.json', ttl=ttl)
+        CONNECTIVITY.configure(None if cache_dir is None else cache_dir / 'connectivity.json')
+        TASK_DURATIONS.configure(None if cache_dir is None else cache_dir / 'durations.json')
+        try:
+            SOURCE_CONTROLLER.configure_host_limits()
+        except Exception as err:
+            LOG.debug('Failed to configure source host limits', err)
+
     def _get_project_repos(self) -> Tuple[ProjectRepo, ...]:
         defaults = self._clowder.defaults
         protocol = self._clowder.protocol
@@ -137,7 +167,16 @@ class ClowderController:
                 self._section: Optional[Section] = section
 
             def run(self) -> ProjectRepo:
-                return ProjectRepo(self._project, section=self._section, defaults=defaults, protocol=protocol)
+                return ProjectRepo(self._project, section=self._section, defaults=defaults, protocol=protocol,
+                                   resolve_default_branch=False)
+
+        class DefaultBranchTask(Task):
+            def __init__(self, project_repo: ProjectRepo):
+                super().__init__(str(id(project_repo)))
+                self._project_repo: ProjectRepo = project_repo
+
+            def run(self) -> None:
+                self._project_repo.resolve_default_branch()
 
         sections = self._clowder.clowder.sections
         if sections is None:
@@ -147,6 +186,10 @@ class ClowderController:
         pool = TaskPool(jobs=len(tasks))
         project_repos = pool.run(tasks)
 
+        # Read refs of all uncloned projects in one concurrent pass, so default branches resolve from the cache
+        REMOTE_REFS.refresh([url for p in project_repos for url in p.remote_urls_to_load])
+        TaskPool(jobs=len(project_repos)).run([DefaultBranchTask(p) for p in project_repos])
+
         return sorted_tuple(project_repos)
 
     @staticmethod
@@ -259,9 +302,20 @@ class ClowderController:
         :raise ProjectStatusError:
         """
 
-        for p in projects:
-            p.repo.print_validation(allow_missing=allow_missing)
-        if not all([p.repo.is_valid(allow_missing=allow_missing) for p in projects]):
+        class ValidationTask(Task):
+            def __init__(self, project: ProjectRepo):
+                super().__init__(str(project.path))
+                self._project: ProjectRepo = project
+
+            def run(self) -> RepoValidation:
+                return self._project.repo.get_validation()
+
+        # Validation of each project is read once in parallel, then printed and evaluated in project order
+        projects = list(projects)
+        validations = TaskPool(jobs=os.cpu_count()).run([ValidationTask(p) for p in projects])
+        for project, validation in zip(projects, validations):
+            project.repo.print_validation(allow_missing=allow_missing, validation=validation)
+        if not all([v.is_valid(allow_missing=allow_missing) for v in validations]):
             raise ProjectStatusError("Invalid project state")
 
     def validate_projects_exist(self) -> None:
@@ -338,4 +392,33 @@ class ClowderController:
         self._validate_project_paths()
 
 
-CLOWDER_CONTROLLER: ClowderController = ClowderController()
+class LazyClowderController:
+    """Clowder controller created the first time one of its attributes is used
+
+    Loading the clowder yaml and creating every project repo is only paid for by commands that use projects, so
+    help output, tab completion and commands like init don't wait on the workspace
+    """
+
+    def __init__(self):
+        self._controller: Optional[ClowderController] = None
+        self._lock: Lock = Lock()
+
+    @property
+    def controller(self) -> ClowderController:
+        """Clowder controller, created on first access"""
+
+        if self._controller is None:
+            with self._lock:
+                if self._controller is None:
+                    self._controller = ClowderController()
+        return self._controller
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._controller is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.controller, name)
+
+
+CLOWDER_CONTROLLER: LazyClowderController = LazyClowderController()
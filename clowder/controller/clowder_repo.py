@@ -12,7 +12,7 @@ from typing import Optional, Tuple
 import clowder.util.command as cmd
 from clowder.util.console import CONSOLE
 from clowder.util.format import Format
-from clowder.util.git import ORIGIN, Repo
+from clowder.util.git import GIT_CACHE, ORIGIN, Repo, RepoStatus
 
 import clowder.util.formatting as fmt
 from clowder.log import LOG
@@ -142,12 +142,13 @@ class ClowderRepo:
     #     self._create_remote(self.remote, url, remove_dir=True)
     #     self._checkout_new_repo_branch(branch, depth)
 
-    def formatted_name(self, color: bool = False) -> str:
+    def formatted_name(self, color: bool = False, status: Optional[RepoStatus] = None) -> str:
         """Formatted project name"""
 
         output = '.clowder'
 
-        if self.repo.is_dirty:
+        is_dirty = self.repo.is_dirty if status is None else status.is_dirty
+        if is_dirty:
             output = f'{output}*'
 
         if not color:
@@ -160,6 +161,9 @@ class ClowderRepo:
     def fetch(self) -> None:
         self.repo.default_remote.fetch(prune=True, tags=True)
 
+    async def fetch_async(self) -> None:
+        await self.repo.default_remote.fetch_async(prune=True, tags=True)
+
     @property
     def status(self) -> Optional[str]:
         """Get clowder repo status"""
@@ -176,7 +180,8 @@ class ClowderRepo:
         if ENVIRONMENT.clowder_git_repo_dir is None:
             output = Format.green(ENVIRONMENT.clowder_repo_dir.name)
         else:
-            output = f"{self.formatted_name(color=True)} {self.repo.formatted_ref}"
+            status = self.repo.get_status()
+            output = f"{self.formatted_name(color=True, status=status)} {Repo.format_ref(status)}"
 
         if ENVIRONMENT.clowder_yaml is not None and ENVIRONMENT.clowder_yaml.is_symlink():
             target_path = Format.path(Path(ENVIRONMENT.clowder_yaml.name))
@@ -193,4 +198,7 @@ class ClowderRepo:
         :param bool check: Whether to check for errors
         """
 
-        cmd.run(command, self.path, print_command=True, check=check)
+        try:
+            cmd.run(command, self.path, print_command=True, check=check)
+        finally:
+            GIT_CACHE.invalidate(self.path)
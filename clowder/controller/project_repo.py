@@ -4,23 +4,26 @@
 
 """
 
+import inspect
 from functools import wraps
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 import clowder.util.filesystem as fs
 from clowder.util.format import Format
 from clowder.util.git import (
     Branch,
+    GIT_CACHE,
     LocalBranch,
     Protocol,
     Remote,
     RemoteBranch,
     RemoteTag,
     Repo,
+    RepoStatus,
     TrackingBranch
 )
-from clowder.util.connectivity import is_offline
+from clowder.util.connectivity import CONNECTIVITY
 from clowder.util.console import CONSOLE
 
 from clowder.environment import ENVIRONMENT
@@ -88,6 +91,19 @@ def project_repo_exists(func):
             return
         return func(*args, **kwargs)
 
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            """Wrapper"""
+
+            instance = args[0]
+            if not Path(instance.path / '.git').is_dir():
+                CONSOLE.stdout(Format.red('- Project missing'))
+                return
+            return await func(*args, **kwargs)
+
+        return async_wrapper
+
     return wrapper
 
 
@@ -95,18 +111,40 @@ class ProjectRepo(ResolvedProject):
     """Class encapsulating git utilities for projects"""
 
     def __init__(self, project: Project, defaults: Optional[Defaults] = None,
-                 section: Optional[Section] = None, protocol: Optional[Protocol] = None):
+                 section: Optional[Section] = None, protocol: Optional[Protocol] = None,
+                 resolve_default_branch: bool = True):
         """ProjectRepo __init__
 
         :param Project project: Project model instance
         :param Optional[Defaults] defaults: Defaults instance
         :param Optional[Section] section: Section instance
+        :param bool resolve_default_branch: Whether to look up default branch of remote now, if no ref is configured
         """
 
         super(ProjectRepo, self).__init__(project=project, defaults=defaults, section=section, protocol=protocol)
         self.repo: Repo = Repo(self.path, self.default_remote.name)
 
-        if self.default_branch is None and self.default_tag is None and self.default_commit is None:
+        if resolve_default_branch:
+            self.resolve_default_branch()
+
+    @property
+    def has_configured_ref(self) -> bool:
+        return self.default_branch is not None or self.default_tag is not None or self.default_commit is not None
+
+    @property
+    def remote_urls_to_load(self) -> Tuple[str, ...]:
+        """Urls of project and upstream remotes of uncloned project whose default branch is read from the remote"""
+
+        if self.has_configured_ref or self.repo.exists:
+            return ()
+        if self.upstream is None:
+            return self.url,
+        return self.url, self.upstream.url
+
+    def resolve_default_branch(self) -> None:
+        """Track default branch of remote if no branch, tag or commit is configured"""
+
+        if not self.has_configured_ref:
             remote_branch = self.repo.default_remote.default_branch(self.url)
             if remote_branch is None:
                 remote_branch = RemoteBranch(self.path, 'master', remote=self.default_remote.name)
@@ -128,7 +166,7 @@ class ProjectRepo(ResolvedProject):
         :param bool remote: Print remote branches
         """
 
-        if not is_offline() and remote:
+        if remote and CONNECTIVITY.is_reachable(self.source.url):
             self.repo.default_remote.fetch(prune=True, tags=True, depth=self.git_settings.depth,
                                            branch=self.default_ref.short_ref)
             if self.upstream_remote is not None:
@@ -202,6 +240,14 @@ class ProjectRepo(ResolvedProject):
         if self.upstream is not None:
             self.upstream_remote.fetch(prune=True, tags=True, depth=self.git_settings.depth)
 
+    @project_repo_exists
+    async def fetch_async(self) -> None:
+        """Fetch upstream changes if project exists on disk, awaiting git from a trio event loop"""
+
+        await self.repo.default_remote.fetch_async(prune=True, tags=True, depth=self.git_settings.depth)
+        if self.upstream is not None:
+            await self.upstream_remote.fetch_async(prune=True, tags=True, depth=self.git_settings.depth)
+
     @configure_remotes
     def herd(self, branch: Optional[str] = None, tag: Optional[str] = None,
              depth: Optional[int] = None, rebase: bool = False) -> None:
@@ -213,71 +259,109 @@ class ProjectRepo(ResolvedProject):
         :param bool rebase: Whether to use rebase instead of pulling latest changes
         """
 
-        depth = self.git_settings.depth if depth is None else depth
-
         CONSOLE.stdout(self.status())
-        is_initial_clone = False
-        if not self.repo.exists:
-            is_initial_clone = True
-            if self.path.exists() and fs.has_contents(self.path):
-                raise Exception('Non-empty directory already exists')
-            fs.remove_dir(self.path, ignore_errors=True)
-
-            clone_branch = None if self.default_branch is None else self.default_branch.short_ref
-            if branch is not None:
-                remote_branch = RemoteBranch(self.path, name=branch, remote=self.default_remote.name)
-                if remote_branch.exists_online(self.url):
-                    clone_branch = branch
-
-            self.repo.clone(self.path, url=self.url, depth=depth, branch=clone_branch, origin=self.default_remote.name)
-
-            if tag is not None:
-                remote_tag = RemoteTag(self.path, name=tag, remote=self.default_remote.name)
-                if remote_tag.exists:
-                    remote_tag.checkout()
-            elif self.default_tag is not None:
-                self.default_tag.checkout()
-            elif self.default_commit is not None:
-                self.default_commit.checkout()
+        is_initial_clone = self.herd_clone(branch=branch, tag=tag, depth=depth)
+        self.herd_configure()
+        if not is_initial_clone:
+            self.herd_update(branch=branch, tag=tag, rebase=rebase)
+        if self.git_settings.lfs:
+            self.herd_lfs()
+        if self.upstream is not None:
+            self.herd_upstream()
+        if self.git_settings.recursive:
+            self.herd_submodules()
+
+    def herd_clone(self, branch: Optional[str] = None, tag: Optional[str] = None,
+                   depth: Optional[int] = None) -> bool:
+        """Herd stage cloning project if it doesn't exist and checking out the ref to herd
+
+        :param Optional[str] branch: Branch to attempt to herd
+        :param Optional[str] tag: Tag to attempt to herd
+        :param Optional[int] depth: Git clone depth. 0 indicates full clone, otherwise must be a positive integer
+        :return: True if project was cloned
+        """
+
+        if self.repo.exists:
+            return False
+
+        depth = self.git_settings.depth if depth is None else depth
+        if self.path.exists() and fs.has_contents(self.path):
+            raise Exception('Non-empty directory already exists')
+        fs.remove_dir(self.path, ignore_errors=True)
+        GIT_CACHE.invalidate(self.path)
+
+        clone_branch = None if self.default_branch is None else self.default_branch.short_ref
+        if branch is not None:
+            remote_branch = RemoteBranch(self.path, name=branch, remote=self.default_remote.name)
+            if remote_branch.exists_online(self.url):
+                clone_branch = branch
+
+        self.repo.clone(self.path, url=self.url, depth=depth, branch=clone_branch, origin=self.default_remote.name)
+
+        if tag is not None:
+            remote_tag = RemoteTag(self.path, name=tag, remote=self.default_remote.name)
+            if remote_tag.exists:
+                remote_tag.checkout()
+        elif self.default_tag is not None:
+            self.default_tag.checkout()
+        elif self.default_commit is not None:
+            self.default_commit.checkout()
+        return True
+
+    def herd_configure(self) -> None:
+        """Herd stage installing git herd alias and git config"""
 
         self.install_git_herd_alias()
         if self.git_settings is not None and self.git_settings.config is not None:
             self.repo.update_git_config(self.git_settings.config)
 
-        if not is_initial_clone:
-            if not self.default_remote.exists:
-                self.default_remote.create(self.url, fetch=True, tags=True)
-
-            if self.default_branch is not None:
-                self.herd_branch(self.default_branch, check=True, create=True, rebase=rebase)
-            elif self.default_tag is not None:
-                self.default_tag.checkout()
-            elif self.default_commit is not None:
-                self.default_commit.checkout()
-
-            if branch is not None:
-                tracking_branch = TrackingBranch(self.path,
-                                                 local_branch=branch,
-                                                 upstream_branch=branch,
-                                                 upstream_remote=self.default_remote.name)
-                self.herd_branch(tracking_branch, check=False, create=False, rebase=rebase)
-            elif tag is not None:
-                remote_tag = RemoteTag(self.path, tag, self.default_remote.name)
-                if remote_tag.exists:
-                    remote_tag.checkout()
+    def herd_update(self, branch: Optional[str] = None, tag: Optional[str] = None, rebase: bool = False) -> None:
+        """Herd stage updating existing project to latest from remote
 
-        if self.git_settings.lfs:
-            self.repo.install_lfs_hooks(local=True)
-            self.repo.pull_lfs()
+        :param Optional[str] branch: Branch to attempt to herd
+        :param Optional[str] tag: Tag to attempt to herd
+        :param bool rebase: Whether to use rebase instead of pulling latest changes
+        """
 
-        if self.upstream is not None:
-            CONSOLE.stdout(Format.Git.upstream(self.upstream.name))
-            if not self.upstream_remote.exists:
-                self.upstream_remote.create(self.upstream.url)
-            self.upstream_remote.fetch(prune=True, tags=True)
+        if not self.default_remote.exists:
+            self.default_remote.create(self.url, fetch=True, tags=True)
 
-        if self.git_settings.recursive:
-            self.repo.submodule_update(init=True, depth=self.git_settings.depth, recursive=True, checkout=True)
+        if self.default_branch is not None:
+            self.herd_branch(self.default_branch, check=True, create=True, rebase=rebase)
+        elif self.default_tag is not None:
+            self.default_tag.checkout()
+        elif self.default_commit is not None:
+            self.default_commit.checkout()
+
+        if branch is not None:
+            tracking_branch = TrackingBranch(self.path,
+                                             local_branch=branch,
+                                             upstream_branch=branch,
+                                             upstream_remote=self.default_remote.name)
+            self.herd_branch(tracking_branch, check=False, create=False, rebase=rebase)
+        elif tag is not None:
+            remote_tag = RemoteTag(self.path, tag, self.default_remote.name)
+            if remote_tag.exists:
+                remote_tag.checkout()
+
+    def herd_lfs(self) -> None:
+        """Herd stage installing git lfs hooks and pulling lfs objects"""
+
+        self.repo.install_lfs_hooks(local=True)
+        self.repo.pull_lfs()
+
+    def herd_upstream(self) -> None:
+        """Herd stage adding and fetching upstream remote"""
+
+        CONSOLE.stdout(Format.Git.upstream(self.upstream.name))
+        if not self.upstream_remote.exists:
+            self.upstream_remote.create(self.upstream.url)
+        self.upstream_remote.fetch(prune=True, tags=True)
+
+    def herd_submodules(self) -> None:
+        """Herd stage updating submodules"""
+
+        self.repo.submodule_update(init=True, depth=self.git_settings.depth, recursive=True, checkout=True)
 
     @staticmethod
     def herd_branch(branch: TrackingBranch, check: bool = True, create: bool = True,
@@ -446,13 +530,15 @@ class ProjectRepo(ResolvedProject):
                                          upstream_remote=self.default_remote.name)
         tracking_branch.create()
 
-    def formatted_name(self, padding: Optional[int] = None, color: bool = False) -> str:
+    def formatted_name(self, padding: Optional[int] = None, color: bool = False,
+                       status: Optional[RepoStatus] = None) -> str:
         """Formatted project name"""
 
         if not self.repo.exists:
             output = str(self.relative_path)
         else:
-            if self.repo.is_dirty:
+            is_dirty = self.repo.is_dirty if status is None else status.is_dirty
+            if is_dirty:
                 output = f'{self.name}*'
             else:
                 output = self.name
@@ -474,14 +560,16 @@ class ProjectRepo(ResolvedProject):
         :return: Formatting project name and status
         """
 
-        output = self.formatted_name(padding=padding, color=True)
         if not self.repo.exists:
+            output = self.formatted_name(padding=padding, color=True)
             if padding is None:
                 return output
             else:
                 return f"{output} {Format.red('-')}"
 
-        return f'{output} {self.repo.formatted_ref}'
+        status = self.repo.get_status()
+        output = self.formatted_name(padding=padding, color=True, status=status)
+        return f'{output} {Repo.format_ref(status)}'
 
         # FIXME: Also print upstream if it exists
         # if not existing_git_repo(self.path):
@@ -491,6 +579,20 @@ class ProjectRepo(ResolvedProject):
         # project_output = repo.format_project_string(self.path)
         # return f"{project_output} {repo.formatted_ref}"
 
+    async def status_async(self, padding: Optional[int] = None) -> str:
+        """Return formatted status for project, awaiting git from a trio event loop
+
+        :param Optional[int] padding: Amount of padding to use for printing project on left and current ref on right
+        :return: Formatting project name and status
+        """
+
+        if not self.repo.exists:
+            return self.status(padding=padding)
+
+        status = await self.repo.get_status_async()
+        output = self.formatted_name(padding=padding, color=True, status=status)
+        return f'{output} {Repo.format_ref(status)}'
+
     @project_repo_exists
     def stash(self) -> None:
         """Stash changes for project if dirty"""
@@ -10,7 +10,7 @@ from typing import Optional, Set, TypeVar
 
 import clowder.util.command as cmd
 from clowder.util.format import Format
-from clowder.util.git import Commit, ORIGIN, Protocol, Ref, Remote, RemoteTag, TrackingBranch
+from clowder.util.git import Commit, GIT_CACHE, ORIGIN, Protocol, Ref, Remote, RemoteTag, TrackingBranch
 
 from clowder.log import LOG
 from clowder.environment import ENVIRONMENT
@@ -74,6 +74,7 @@ class ResolvedProject:
             self.default_protocol: Optional[Protocol] = self.source.protocol
         elif protocol is not None:
             self.default_protocol: Optional[Protocol] = protocol
+        SOURCE_CONTROLLER.probe_connectivity(self.source, self.default_protocol)
 
         self.upstream: Optional[ResolvedUpstream] = None
         if project.upstream is not None:
@@ -176,6 +177,9 @@ class ResolvedProject:
                 LOG.error(f'Command failed: {command}')
                 raise
             LOG.debug(f'Command failed: {command}', err)
+        finally:
+            # Arbitrary commands can change anything in the project
+            GIT_CACHE.invalidate(self.path)
 
     @staticmethod
     def _get_property(name: str, project: Project, defaults: Optional[Defaults], section: Optional[Section],
@@ -53,6 +53,7 @@ class ResolvedUpstream:
             self.default_protocol: Optional[Protocol] = self.source.protocol
         elif protocol is not None:
             self.default_protocol: Optional[Protocol] = protocol
+        SOURCE_CONTROLLER.probe_connectivity(self.source, self.default_protocol)
 
     def __lt__(self, other: 'ResolvedUpstream') -> bool:
         return self.name.lower() < self.name.lower()
@@ -6,7 +6,8 @@
 
 from typing import Dict, Optional, Set, Union
 
-from clowder.util.git import Protocol
+from clowder.util.connectivity import CONNECTIVITY
+from clowder.util.git import HOST_LIMITS, Protocol
 
 from clowder.model import Source, SourceName
 from clowder.util.error import SourcesValidatedError, UnknownSourceError, UnknownTypeError
@@ -101,6 +102,36 @@ class SourceController:
         else:
             return Protocol.SSH
 
+    def configure_host_limits(self) -> None:
+        """Limit network git commands per source host, with config values overriding clowder yaml"""
+
+        from clowder.config import Config
+
+        config = Config()
+        for name, source in self._sources.items():
+            jobs = config.source_jobs(name)
+            rate = config.source_rate(name)
+            HOST_LIMITS.configure(source.url,
+                                  jobs=source.jobs if jobs is None else jobs,
+                                  rate=source.rate if rate is None else rate)
+
+    def probe_connectivity(self, source: Source, protocol: Optional[Protocol] = None) -> None:
+        """Start checking whether git host of source is reachable in the background
+
+        :param Source source: Source to check
+        :param Optional[Protocol] protocol: Default protocol for source, if known
+        """
+
+        if source.protocol is not None:
+            protocols = [source.protocol]
+        elif self.protocol_override is not None:
+            protocols = [self.protocol_override]
+        elif protocol is not None:
+            protocols = [protocol]
+        else:
+            protocols = list(Protocol)
+        CONNECTIVITY.probe(source.url, [p.port for p in protocols])
+
     def validate_sources(self) -> None:
         """Validate sources: check for unknown names
 
@@ -4,7 +4,6 @@
 
 """
 
-import pkg_resources
 from functools import wraps
 from pathlib import Path
 from typing import Optional
@@ -69,6 +68,7 @@ class ClowderEnvironment:
     :cvar Optional[Path] clowder_repo_dir: Path to clowder repo directory if it exists
     :cvar Optional[Path] clowder_repo_versaions_dir: Path to clowder repo versions directory
     :cvar Optional[Path] clowder_repo_plugins_dir: Path to clowder repo plugins directory
+    :cvar Optional[Path] clowder_cache_dir: Path to directory for clowder cache files
     :cvar Optional[Path] clowder_yaml: Path to clowder yaml file if it exists
 
     :cvar Optional[MissingSourceError] missing_source_error: Possible error for broken clowder yaml symlink
@@ -84,6 +84,7 @@ class ClowderEnvironment:
     clowder_git_repo_dir: Optional[Path] = None
     clowder_repo_versions_dir: Optional[Path] = None
     clowder_repo_plugins_dir: Optional[Path] = None
+    clowder_cache_dir: Optional[Path] = None
     clowder_yaml: Optional[Path] = None
 
     missing_source_error: Optional[MissingSourceError] = None
@@ -93,10 +94,25 @@ class ClowderEnvironment:
     def __init__(self):
         """ClowderEnvironment __init__"""
 
-        self.clowder_schema: str = pkg_resources.resource_string(__name__, 'clowder.schema.json')
+        self._clowder_schema: Optional[str] = None
         self._configure_directories()
         self._configure_clowder_yaml()
 
+    @property
+    def clowder_schema(self) -> str:
+        """Json schema for clowder yaml files, read from package data on first use"""
+
+        if self._clowder_schema is None:
+            try:
+                from importlib.resources import files
+            except ImportError:
+                # Python 3.8
+                from importlib.resources import read_text
+                self._clowder_schema = read_text(__package__, 'clowder.schema.json')
+            else:
+                self._clowder_schema = files(__package__).joinpath('clowder.schema.json').read_text()
+        return self._clowder_schema
+
     def has_ambiguous_clowder_yaml_files(self) -> bool:
         """Check for ambiguous clowder yaml files
 
@@ -172,6 +188,14 @@ class ClowderEnvironment:
             self.clowder_repo_versions_dir: Optional[Path] = self.clowder_repo_dir / 'versions'
             self.clowder_config_dir: Optional[Path] = self.clowder_repo_dir / "config"
             self.clowder_repo_plugins_dir: Optional[Path] = self.clowder_repo_dir / "plugins"
+            # Keep cache files out of the clowder repo working tree so they don't show up as untracked files
+            git_dir = None
+            if self.clowder_git_repo_dir is not None:
+                git_dir = GitOffline.git_dir(self.clowder_git_repo_dir)
+            if git_dir is not None:
+                self.clowder_cache_dir: Optional[Path] = git_dir / 'clowder'
+            else:
+                self.clowder_cache_dir: Optional[Path] = self.clowder_repo_dir / '.cache'
 
     def _get_possible_yaml_path(self, name: str) -> Path:
         """Get possible yaml path based on other environment variables
@@ -4,7 +4,7 @@
 
 """
 
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 from clowder.util.git import Protocol
 
@@ -17,21 +17,25 @@ class Source:
     :ivar SourceName name: Source name
     :ivar str url: Git project url
     :ivar Optional[GitProtocol] protocol: Git protocol
+    :ivar Optional[int] jobs: Max concurrent network git commands for source host
+    :ivar Optional[float] rate: Max network git commands started per second for source host
     """
 
-    def __init__(self, name: SourceName, yaml: Dict[str, str]):
+    def __init__(self, name: SourceName, yaml: Dict[str, Any]):
         """Source __init__
 
         :param str name: Source name
-        :param Dict[str, str] yaml: Parsed YAML python object for source
+        :param Dict[str, Any] yaml: Parsed YAML python object for source
         """
 
         self.name: SourceName = name
         self.url: str = yaml['url']
         protocol = yaml.get("protocol", None)
         self.protocol: Optional[Protocol] = None if protocol is None else Protocol(protocol)
+        self.jobs: Optional[int] = yaml.get("jobs", None)
+        self.rate: Optional[float] = yaml.get("rate", None)
 
-    def get_yaml(self) -> Dict[str, str]:
+    def get_yaml(self) -> Dict[str, Any]:
         """Return python object representation for saving yaml
 
         :return: YAML python object
@@ -41,5 +45,9 @@ class Source:
 
         if self.protocol is not None:
             source['protocol'] = self.protocol.value
+        if self.jobs is not None:
+            source['jobs'] = self.jobs
+        if self.rate is not None:
+            source['rate'] = self.rate
 
         return source
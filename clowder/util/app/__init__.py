@@ -12,3 +12,4 @@ from .count_argument import CountArgument
 from .mutually_exclusive_argument_group import MutuallyExclusiveArgumentGroup
 from .single_argument import SingleArgument
 from .subcommand import Subcommand
+from .version_argument import VersionAction, VersionArgument
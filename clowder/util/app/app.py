@@ -5,7 +5,6 @@
 """
 
 import argparse
-import pkg_resources
 import sys
 from subprocess import CalledProcessError
 from typing import Any, List, Optional, Type, Union
@@ -15,10 +14,12 @@ import clowder.util.reflection as reflect
 from trio import MultiError
 
 from ..console import CONSOLE
+from ..tasks.task_result import TasksFailedError
 from .argument import Argument
 from .argument_group import ArgumentGroup
 from .mutually_exclusive_argument_group import MutuallyExclusiveArgumentGroup
 from .subcommand import Subcommand
+from .version_argument import VersionArgument
 
 Parser = Union[argparse.ArgumentParser, argparse._MutuallyExclusiveGroup, argparse._ArgumentGroup]  # noqa
 
@@ -65,6 +66,10 @@ class App:
             CONSOLE.stderr('** MultiError **')
             CONSOLE.stderr(err.exceptions)
             exit(1)
+        except TasksFailedError as err:
+            CONSOLE.stderr('** TasksFailedError **')
+            CONSOLE.stderr(err)
+            exit(1)
         except OSError as err:
             CONSOLE.stderr('** OSError **')
             CONSOLE.stderr(err)
@@ -142,13 +147,7 @@ class App:
             else:
                 action = command_help
             command_parser.set_defaults(func=action)
-            try:
-                version_message = f"{self.entry_point} version {pkg_resources.require(self.name)[0].version}"
-                self._add_parser_arguments(command_parser, [
-                    Argument('-v', '--version', action='version', version=version_message, metavar=None)
-                ])
-            except:
-                pass
+            self._add_parser_arguments(command_parser, [VersionArgument(self.name, self.entry_point)])
 
             if self.args:
                 self._add_parser_arguments(command_parser, self.args)
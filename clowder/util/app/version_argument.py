@@ -0,0 +1,39 @@
+"""command line app
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import argparse
+
+from .argument import Argument
+
+
+class VersionAction(argparse.Action):
+    """Print version of installed distribution and exit
+
+    The version is read from package metadata only when the option is used, so other commands don't pay for
+    importing importlib.metadata and searching installed distributions
+    """
+
+    def __init__(self, option_strings, distribution: str, prog: str, dest: str = argparse.SUPPRESS,
+                 default: str = argparse.SUPPRESS, help: str = "show program's version number and exit"):  # noqa
+        super().__init__(option_strings=option_strings, dest=dest, default=default, nargs=0, help=help)
+        self.distribution: str = distribution
+        self.prog: str = prog
+
+    def __call__(self, parser, namespace, values, option_string=None) -> None:
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            message = f'{self.prog} version {version(self.distribution)}'
+        except PackageNotFoundError:
+            message = f'{self.prog} version unknown'
+        parser.exit(message=message + '\n')
+
+
+class VersionArgument(Argument):
+
+    def __init__(self, distribution: str, prog: str, *args, **kwargs):
+        super().__init__('-v', '--version', *args, action=VersionAction, distribution=distribution, prog=prog,
+                         metavar=None, **kwargs)
@@ -4,17 +4,52 @@
 
 """
 
+import locale
 import os
+import shlex
+import signal
 import subprocess
+import time
 from pathlib import Path
-from subprocess import CompletedProcess, PIPE, STDOUT
-from typing import List, Optional, Union
+from subprocess import CalledProcessError, CompletedProcess, DEVNULL, PIPE, STDOUT
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from .console import CONSOLE
 from .format import Format
+from .process_watch import current_process_watch, ProcessWatch
+from .profiler import COMMAND_PROFILER
 
+Command = Union[str, List[str]]
 
-def get_stdout(command: str, cwd: Path = Path.cwd()) -> Optional[str]:
+POSIX_SPAWN_AVAILABLE: bool = hasattr(os, 'posix_spawnp')
+USE_POSIX_SPAWN: bool = POSIX_SPAWN_AVAILABLE and os.environ.get('CLOWDER_POSIX_SPAWN', '0') == '1'
+"""Whether argv commands use os.posix_spawnp by default, enabled with CLOWDER_POSIX_SPAWN=1"""
+
+_env_template: Optional[Dict[str, str]] = None
+_env_template_lock: Lock = Lock()
+
+
+def env_template() -> Dict[str, str]:
+    """Environment for spawned argv commands, copied from os.environ once per process"""
+
+    global _env_template
+    if _env_template is None:
+        with _env_template_lock:
+            if _env_template is None:
+                _env_template = os.environ.copy()
+    return _env_template
+
+
+def reset_env_template() -> None:
+    """Rebuild environment template on next use, e.g. after changing os.environ"""
+
+    global _env_template
+    with _env_template_lock:
+        _env_template = None
+
+
+def get_stdout(command: Command, cwd: Path = Path.cwd()) -> Optional[str]:
     if not cwd.is_dir():
         return None
     result = run(command, cwd=cwd, print_output=False, check=False)
@@ -27,19 +62,41 @@ def get_stdout(command: str, cwd: Path = Path.cwd()) -> Optional[str]:
     return output
 
 
-def run_silent(command: str, cwd: Path = Path.cwd()) -> CompletedProcess:
+def run_silent(command: Command, cwd: Path = Path.cwd()) -> CompletedProcess:
     return run(command, cwd=cwd, check=False, print_output=False)
 
 
-def run(command: Union[str, List[str]], cwd: Path = Path.cwd(), check: bool = True,
+def run(command: Command, cwd: Path = Path.cwd(), check: bool = True,
         env: Optional[dict] = None, stdout=PIPE, stderr=STDOUT,
         print_output: Optional[bool] = None, print_command: bool = False,
         login: bool = False, interactive: bool = False, executable: Optional[str] = None) -> CompletedProcess:
+    """Run command
+
+    A str command is run by the shell, which is reserved for user supplied commands like ``forall``.
+    A list command is an argv executed directly with :func:`run_argv`
+
+    :param Command command: Shell command string, or argv list
+    :param Path cwd: Working directory
+    :param bool check: Whether to raise CalledProcessError on non-zero exit
+    :param Optional[dict] env: Environment variables to add
+    :param Optional[bool] print_output: Whether to print output instead of capturing it
+    :param bool print_command: Whether to print command before running it
+    :param bool login: Run shell command as login shell
+    :param bool interactive: Run shell command as interactive shell
+    :param Optional[str] executable: Shell executable
+    :return: Completed process
+    """
+
+    if isinstance(command, list):
+        return run_argv(command, cwd=cwd, check=check, env=env, stdout=stdout, stderr=stderr,
+                        print_output=print_output, print_command=print_command)
 
     if print_output is None:
-        print_output = CONSOLE.print_output
+        print_output = CONSOLE.print_output or CONSOLE.capturing
 
-    if print_output:
+    # Output is captured and buffered instead of printed while the console captures this thread's output
+    buffer_output = print_output and CONSOLE.capturing
+    if print_output and not buffer_output:
         stdout = None
         stderr = None
 
@@ -48,13 +105,7 @@ def run(command: Union[str, List[str]], cwd: Path = Path.cwd(), check: bool = Tr
         output = Format.bold(output)
         CONSOLE.stdout(output)
 
-    # if isinstance(command, list):
-    #     cmd = ' '.join(command)
-    # else:
-    #     cmd = command
-
-    if isinstance(command, str):
-        command = [command]
+    command = [command]
     if login:
         command = ['-l'] + command
     if interactive:
@@ -68,8 +119,15 @@ def run(command: Union[str, List[str]], cwd: Path = Path.cwd(), check: bool = Tr
         executable = executable
         cmd_env['SHELL'] = executable
 
+    watch = current_process_watch()
+    if watch is not None and stderr != PIPE:
+        return _buffered(buffer_output, lambda: _profile(command[-1:], cwd, lambda: _run_watched(
+            watch, command, check, cwd=cwd, env=cmd_env, shell=True, stdout=stdout, stderr=stderr,
+            executable=executable
+        ), shell=True))
+
     # TODO: Replace universal_newlines with text when Python 3.6 support is dropped
-    completed_process = subprocess.run(
+    return _buffered(buffer_output, lambda: _profile(command[-1:], cwd, lambda: subprocess.run(
         command,
         cwd=cwd,
         env=cmd_env,
@@ -79,6 +137,259 @@ def run(command: Union[str, List[str]], cwd: Path = Path.cwd(), check: bool = Tr
         universal_newlines=True,
         check=check,
         executable=executable
-    )
+    ), shell=True))
+
+
+def run_argv(args: List[str], cwd: Path = Path.cwd(), check: bool = True,
+             env: Optional[dict] = None, stdout=PIPE, stderr=STDOUT,
+             print_output: Optional[bool] = None, print_command: bool = False,
+             posix_spawn: Optional[bool] = None) -> CompletedProcess:
+    """Run argv command directly, without a shell
+
+    :param List[str] args: Command argv
+    :param Path cwd: Working directory
+    :param bool check: Whether to raise CalledProcessError on non-zero exit
+    :param Optional[dict] env: Environment variables to add to the environment template
+    :param Optional[bool] print_output: Whether to print output instead of capturing it
+    :param bool print_command: Whether to print command before running it
+    :param Optional[bool] posix_spawn: Whether to spawn with os.posix_spawnp, defaults to USE_POSIX_SPAWN
+    :return: Completed process
+    """
+
+    if print_output is None:
+        print_output = CONSOLE.print_output or CONSOLE.capturing
+
+    # Output is captured and buffered instead of printed while the console captures this thread's output
+    buffer_output = print_output and CONSOLE.capturing
+    if print_output and not buffer_output:
+        stdout = None
+        stderr = None
+
+    if print_command:
+        output = Format.default(f"> {shlex.join(args)}")
+        output = Format.bold(output)
+        CONSOLE.stdout(output)
+
+    cmd_env = env_template()
+    if env is not None:
+        cmd_env = dict(cmd_env, **env)
+
+    watch = current_process_watch()
+    if watch is not None and stderr != PIPE:
+        return _buffered(buffer_output, lambda: _profile(args, cwd, lambda: _run_watched(
+            watch, args, check, cwd=cwd, env=cmd_env, stdout=stdout, stderr=stderr
+        )))
+
+    if posix_spawn is None:
+        posix_spawn = USE_POSIX_SPAWN
+    if posix_spawn and _can_posix_spawn(args, cwd, stdout, stderr):
+        def spawn() -> CompletedProcess:
+            completed_process = _profile(args, cwd, lambda: _posix_spawn(args, cwd, cmd_env, stdout, stderr))
+            if check and completed_process.returncode != 0:
+                raise CalledProcessError(completed_process.returncode, args, output=completed_process.stdout)
+            return completed_process
+        return _buffered(buffer_output, spawn)
+
+    # TODO: Replace universal_newlines with text when Python 3.6 support is dropped
+    return _buffered(buffer_output, lambda: _profile(args, cwd, lambda: subprocess.run(
+        args,
+        cwd=cwd,
+        env=cmd_env,
+        stdout=stdout,
+        stderr=stderr,
+        universal_newlines=True,
+        check=check
+    )))
 
+
+async def get_stdout_async(args: List[str], cwd: Path = Path.cwd()) -> Optional[str]:
+    """Async version of :func:`get_stdout` for argv commands"""
+
+    if not cwd.is_dir():
+        return None
+    result = await run_async(args, cwd=cwd, print_output=False, check=False)
+    if result.returncode != 0:
+        return None
+    output: str = result.stdout.strip()
+    if not output:
+        return None
+    return output
+
+
+async def run_async(args: List[str], cwd: Path = Path.cwd(), check: bool = True,
+                    env: Optional[dict] = None, print_output: Optional[bool] = None) -> CompletedProcess:
+    """Run argv command from a trio event loop
+
+    The calling task awaits the process directly instead of blocking a worker thread on it
+
+    :param List[str] args: Command argv
+    :param Path cwd: Working directory
+    :param bool check: Whether to raise CalledProcessError on non-zero exit
+    :param Optional[dict] env: Environment variables to add to the environment template
+    :param Optional[bool] print_output: Whether to print output instead of capturing it
+    :return: Completed process
+    """
+
+    import trio
+
+    if print_output is None:
+        print_output = CONSOLE.print_output
+
+    cmd_env = env_template()
+    if env is not None:
+        cmd_env = dict(cmd_env, **env)
+
+    start = time.time()
+    counter = time.perf_counter()
+    returncode = None
+    watch = current_process_watch()
+    try:
+        if watch is None:
+            process = await trio.run_process(args, cwd=str(cwd), env=cmd_env, check=False,
+                                             capture_stdout=not print_output,
+                                             stderr=None if print_output else STDOUT)
+            returncode, stdout = process.returncode, process.stdout
+        else:
+            returncode, stdout = await _run_watched_async(watch, args, cwd, cmd_env, capture=not print_output)
+    finally:
+        if COMMAND_PROFILER.enabled:
+            COMMAND_PROFILER.record(args, cwd, start, time.perf_counter() - counter, returncode)
+
+    output = None
+    if stdout is not None:
+        encoding = locale.getpreferredencoding(False)
+        output = stdout.decode(encoding, errors='replace').replace('\r\n', '\n')
+    if check and returncode != 0:
+        raise CalledProcessError(returncode, args, output=output)
+    return CompletedProcess(args, returncode, stdout=output)
+
+
+def _run_watched(watch: ProcessWatch, command: List[str], check: bool, **kwargs) -> CompletedProcess:
+    # Run in a new session, so the watch can kill the process group, and read output as it's printed to detect stalls
+    watch.raise_if_expired()
+    output = None
+    with subprocess.Popen(command, start_new_session=True, universal_newlines=True, **kwargs) as process:
+        with watch.process(process.pid):
+            if process.stdout is not None:
+                lines = []
+                for line in process.stdout:
+                    watch.output_received()
+                    lines.append(line)
+                output = ''.join(lines)
+            returncode = process.wait()
+    watch.raise_if_expired()
+    if check and returncode != 0:
+        raise CalledProcessError(returncode, command, output=output)
+    return CompletedProcess(command, returncode, stdout=output)
+
+
+async def _run_watched_async(watch: ProcessWatch, args: List[str], cwd: Path, env: Dict[str, str],
+                             capture: bool) -> Tuple[int, Optional[bytes]]:
+    import trio
+
+    watch.raise_if_expired()
+    process = await trio.lowlevel.open_process(args, cwd=str(cwd), env=env, start_new_session=True,
+                                               stdout=PIPE if capture else None,
+                                               stderr=STDOUT if capture else None)
+    chunks = []
+    with watch.process(process.pid):
+        try:
+            if process.stdout is not None:
+                async for chunk in process.stdout:
+                    watch.output_received()
+                    chunks.append(chunk)
+            await process.wait()
+        finally:
+            if process.returncode is None:
+                # Cancelled, so stop the process group instead of leaving it running
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                with trio.CancelScope(shield=True):
+                    await process.wait()
+    watch.raise_if_expired()
+    return process.returncode, b''.join(chunks) if process.stdout is not None else None
+
+
+def _buffered(buffer_output: bool, spawn: Callable[[], CompletedProcess]) -> CompletedProcess:
+    if not buffer_output:
+        return spawn()
+    try:
+        completed_process = spawn()
+    except CalledProcessError as err:
+        CONSOLE.buffer_command_output(err.output)
+        raise
+    CONSOLE.buffer_command_output(completed_process.stdout)
     return completed_process
+
+
+def _profile(args: List[str], cwd: Path, spawn: Callable[[], CompletedProcess],
+             shell: bool = False) -> CompletedProcess:
+    if not COMMAND_PROFILER.enabled:
+        return spawn()
+    start = time.time()
+    counter = time.perf_counter()
+    returncode = None
+    try:
+        completed_process = spawn()
+        returncode = completed_process.returncode
+        return completed_process
+    except CalledProcessError as err:
+        returncode = err.returncode
+        raise
+    finally:
+        COMMAND_PROFILER.record(args, cwd, start, time.perf_counter() - counter, returncode, shell=shell)
+
+
+def _can_posix_spawn(args: List[str], cwd: Path, stdout, stderr) -> bool:
+    if not POSIX_SPAWN_AVAILABLE or not args:
+        return False
+    # os.posix_spawnp has no cwd argument, so only git, which takes -C <path>, can run in another directory
+    if args[0] != 'git' and Path(cwd) != Path.cwd():
+        return False
+    return stdout in (None, PIPE, DEVNULL) and stderr in (None, STDOUT, DEVNULL)
+
+
+def _posix_spawn(args: List[str], cwd: Path, env: Dict[str, str], stdout, stderr) -> CompletedProcess:
+    spawn_args = ['git', '-C', str(cwd)] + args[1:] if args[0] == 'git' else args
+    file_actions = []
+    read_fd = None
+    write_fd = None
+    devnull_fd = None
+    if stdout == PIPE:
+        read_fd, write_fd = os.pipe()
+        file_actions.append((os.POSIX_SPAWN_DUP2, write_fd, 1))
+        if stderr == STDOUT:
+            file_actions.append((os.POSIX_SPAWN_DUP2, write_fd, 2))
+    if DEVNULL in (stdout, stderr):
+        devnull_fd = os.open(os.devnull, os.O_RDWR)
+        if stdout == DEVNULL:
+            file_actions.append((os.POSIX_SPAWN_DUP2, devnull_fd, 1))
+        if stderr == DEVNULL or (stderr == STDOUT and stdout == DEVNULL):
+            file_actions.append((os.POSIX_SPAWN_DUP2, devnull_fd, 2))
+
+    try:
+        pid = os.posix_spawnp(spawn_args[0], spawn_args, env, file_actions=file_actions)
+    except BaseException:
+        if read_fd is not None:
+            os.close(read_fd)
+        raise
+    finally:
+        if write_fd is not None:
+            os.close(write_fd)
+        if devnull_fd is not None:
+            os.close(devnull_fd)
+
+    output = None
+    if read_fd is not None:
+        chunks = []
+        with os.fdopen(read_fd, 'rb') as reader:
+            for chunk in iter(lambda: reader.read(65536), b''):
+                chunks.append(chunk)
+        encoding = locale.getpreferredencoding(False)
+        output = b''.join(chunks).decode(encoding, errors='replace').replace('\r\n', '\n')
+
+    _, status = os.waitpid(pid, 0)
+    returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    return CompletedProcess(args, returncode, stdout=output)
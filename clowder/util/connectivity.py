@@ -4,15 +4,36 @@
 
 """
 
+import json
+import os
 import socket
+import time
 from functools import wraps
 from pathlib import Path
 from subprocess import CompletedProcess
+from threading import Event, Lock, Thread
 from time import sleep
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import clowder.util.command as cmd
 
+from .console import CONSOLE
+from .format import Format
+
+Endpoint = Tuple[str, int]
+
+CACHE_VERSION: int = 1
+DEFAULT_ENDPOINT: Endpoint = ('8.8.8.8', 53)
+"""Endpoint probed when no git hosts are registered, google-public-dns-a.google.com DNS/TCP"""
+DEFAULT_TIMEOUT: float = 3
+DEFAULT_TTL: int = 30
+"""Seconds probe results of earlier commands are used for"""
+UNREACHABLE_TTL: int = 5
+"""Max seconds failed probes of earlier commands are used for, so a restored connection is noticed quickly"""
+PROBE_ADDRESS_ENV: str = 'CLOWDER_CONNECTIVITY_PROBE'
+"""Environment variable with ``<host>:<port>`` to probe instead of all git hosts, e.g. a local test listener"""
+OFFLINE_ENV: str = 'CLOWDER_OFFLINE'
+
 
 class NetworkConnectionError(Exception):
     pass
@@ -67,25 +88,243 @@ def get_gateway_ip_address() -> Optional[str]:
         raise NotImplementedError
 
 
-def is_offline(host: str = '8.8.8.8', port: int = 53, timeout: int = 3) -> bool:
-    """Returns True if offline, False otherwise
+class EndpointProbe:
+    """Result of opening a TCP connection to an endpoint
+
+    :ivar Endpoint endpoint: Host and port
+    :ivar Optional[bool] reachable: Whether connection succeeded, None while probe is running
+    :ivar float timestamp: Time probe started, in seconds since the epoch
+    """
+
+    def __init__(self, endpoint: Endpoint, reachable: Optional[bool] = None, timestamp: Optional[float] = None):
+        self.endpoint: Endpoint = endpoint
+        self.reachable: Optional[bool] = reachable
+        self.timestamp: float = time.time() if timestamp is None else timestamp
+        self._done: Event = Event()
+        if reachable is not None:
+            self._done.set()
+
+    def start(self, timeout: float) -> None:
+        """Probe endpoint in a background thread
+
+        :param float timeout: Seconds to wait for connection
+        """
+
+        Thread(target=self._run, args=(timeout,), name=f'probe {self.key}', daemon=True).start()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[bool]:
+        """Wait for probe to finish
+
+        :param Optional[float] timeout: Max seconds to wait
+        :return: Whether endpoint is reachable, None if probe didn't finish in time
+        """
 
-    Service: domain (DNS/TCP)
+        self._done.wait(timeout)
+        return self.reachable
 
-    .. note:: Implementation source https://stackoverflow.com/a/33117579
+    @property
+    def key(self) -> str:
+        host, port = self.endpoint
+        return f'{host}:{port}'
 
-    :param str host: Host to check. Default is 8.8.8.8 (google-public-dns-a.google.com)
-    :param int port: Port number. Default is 53/tcp
-    :param int timeout: Seconds to wait until timeout
-    :return: True, if offline
+    def is_fresh(self, ttl: int) -> bool:
+        ttl = ttl if self.reachable else min(ttl, UNREACHABLE_TTL)
+        return time.time() - self.timestamp < ttl
+
+    def _run(self, timeout: float) -> None:
+        try:
+            with socket.create_connection(self.endpoint, timeout=timeout):
+                self.reachable = True
+        except OSError:
+            self.reachable = False
+        finally:
+            self._done.set()
+
+
+class Connectivity:
+    """Reachability of git hosts
+
+    Hosts are probed concurrently in background threads as soon as they're registered, so probing overlaps
+    with loading projects. Results are saved to a cache file and reused by commands run shortly after
+
+    :ivar bool offline: Whether network access is disabled, e.g. with ``--offline``
+    :ivar Optional[Path] file: Cache file, or None to not persist results
+    :ivar int ttl: Seconds probe results of earlier commands are used for
+    :ivar float timeout: Seconds to wait for each connection
     """
 
-    try:
-        socket.setdefaulttimeout(timeout)
-        socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((host, port))
+    def __init__(self):
+        self.offline: bool = os.environ.get(OFFLINE_ENV, '0') == '1'
+        self.file: Optional[Path] = None
+        self.ttl: int = DEFAULT_TTL
+        self.timeout: float = DEFAULT_TIMEOUT
+        self._lock: Lock = Lock()
+        self._hosts: Dict[str, List[Endpoint]] = {}
+        self._probes: Dict[str, EndpointProbe] = {}
+        self._persisted: Dict[str, EndpointProbe] = {}
+        self._dirty: bool = False
+
+    def configure(self, file: Optional[Path], ttl: Optional[int] = None) -> None:
+        """Set cache file and load persisted probe results
+
+        :param Optional[Path] file: Cache file, or None to not persist results
+        :param Optional[int] ttl: Seconds probe results of earlier commands are used for, defaults to DEFAULT_TTL
+        """
+
+        with self._lock:
+            self.file = file
+            self.ttl = DEFAULT_TTL if ttl is None else ttl
+            self._persisted = self._read_file(file)
+
+    def probe(self, host: str, ports: Iterable[int]) -> None:
+        """Register host and start probing it, unless it's already probed
+
+        :param str host: Host name
+        :param Iterable[int] ports: Ports to try, host is reachable if any of them accepts a connection
+        """
+
+        if self.offline:
+            return
+        endpoints = self._endpoints(host, ports)
+        with self._lock:
+            self._hosts.setdefault(host, [])
+            for endpoint in endpoints:
+                if endpoint not in self._hosts[host]:
+                    self._hosts[host].append(endpoint)
+                self._start_probe(endpoint)
+
+    def is_reachable(self, host: str, ports: Optional[Iterable[int]] = None) -> bool:
+        """Whether host accepts connections, waiting for probes to finish
+
+        :param str host: Host name
+        :param Optional[Iterable[int]] ports: Ports to probe if host isn't registered yet
+        :return: True if any probed port of host accepted a connection
+        """
+
+        if self.offline:
+            return False
+        if ports is not None:
+            self.probe(host, ports)
+        with self._lock:
+            endpoints = list(self._hosts.get(host, []))
+        return self._wait_any(endpoints)
+
+    def unreachable_hosts(self) -> List[str]:
+        """Registered hosts that don't accept connections, waiting for probes to finish"""
+
+        with self._lock:
+            hosts = dict(self._hosts)
+        return sorted([host for host, endpoints in hosts.items() if not self._wait_any(endpoints)])
+
+    def is_offline(self) -> bool:
+        """Returns True if offline, False otherwise
+
+        Offline if network access is disabled, or no registered git host is reachable. If no hosts are registered,
+        e.g. before a clowder yaml file exists, :data:`DEFAULT_ENDPOINT` is probed
+
+        :return: True, if offline
+        """
+
+        if self.offline:
+            return True
+        with self._lock:
+            hosts = list(self._hosts.keys())
+        if not hosts:
+            host, port = DEFAULT_ENDPOINT
+            return not self.is_reachable(host, [port])
+        return len(self.unreachable_hosts()) == len(hosts)
+
+    def save(self) -> None:
+        """Write finished probe results to cache file, if they changed"""
+
+        with self._lock:
+            if self.file is None or not self._dirty or self.ttl <= 0:
+                return
+            probes = dict(self._persisted)
+            probes.update({k: p for k, p in self._probes.items() if p.reachable is not None})
+            contents = {
+                'version': CACHE_VERSION,
+                'endpoints': {k: {'reachable': p.reachable, 'timestamp': p.timestamp}
+                              for k, p in probes.items() if p.is_fresh(self.ttl)}
+            }
+            self._dirty = False
+            file = self.file
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = file.with_name(f'{file.name}.{os.getpid()}.tmp')
+            temp_file.write_text(json.dumps(contents, indent=2, sort_keys=True))
+            os.replace(temp_file, file)
+        except OSError:
+            pass
+
+    def _start_probe(self, endpoint: Endpoint) -> EndpointProbe:
+        key = f'{endpoint[0]}:{endpoint[1]}'
+        probe = self._probes.get(key, None)
+        if probe is not None:
+            return probe
+        persisted = self._persisted.get(key, None)
+        if persisted is not None and persisted.is_fresh(self.ttl):
+            self._probes[key] = persisted
+            return persisted
+        probe = EndpointProbe(endpoint)
+        self._probes[key] = probe
+        self._dirty = True
+        probe.start(self.timeout)
+        return probe
+
+    def _wait_any(self, endpoints: List[Endpoint]) -> bool:
+        with self._lock:
+            probes = [self._start_probe(e) for e in endpoints]
+        # Probes run concurrently, so return as soon as any of them succeeds
+        deadline = time.time() + self.timeout + 1
+        while probes:
+            if any([p.reachable for p in probes]):
+                return True
+            pending = [p for p in probes if p.reachable is None]
+            if not pending or time.time() > deadline:
+                return False
+            pending[0].wait(0.05)
         return False
-    except socket.error:
-        return True
+
+    @staticmethod
+    def _endpoints(host: str, ports: Iterable[int]) -> List[Endpoint]:
+        address = os.environ.get(PROBE_ADDRESS_ENV, None)
+        if address:
+            probe_host, _, probe_port = address.rpartition(':')
+            return [(probe_host, int(probe_port))]
+        return [(host, port) for port in ports]
+
+    @staticmethod
+    def _read_file(file: Optional[Path]) -> Dict[str, EndpointProbe]:
+        if file is None:
+            return {}
+        try:
+            contents = json.loads(file.read_text())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(contents, dict) or contents.get('version', None) != CACHE_VERSION:
+            return {}
+        probes = {}
+        try:
+            for key, values in contents.get('endpoints', {}).items():
+                host, _, port = key.rpartition(':')
+                probes[key] = EndpointProbe((host, int(port)), reachable=bool(values['reachable']),
+                                            timestamp=values['timestamp'])
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return {}
+        return probes
+
+
+CONNECTIVITY: Connectivity = Connectivity()
+
+
+def is_offline() -> bool:
+    """Returns True if offline, False otherwise
+
+    :return: True, if network access is disabled or no registered git host is reachable
+    """
+
+    return CONNECTIVITY.is_offline()
 
 
 def network_connection_required(func):
@@ -98,8 +337,15 @@ def network_connection_required(func):
     def wrapper(*args, **kwargs):
         """Wrapper"""
 
-        if is_offline():
+        if CONNECTIVITY.offline:
+            raise NetworkConnectionError('Network access is disabled with --offline')
+        if CONNECTIVITY.is_offline():
+            hosts = CONNECTIVITY.unreachable_hosts()
+            if hosts:
+                raise NetworkConnectionError(f'Unable to reach git hosts: {", ".join(hosts)}')
             raise NetworkConnectionError('No available internet connection')
+        for host in CONNECTIVITY.unreachable_hosts():
+            CONSOLE.stderr(f'{Format.yellow("Warning")}: Unable to reach git host {Format.bold(host)}')
         return func(*args, **kwargs)
 
     return wrapper
@@ -5,11 +5,14 @@
 """
 
 import sys
+import threading
+from contextlib import contextmanager
 from functools import wraps
 from io import StringIO
-from typing import Any, List, Optional
+from typing import Any, Iterator, List, Optional
 
 from rich.console import Console as RichConsole
+from rich.text import Text
 
 
 def disable_output(func):
@@ -46,6 +49,7 @@ class Console:
                                                 width=160)
         self._stringio: RichConsole = RichConsole(file=StringIO(),
                                                   width=160)
+        self._local: threading.local = threading.local()
 
     @property
     def stdout_console(self) -> RichConsole:
@@ -60,9 +64,51 @@ class Console:
     def stdout(self, output: Any = '', force: bool = False) -> None:
         if output is None:
             return
-        if self.print_output or force:
+        buffer = self._buffer
+        if buffer is not None:
+            buffer.append(output)
+        elif self.print_output or force:
             self._stdout.print(output)
 
+    @property
+    def capturing(self) -> bool:
+        """Whether stdout of current thread is buffered"""
+
+        return self._buffer is not None
+
+    @contextmanager
+    def capture(self, buffer: List[Any]) -> Iterator[List[Any]]:
+        """Buffer stdout of current thread instead of printing it
+
+        :param List[Any] buffer: List to append output to
+        """
+
+        previous = self._buffer
+        self._local.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = previous
+
+    def buffer_command_output(self, output: Optional[str]) -> None:
+        """Buffer output of command run while capturing, without rendering markup in it
+
+        :param Optional[str] output: Command output
+        """
+
+        buffer = self._buffer
+        if buffer is not None and output:
+            buffer.append(Text(output.rstrip('\n')))
+
+    def print_buffer(self, buffer: List[Any]) -> None:
+        """Print buffered output
+
+        :param List[Any] buffer: Output captured with :meth:`capture`
+        """
+
+        for output in buffer:
+            self.stdout(output)
+
     def print_exception(self, force: bool = False) -> None:
         if self.print_output or force:
             self._stderr.print_exception()
@@ -88,6 +134,10 @@ class Console:
             self._stdout.print('\n'.join(self._queue))
         self._queue = []
 
+    @property
+    def _buffer(self) -> Optional[List[Any]]:
+        return getattr(self._local, 'buffer', None)
+
     @property
     def width(self) -> int:
         width = self._stdout.width
@@ -28,5 +28,14 @@ from .model.submodule import Submodule
 from .model.tag.tag import Tag
 from .model.branch.tracking_branch import TrackingBranch
 
+from .cache import GIT_CACHE, GitReadCache
+from .host_limits import HOST_LIMITS, HostLimit, HostLimits, TokenBucket
 from .offline import GitOffline
 from .online import GitOnline
+from .refs import RefStore, UnsupportedRefStoreError
+from .remote_refs import REMOTE_REFS, RemoteRefs, RemoteRefsCache
+from .retry import GIT_RETRY, is_transient_error
+from .snapshot import RepoSnapshot
+from .status import RepoStatus
+from .validation import RepoValidation
+from .worker import GIT_WORKERS, GitWorker, GitWorkerPool
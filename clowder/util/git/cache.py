@@ -0,0 +1,187 @@
+"""Command scoped cache of git reads
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import copy
+import inspect
+from functools import wraps
+from pathlib import Path
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .log import GIT_LOG
+
+CacheKey = Tuple[str, Tuple[Any, ...], Tuple[Tuple[str, Any], ...]]
+
+
+class GitReadCache:
+    """Memoized results of git queries, keyed by repo path
+
+    Results are only cached while enabled, which is for the duration of a single clowder command.
+    Any mutating git call for a repo drops the cached results for that repo, its parents and its children,
+    since e.g. a checkout in a submodule changes the status of the parent repo
+
+    :ivar bool enabled: Whether reads are cached
+    :ivar int hits: Number of reads served from the cache
+    :ivar int misses: Number of reads that queried git
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock: Lock = Lock()
+        self._entries: Dict[Path, Dict[CacheKey, Any]] = {}
+        self._generations: Dict[Path, int] = {}
+
+    def get(self, path: Path, key: CacheKey, load: Callable[[], Any]) -> Any:
+        """Get cached value, loading it if it isn't cached
+
+        :param Path path: Path to git repo
+        :param CacheKey key: Key of read for repo
+        :param Callable[[], Any] load: Function to load value
+        :return: Cached or loaded value
+        """
+
+        if not self.enabled:
+            return load()
+        path = self._normalize(path)
+        with self._lock:
+            entries = self._entries.get(path, None)
+            if entries is not None and key in entries:
+                self.hits += 1
+                return self._copy(entries[key])
+            self.misses += 1
+            generation = self._generations.setdefault(path, 0)
+        value = load()
+        with self._lock:
+            # Don't store results that raced with a mutation of the repo
+            if self._generations.get(path, 0) == generation:
+                self._entries.setdefault(path, {})[key] = value
+        return self._copy(value)
+
+    async def get_async(self, path: Path, key: CacheKey, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of :meth:`get`, awaiting load if the value isn't cached
+
+        :param Path path: Path to git repo
+        :param CacheKey key: Key of read for repo
+        :param Callable[[], Awaitable[Any]] load: Async function to load value
+        :return: Cached or loaded value
+        """
+
+        if not self.enabled:
+            return await load()
+        path = self._normalize(path)
+        with self._lock:
+            entries = self._entries.get(path, None)
+            if entries is not None and key in entries:
+                self.hits += 1
+                return self._copy(entries[key])
+            self.misses += 1
+            generation = self._generations.setdefault(path, 0)
+        value = await load()
+        with self._lock:
+            if self._generations.get(path, 0) == generation:
+                self._entries.setdefault(path, {})[key] = value
+        return self._copy(value)
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """Drop cached values
+
+        :param Optional[Path] path: Repo path to drop values for, along with its parents and children,
+            or all values if None
+        """
+
+        with self._lock:
+            if path is None:
+                self._entries = {}
+                self._generations = {p: g + 1 for p, g in self._generations.items()}
+                return
+            path = self._normalize(path)
+            paths = [p for p in self._generations.keys() if p == path or path in p.parents or p in path.parents]
+            for cached_path in paths:
+                self._entries.pop(cached_path, None)
+                self._generations[cached_path] += 1
+
+    def report(self) -> None:
+        if self.hits == 0 and self.misses == 0:
+            return
+        GIT_LOG.debug(f'git read cache: {self.hits} hits, {self.misses} misses')
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        # Callers are free to modify returned lists and dicts
+        if isinstance(value, (list, dict)):
+            return copy.deepcopy(value)
+        return value
+
+    @staticmethod
+    def _normalize(path: Path) -> Path:
+        return Path(path).absolute()
+
+
+GIT_CACHE: GitReadCache = GitReadCache()
+
+
+def cached_read(func: Callable) -> Callable:
+    """Cache results of classmethod taking repo path as the first argument, decorated before classmethod
+
+    Coroutine functions named ``<read>_async`` share cached results with the synchronous ``<read>``
+    """
+
+    if inspect.iscoroutinefunction(func):
+        name = func.__qualname__[:-len('_async')] if func.__qualname__.endswith('_async') else func.__qualname__
+
+        @wraps(func)
+        async def async_wrapper(cls, path: Path, *args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            if not GIT_CACHE.enabled or not _is_hashable(key):
+                return await func(cls, path, *args, **kwargs)
+            return await GIT_CACHE.get_async(path, key, lambda: func(cls, path, *args, **kwargs))
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(cls, path: Path, *args, **kwargs):
+        if not GIT_CACHE.enabled:
+            return func(cls, path, *args, **kwargs)
+        key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+        if not _is_hashable(key):
+            return func(cls, path, *args, **kwargs)
+        return GIT_CACHE.get(path, key, lambda: func(cls, path, *args, **kwargs))
+
+    return wrapper
+
+
+def invalidates_cache(func: Callable) -> Callable:
+    """Drop cached reads for repo after classmethod taking repo path as the first argument, decorated before
+    classmethod"""
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(cls, path: Path, *args, **kwargs):
+            try:
+                return await func(cls, path, *args, **kwargs)
+            finally:
+                GIT_CACHE.invalidate(path)
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(cls, path: Path, *args, **kwargs):
+        try:
+            return func(cls, path, *args, **kwargs)
+        finally:
+            GIT_CACHE.invalidate(path)
+
+    return wrapper
+
+
+def _is_hashable(value: Hashable) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
@@ -0,0 +1,368 @@
+"""Native git config reader
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import fnmatch
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+MAX_INCLUDE_DEPTH: int = 10
+
+ConfigEntry = Tuple[str, str]
+FileStat = Tuple[Path, int, int]
+
+
+class ConfigValues:
+    """Parsed git config values
+
+    Keys are canonicalized the same way as ``git config`` does: section and variable names are lowercased
+    and subsection names are left unchanged, e.g. ``remote.origin.url``
+
+    :ivar List[ConfigEntry] entries: Key value pairs in the order they were read
+    """
+
+    def __init__(self, entries: Optional[List[ConfigEntry]] = None):
+        self.entries: List[ConfigEntry] = [] if entries is None else entries
+        self._values: Dict[str, List[str]] = {}
+        for key, value in self.entries:
+            self._values.setdefault(key, []).append(value)
+
+    def __add__(self, other: 'ConfigValues') -> 'ConfigValues':
+        return ConfigValues(self.entries + other.entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self._canonical_key(key) in self._values
+
+    def get(self, key: str) -> Optional[str]:
+        """Get last value for key, matching ``git config --get``"""
+
+        values = self._values.get(self._canonical_key(key), None)
+        return values[-1] if values else None
+
+    def get_all(self, key: str) -> List[str]:
+        """Get all values for key, matching ``git config --get-all``"""
+
+        return list(self._values.get(self._canonical_key(key), []))
+
+    def subsections(self, section: str) -> Dict[str, Dict[str, List[str]]]:
+        """Get values grouped by subsection
+
+        :param str section: Section name, e.g. ``remote``
+        :return: Dict of subsection name to dict of variable name to values
+        """
+
+        prefix = f'{section.lower()}.'
+        results = {}
+        for key, value in self.entries:
+            if not key.startswith(prefix):
+                continue
+            subsection, _, variable = key[len(prefix):].rpartition('.')
+            if not subsection:
+                continue
+            results.setdefault(subsection, {}).setdefault(variable, []).append(value)
+        return results
+
+    def rewrite_url(self, url: str, push: bool = False) -> str:
+        """Apply ``url.<base>.insteadOf`` and ``url.<base>.pushInsteadOf`` rewrites to url
+
+        :param str url: Url to rewrite
+        :param bool push: Whether url is used for pushing
+        :return: Url with the longest matching prefix replaced
+        """
+
+        variables = ['pushinsteadof', 'insteadof'] if push else ['insteadof']
+        for variable in variables:
+            matches = []
+            for base, values in self.subsections('url').items():
+                matches += [(prefix, base) for prefix in values.get(variable, []) if url.startswith(prefix)]
+            if matches:
+                prefix, base = max(matches, key=lambda m: len(m[0]))
+                return f'{base}{url[len(prefix):]}'
+        return url
+
+    @staticmethod
+    def _canonical_key(key: str) -> str:
+        section, _, rest = key.partition('.')
+        subsection, _, variable = rest.rpartition('.')
+        if not subsection:
+            return f'{section.lower()}.{variable.lower()}'
+        return f'{section.lower()}.{subsection}.{variable.lower()}'
+
+
+class ConfigReader:
+    """Read git config files in process, following includes and caching parsed files by mtime"""
+
+    _cache: Dict[Tuple[Tuple[Path, ...], bool, Optional[Path]], Tuple[Tuple[FileStat, ...], ConfigValues]] = {}
+    _parsed: Dict[Path, Tuple[int, int, List[ConfigEntry]]] = {}
+    _lock: Lock = Lock()
+
+    @classmethod
+    def read_file(cls, file: Path, includes: bool = False, git_dir: Optional[Path] = None) -> ConfigValues:
+        """Read single config file, like ``git config --file``
+
+        :param Path file: Config file path
+        :param bool includes: Whether to follow ``include`` and ``includeIf`` directives
+        :param Optional[Path] git_dir: Git dir used to evaluate ``includeIf "gitdir:..."`` conditions
+        :return: Parsed config values, empty if file doesn't exist
+        """
+
+        return cls._read_cached((file,), includes, git_dir)
+
+    @classmethod
+    def read_repo(cls, git_dir: Path) -> ConfigValues:
+        """Read config for repo from system, global, local and worktree config files
+
+        :param Path git_dir: Git dir of repo
+        :return: Merged config values, with later files taking precedence
+        """
+
+        from .refs import RefStore
+        common_dir = RefStore._find_common_dir(git_dir)  # noqa
+        files = cls._system_files() + cls._global_files() + [common_dir / 'config']
+        worktree_config = git_dir / 'config.worktree'
+        if worktree_config.is_file():
+            values = cls._read_cached(tuple(files), True, git_dir)
+            if values.get('extensions.worktreeConfig') == 'true':
+                files.append(worktree_config)
+        return cls._read_cached(tuple(files), True, git_dir)
+
+    @classmethod
+    def parse(cls, text: str) -> List[ConfigEntry]:
+        """Parse config file contents
+
+        :param str text: Config file contents
+        :return: List of canonical key and value pairs
+        """
+
+        entries = []
+        section = None
+        index = 0
+        length = len(text)
+        while index < length:
+            char = text[index]
+            if char in ' \t\r\n':
+                index += 1
+            elif char in '#;':
+                index = cls._skip_line(text, index)
+            elif char == '[':
+                section, index = cls._parse_section(text, index + 1)
+            elif char.isalpha() and section is not None:
+                name_end = index
+                while name_end < length and (text[name_end].isalnum() or text[name_end] == '-'):
+                    name_end += 1
+                name = text[index:name_end].lower()
+                index = name_end
+                while index < length and text[index] in ' \t':
+                    index += 1
+                if index < length and text[index] == '=':
+                    value, index = cls._parse_value(text, index + 1)
+                else:
+                    # A variable with no value is a boolean true
+                    value = 'true'
+                    index = cls._skip_line(text, index)
+                entries.append((f'{section}.{name}', value))
+            else:
+                index = cls._skip_line(text, index)
+        return entries
+
+    @classmethod
+    def _read_cached(cls, files: Tuple[Path, ...], includes: bool, git_dir: Optional[Path]) -> ConfigValues:
+        key = (files, includes, git_dir)
+        with cls._lock:
+            cached = cls._cache.get(key, None)
+        if cached is not None and cls._stats_match(cached[0]):
+            return cached[1]
+        stats: List[FileStat] = []
+        entries = []
+        for file in files:
+            entries += cls._read(file, includes, git_dir, stats, 0)
+        values = ConfigValues(entries)
+        with cls._lock:
+            cls._cache[key] = (tuple(stats), values)
+        return values
+
+    @classmethod
+    def _read(cls, file: Path, includes: bool, git_dir: Optional[Path], stats: List[FileStat],
+              depth: int) -> List[ConfigEntry]:
+        try:
+            stat = file.stat()
+            stats.append((file, stat.st_mtime_ns, stat.st_size))
+            entries = cls._parse_cached(file, stat.st_mtime_ns, stat.st_size)
+        except (OSError, UnicodeDecodeError):
+            stats.append((file, -1, -1))
+            return []
+        if not includes or depth >= MAX_INCLUDE_DEPTH:
+            return entries
+        results = []
+        for key, value in entries:
+            results.append((key, value))
+            include_path = cls._include_path(file, key, value, git_dir)
+            if include_path is not None:
+                results += cls._read(include_path, includes, git_dir, stats, depth + 1)
+        return results
+
+    @classmethod
+    def _parse_cached(cls, file: Path, mtime: int, size: int) -> List[ConfigEntry]:
+        with cls._lock:
+            parsed = cls._parsed.get(file, None)
+        if parsed is not None and parsed[0] == mtime and parsed[1] == size:
+            return parsed[2]
+        entries = cls.parse(file.read_text())
+        with cls._lock:
+            cls._parsed[file] = (mtime, size, entries)
+        return entries
+
+    @classmethod
+    def _include_path(cls, file: Path, key: str, value: str, git_dir: Optional[Path]) -> Optional[Path]:
+        if key == 'include.path':
+            pass
+        elif key.startswith('includeif.') and key.endswith('.path'):
+            condition = key[len('includeif.'):-len('.path')]
+            if not cls._include_condition_matches(file, condition, git_dir):
+                return None
+        else:
+            return None
+        path = Path(os.path.expanduser(value))
+        if not path.is_absolute():
+            path = file.parent / path
+        return path
+
+    @classmethod
+    def _include_condition_matches(cls, file: Path, condition: str, git_dir: Optional[Path]) -> bool:
+        if git_dir is None:
+            return False
+        for prefix, case_sensitive in (('gitdir:', True), ('gitdir/i:', False)):
+            if not condition.startswith(prefix):
+                continue
+            pattern = os.path.expanduser(condition[len(prefix):])
+            if pattern.startswith('./'):
+                pattern = str(file.parent / pattern[2:])
+            elif not os.path.isabs(pattern):
+                pattern = f'**/{pattern}'
+            if pattern.endswith('/'):
+                pattern = f'{pattern}**'
+            target = f'{git_dir.resolve()}/'
+            if not case_sensitive:
+                pattern = pattern.lower()
+                target = target.lower()
+            return fnmatch.fnmatchcase(target, pattern) or fnmatch.fnmatchcase(target.rstrip('/'), pattern)
+        # Other conditions (onbranch, hasconfig) aren't evaluated
+        return False
+
+    @classmethod
+    def _stats_match(cls, stats: Tuple[FileStat, ...]) -> bool:
+        for path, mtime, size in stats:
+            try:
+                stat = path.stat()
+            except OSError:
+                if mtime != -1:
+                    return False
+                continue
+            if stat.st_mtime_ns != mtime or stat.st_size != size:
+                return False
+        return True
+
+    @classmethod
+    def _system_files(cls) -> List[Path]:
+        if 'GIT_CONFIG_NOSYSTEM' in os.environ:
+            return []
+        system_config = os.environ.get('GIT_CONFIG_SYSTEM', None)
+        if system_config is not None:
+            return [Path(system_config)]
+        return [Path('/etc/gitconfig')]
+
+    @classmethod
+    def _global_files(cls) -> List[Path]:
+        global_config = os.environ.get('GIT_CONFIG_GLOBAL', None)
+        if global_config is not None:
+            return [Path(global_config)]
+        xdg_config_home = os.environ.get('XDG_CONFIG_HOME', None)
+        xdg_config_home = Path.home() / '.config' if not xdg_config_home else Path(xdg_config_home)
+        return [xdg_config_home / 'git' / 'config', Path.home() / '.gitconfig']
+
+    @staticmethod
+    def _skip_line(text: str, index: int) -> int:
+        end = text.find('\n', index)
+        return len(text) if end == -1 else end + 1
+
+    @classmethod
+    def _parse_section(cls, text: str, index: int) -> Tuple[Optional[str], int]:
+        # Expected formats:
+        # [section]
+        # [section "subsection"]
+        # [section.subsection]
+        length = len(text)
+        start = index
+        while index < length and (text[index].isalnum() or text[index] in '-.'):
+            index += 1
+        name = text[start:index].lower()
+        if index < length and text[index] == ']':
+            section, _, subsection = name.partition('.')
+            return (name if not subsection else f'{section}.{subsection}'), index + 1
+        while index < length and text[index] in ' \t':
+            index += 1
+        if index >= length or text[index] != '"':
+            return None, cls._skip_line(text, index)
+        index += 1
+        subsection = []
+        while index < length and text[index] != '"':
+            if text[index] == '\n':
+                return None, index
+            if text[index] == '\\' and index + 1 < length:
+                index += 1
+            subsection.append(text[index])
+            index += 1
+        index += 1
+        if index >= length or text[index] != ']':
+            return None, cls._skip_line(text, index)
+        return f"{name}.{''.join(subsection)}", index + 1
+
+    @staticmethod
+    def _parse_value(text: str, index: int) -> Tuple[str, int]:
+        escapes = {'n': '\n', 't': '\t', 'b': '\b', '"': '"', '\\': '\\'}
+        length = len(text)
+        value = []
+        pending_space = []
+        quoted = False
+        while index < length:
+            char = text[index]
+            if char == '\n' and not quoted:
+                index += 1
+                break
+            if char in '#;' and not quoted:
+                end = text.find('\n', index)
+                index = length if end == -1 else end + 1
+                break
+            if char in ' \t\r' and not quoted:
+                # Whitespace is only kept when followed by more value characters
+                if value:
+                    pending_space.append(' ' if char == '\r' else char)
+                index += 1
+                continue
+            if char == '\\' and index + 1 < length:
+                following = text[index + 1]
+                index += 2
+                if following == '\n':
+                    continue
+                if following == '\r' and index < length and text[index] == '\n':
+                    index += 1
+                    continue
+                value += pending_space
+                pending_space = []
+                value.append(escapes.get(following, following))
+                continue
+            if char == '"':
+                value += pending_space
+                pending_space = []
+                quoted = not quoted
+                index += 1
+                continue
+            value += pending_space
+            pending_space = []
+            value.append(char)
+            index += 1
+        return ''.join(value), index
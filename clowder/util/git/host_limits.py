@@ -0,0 +1,273 @@
+"""Per host limits for network git commands
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import inspect
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import wraps
+from pathlib import Path
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .constants import ORIGIN
+
+
+class TokenBucket:
+    """Token bucket rate limit
+
+    :ivar float rate: Tokens added per second
+    :ivar float capacity: Max tokens, which is the number of commands that can start at once after being idle
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate: float = rate
+        self.capacity: float = max(rate, 1) if capacity is None else capacity
+        self._tokens: float = self.capacity
+        self._updated: float = time.monotonic()
+        self._lock: Lock = Lock()
+
+    def reserve(self) -> float:
+        """Take a token
+
+        Tokens can be taken ahead of time, so concurrent callers are queued in order
+
+        :return: Seconds to wait before the token is available
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+
+
+class HostLimit:
+    """Concurrency and rate limit for a single host
+
+    :ivar str host: Host name
+    :ivar Optional[int] jobs: Max concurrent network git commands, None for no limit
+    :ivar Optional[float] rate: Max network git commands started per second, None for no limit
+    """
+
+    def __init__(self, host: str, jobs: Optional[int] = None, rate: Optional[float] = None):
+        self.host: str = host
+        self.jobs: Optional[int] = jobs
+        self.rate: Optional[float] = rate
+        self._semaphore: Optional[BoundedSemaphore] = None if jobs is None else BoundedSemaphore(max(jobs, 1))
+        self._bucket: Optional[TokenBucket] = None if rate is None else TokenBucket(rate)
+        self._lock: Lock = Lock()
+        self._waiters: Optional[Tuple[Any, Any]] = None
+
+    def acquire(self) -> None:
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        if self._bucket is not None:
+            delay = self._bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        import trio
+
+        if self._semaphore is not None:
+            await self._acquire_semaphore_async()
+        if self._bucket is not None:
+            delay = self._bucket.reserve()
+            if delay > 0:
+                await trio.sleep(delay)
+
+    def release(self) -> None:
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    async def _acquire_semaphore_async(self) -> None:
+        """Wait for a host slot in a worker thread, since the semaphore is shared with commands run in threads
+
+        At most jobs threads wait at once, further tasks wait on a trio limiter without waking the event loop. A slot
+        the thread gets after the task was cancelled is released again
+        """
+
+        import trio
+
+        lock = Lock()
+        state = {'acquired': False, 'abandoned': False}
+
+        def acquire() -> None:
+            self._semaphore.acquire()
+            with lock:
+                if state['abandoned']:
+                    self._semaphore.release()
+                else:
+                    state['acquired'] = True
+
+        try:
+            await trio.to_thread.run_sync(acquire, cancellable=True, limiter=self._waiters_limiter())
+        except trio.Cancelled:
+            with lock:
+                if state['acquired']:
+                    self._semaphore.release()
+                state['abandoned'] = True
+            raise
+
+    def _waiters_limiter(self) -> Any:
+        """Limiter of threads waiting for a host slot, created for each trio run"""
+
+        import trio
+
+        token = trio.lowlevel.current_trio_token()
+        with self._lock:
+            if self._waiters is None or self._waiters[0] is not token:
+                self._waiters = (token, trio.CapacityLimiter(max(self.jobs, 1)))
+            return self._waiters[1]
+
+
+class HostLimits:
+    """Limits of network git commands keyed by host, configured from clowder sources
+
+    Hosts without a configured limit aren't limited
+    """
+
+    def __init__(self):
+        self._lock: Lock = Lock()
+        self._limits: Dict[str, HostLimit] = {}
+
+    @property
+    def has_limits(self) -> bool:
+        return bool(self._limits)
+
+    def configure(self, host: str, jobs: Optional[int] = None, rate: Optional[float] = None) -> None:
+        """Set limits for host
+
+        :param str host: Host name, e.g. the url of a clowder source
+        :param Optional[int] jobs: Max concurrent network git commands, None for no limit
+        :param Optional[float] rate: Max network git commands started per second, None for no limit
+        """
+
+        host = host.lower()
+        with self._lock:
+            if jobs is None and rate is None:
+                self._limits.pop(host, None)
+                return
+            self._limits[host] = HostLimit(host, jobs=jobs, rate=rate)
+
+    def get(self, url: Optional[str]) -> Optional[HostLimit]:
+        """Get limit of host of url
+
+        :param Optional[str] url: Git url, or host name
+        :return: Limit, or None if host isn't limited
+        """
+
+        host = url_host(url)
+        if host is None:
+            return None
+        with self._lock:
+            return self._limits.get(host, None)
+
+    @contextmanager
+    def limit(self, url: Optional[str]):
+        """Hold a slot of the host of url while running a network git command
+
+        :param Optional[str] url: Git url, or host name
+        """
+
+        host_limit = self.get(url)
+        if host_limit is None:
+            yield
+            return
+        host_limit.acquire()
+        try:
+            yield
+        finally:
+            host_limit.release()
+
+    @asynccontextmanager
+    async def limit_async(self, url: Optional[str]):
+        """Async version of :meth:`limit` for use from a trio event loop
+
+        :param Optional[str] url: Git url, or host name
+        """
+
+        host_limit = self.get(url)
+        if host_limit is None:
+            yield
+            return
+        await host_limit.acquire_async()
+        try:
+            yield
+        finally:
+            host_limit.release()
+
+
+HOST_LIMITS: HostLimits = HostLimits()
+
+
+def url_host(url: Optional[str]) -> Optional[str]:
+    """Get host of git url
+
+    :param Optional[str] url: Git url, e.g. ``https://github.com/JrGoodle/clowder.git`` or
+        ``git@github.com:JrGoodle/clowder.git``, or host name
+    :return: Lowercase host name, or None for local paths
+    """
+
+    if not url:
+        return None
+    if '://' in url:
+        scheme, netloc, _, _, _ = urlsplit(url)
+        if scheme == 'file' or not netloc:
+            return None
+        return netloc.rpartition('@')[2].split(':')[0].lower() or None
+    if url.startswith(('/', '.', '~')):
+        return None
+    # scp-like syntax, [user@]host:path
+    host, separator, _ = url.partition(':')
+    if separator and '/' not in host:
+        return host.rpartition('@')[2].lower() or None
+    if '/' in url:
+        return None
+    return url.lower()
+
+
+def limited_by_host(func: Callable) -> Callable:
+    """Hold a slot of the remote's host while running classmethod taking repo path as the first argument,
+    decorated before classmethod
+
+    The remote is read from the ``url`` argument if the method has one, otherwise from the ``remote`` argument,
+    defaulting to origin
+    """
+
+    signature = inspect.signature(func)
+
+    def target_url(cls, path: Path, *args, **kwargs) -> Optional[str]:
+        arguments = signature.bind(cls, path, *args, **kwargs).arguments
+        url = arguments.get('url', None)
+        if url is not None:
+            return url
+        remote = arguments.get('remote', None)
+        from .remote_refs import remote_url
+        return remote_url(path, ORIGIN if remote is None else remote)
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(cls, path: Path, *args, **kwargs):
+            if not HOST_LIMITS.has_limits:
+                return await func(cls, path, *args, **kwargs)
+            async with HOST_LIMITS.limit_async(target_url(cls, path, *args, **kwargs)):
+                return await func(cls, path, *args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(cls, path: Path, *args, **kwargs):
+        if not HOST_LIMITS.has_limits:
+            return func(cls, path, *args, **kwargs)
+        with HOST_LIMITS.limit(target_url(cls, path, *args, **kwargs)):
+            return func(cls, path, *args, **kwargs)
+
+    return wrapper
@@ -29,8 +29,7 @@ class LocalBranch(Branch):
     @property
     def is_tracking_branch(self) -> bool:
         from clowder.util.git.model.factory import GitFactory
-        branches = GitFactory.get_tracking_branches(self.path)
-        return any([branch.name == self.name for branch in branches])
+        return GitFactory.has_tracking_branch(self.path, self.name)
 
     @property
     def sha(self) -> Optional[str]:
@@ -5,10 +5,11 @@
 """
 
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from clowder.util.git.offline import GitOffline
 from clowder.util.git.online import GitOnline
+from clowder.util.git.snapshot import RepoSnapshot
 
 from .change import Change
 from .diff import Diff
@@ -26,8 +27,9 @@ class AllBranches:
     def __init__(self, local_branches: List[LocalBranch], remote_branches: List[RemoteBranch],
                  tracking_branches: List[TrackingBranch]):
 
-        local_branches = [b for b in local_branches if not b.is_tracking_branch]
-        remote_branches = [b for b in remote_branches if not b.is_tracking_branch]
+        tracking_branch_names = {b.name for b in tracking_branches}
+        local_branches = [b for b in local_branches if b.name not in tracking_branch_names]
+        remote_branches = [b for b in remote_branches if b.name not in tracking_branch_names]
         self.local_branches: Tuple[LocalBranch, ...] = tuple(local_branches)
         self.remote_branches: Tuple[RemoteBranch, ...] = tuple(remote_branches)
         self.tracking_branches: Tuple[TrackingBranch, ...] = tuple(tracking_branches)
@@ -35,6 +37,10 @@ class AllBranches:
 
 class GitFactory:
 
+    @classmethod
+    def get_snapshot(cls, path: Path) -> RepoSnapshot:
+        return GitOffline.get_snapshot(path)
+
     @classmethod
     def get_diff(cls, path: Path) -> Diff:
         diff_info = GitOffline.get_diff_index_info(path)
@@ -76,15 +82,15 @@ class GitFactory:
         return remotes[0] if remotes else None
 
     @classmethod
-    def get_local_branches(cls, path: Path) -> List[LocalBranch]:
-        branches = GitOffline.get_local_branches_info(path)
-        branches = [LocalBranch(path, branch) for branch in branches]
+    def get_local_branches(cls, path: Path, snapshot: Optional[RepoSnapshot] = None) -> List[LocalBranch]:
+        snapshot = GitFactory.get_snapshot(path) if snapshot is None else snapshot
+        branches = [LocalBranch(path, branch) for branch in snapshot.local_branches.keys()]
         return sorted(branches)
 
     @classmethod
     def get_local_tags(cls, path: Path) -> List[LocalTag]:
-        tags = GitOffline.get_local_tags_info(path)
-        tags = [LocalTag(path, tag) for tag in tags]
+        snapshot = GitFactory.get_snapshot(path)
+        tags = [LocalTag(path, tag) for tag in snapshot.tags.keys()]
         return sorted(tags)
 
     @classmethod
@@ -120,24 +126,18 @@ class GitFactory:
         return submodule is not None
 
     @classmethod
-    def get_tracking_branches(cls, path: Path) -> List[TrackingBranch]:
-        branches = GitOffline.get_tracking_branches_info(path)
-        tracking_branches = []
-        for local_branch, info in branches.items():
-            tracking_branch = TrackingBranch(path,
-                                             local_branch=local_branch,
-                                             upstream_branch=info['upstream_branch'],
-                                             upstream_remote=info['upstream_remote'],
-                                             push_branch=info['push_branch'],
-                                             push_remote=info['push_remote'])
-            tracking_branches.append(tracking_branch)
+    def get_tracking_branches(cls, path: Path, snapshot: Optional[RepoSnapshot] = None) -> List[TrackingBranch]:
+        snapshot = GitFactory.get_snapshot(path) if snapshot is None else snapshot
+        branches = snapshot.get_tracking_branches_info()
+        tracking_branches = [GitFactory._tracking_branch(path, branch, info) for branch, info in branches.items()]
         return sorted(tracking_branches)
 
     @classmethod
     def get_all_branches(cls, path: Path, online: bool = False) -> AllBranches:
-        local_branches = GitFactory.get_local_branches(path)
-        remote_branches = GitFactory.get_all_remote_branches(path, online=online)
-        tracking_branches = GitFactory.get_tracking_branches(path)
+        snapshot = GitFactory.get_snapshot(path)
+        local_branches = GitFactory.get_local_branches(path, snapshot=snapshot)
+        remote_branches = GitFactory.get_all_remote_branches(path, online=online, snapshot=snapshot)
+        tracking_branches = GitFactory.get_tracking_branches(path, snapshot=snapshot)
         return AllBranches(
             local_branches=local_branches,
             remote_branches=remote_branches,
@@ -145,15 +145,23 @@ class GitFactory:
         )
 
     @classmethod
-    def get_all_remote_branches(cls, path: Path, online: bool = False) -> List[RemoteBranch]:
+    def get_all_remote_branches(cls, path: Path, online: bool = False,
+                                snapshot: Optional[RepoSnapshot] = None) -> List[RemoteBranch]:
+        if not online and snapshot is None:
+            snapshot = GitFactory.get_snapshot(path)
         branches = []
         for remote in GitFactory.get_remotes(path):
-            branches += remote.branches(online=online)
+            if online:
+                branches += remote.branches(online=online)
+            else:
+                branches += GitFactory.get_remote_branches_offline(path, remote.name, snapshot=snapshot)
         return sorted(branches)
 
     @classmethod
-    def get_remote_branches_offline(cls, path: Path, remote: str) -> List[RemoteBranch]:
-        branches, default_branch = GitOffline.get_remote_branches_info(path, remote)
+    def get_remote_branches_offline(cls, path: Path, remote: str,
+                                    snapshot: Optional[RepoSnapshot] = None) -> List[RemoteBranch]:
+        snapshot = GitFactory.get_snapshot(path) if snapshot is None else snapshot
+        branches, default_branch = snapshot.get_remote_branches(remote)
         branches = [RemoteBranch(path, branch, remote) for branch in branches]
         if default_branch is not None:
             branches.append(RemoteBranch(path, default_branch, remote, is_default=True))
@@ -180,25 +188,25 @@ class GitFactory:
 
     @classmethod
     def get_local_branch(cls, path: Path, branch: str) -> Optional[LocalBranch]:
-        branches = GitFactory.get_local_branches(path)
-        branch = [b for b in branches if b.name == branch]
-        return branch[0] if branch else None
+        if not GitFactory.get_snapshot(path).has_local_branch(branch):
+            return None
+        return LocalBranch(path, branch)
 
     @classmethod
     def has_local_branch(cls, path: Path, branch: str) -> bool:
-        branch = GitFactory.get_local_branch(path, branch)
-        return branch is not None
+        return GitFactory.get_snapshot(path).has_local_branch(branch)
 
     @classmethod
     def get_remote_branch_offline(cls, path: Path, branch: str, remote: str) -> Optional[RemoteBranch]:
-        branches = GitFactory.get_remote_branches_offline(path, remote)
-        branch = [b for b in branches if b.name == branch]
-        return branch[0] if branch else None
+        snapshot = GitFactory.get_snapshot(path)
+        if not snapshot.has_remote_branch(branch, remote):
+            return None
+        is_default = snapshot.remote_default_branches.get(remote, None) == branch
+        return RemoteBranch(path, branch, remote, is_default=is_default)
 
     @classmethod
     def has_remote_branch_offline(cls, path: Path, branch: str, remote: str) -> bool:
-        branch = GitFactory.get_remote_branch_offline(path, branch, remote)
-        return branch is not None
+        return GitFactory.get_snapshot(path).has_remote_branch(branch, remote)
 
     @classmethod
     def has_remote_branch_online(cls, path: Path, branch: str, remote: str, url: Optional[str] = None) -> bool:
@@ -214,28 +222,27 @@ class GitFactory:
 
     @classmethod
     def get_tracking_branch(cls, path: Path, branch: str, remote: Optional[str] = None) -> Optional[TrackingBranch]:
-        branches = GitFactory.get_tracking_branches(path)
-        branch = [b for b in branches if b.name == branch]
-        if remote is None:
-            return branch[0] if branch else None
-        branch = [b for b in branch if b.upstream_branch.remote.name == remote]
-        return branch[0] if branch else None
+        info = GitFactory.get_snapshot(path).get_tracking_branches_info().get(branch, None)
+        if info is None:
+            return None
+        tracking_branch = GitFactory._tracking_branch(path, branch, info)
+        if remote is not None and tracking_branch.upstream_branch.remote.name != remote:
+            return None
+        return tracking_branch
 
     @classmethod
     def has_tracking_branch(cls, path: Path, branch: str) -> bool:
-        branch = GitFactory.get_tracking_branch(path, branch)
-        return branch is not None
+        return GitOffline.has_tracking_branch(path, branch)
 
     @classmethod
     def get_local_tag(cls, path: Path, tag: str) -> Optional[LocalTag]:
-        tags = GitFactory.get_local_tags(path)
-        tag = [t for t in tags if t.name == tag]
-        return tag[0] if tag else None
+        if not GitFactory.get_snapshot(path).has_local_tag(tag):
+            return None
+        return LocalTag(path, tag)
 
     @classmethod
     def has_local_tag(cls, path: Path, tag: str) -> bool:
-        tag = GitFactory.get_local_tag(path, tag)
-        return tag is not None
+        return GitFactory.get_snapshot(path).has_local_tag(tag)
 
     @classmethod
     def get_remote_tag(cls, path: Path, tag: str, remote: str, url: Optional[str] = None) -> Optional[RemoteTag]:
@@ -247,3 +254,12 @@ class GitFactory:
     def has_remote_tag(cls, path: Path, tag: str, remote: str, url: Optional[str] = None) -> bool:
         tag = GitFactory.get_remote_tag(path, tag=tag, remote=remote, url=url)
         return tag is not None
+
+    @classmethod
+    def _tracking_branch(cls, path: Path, branch: str, info: Dict[str, Optional[str]]) -> TrackingBranch:
+        return TrackingBranch(path,
+                              local_branch=branch,
+                              upstream_branch=info['upstream_branch'],
+                              upstream_remote=info['upstream_remote'],
+                              push_branch=info['push_branch'],
+                              push_remote=info['push_remote'])
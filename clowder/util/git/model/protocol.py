@@ -14,6 +14,17 @@ class Protocol(AutoLowerName):
     SSH = auto()
     HTTPS = auto()
 
+    @property
+    def port(self) -> int:
+        """Default port of git host for protocol"""
+
+        if self is Protocol.SSH:
+            return 22
+        elif self is Protocol.HTTPS:
+            return 443
+        else:
+            raise UnknownEnumCaseError('Invalid git protocol')
+
     def format_url(self, url: str, name: str) -> str:
         """Return formatted git url
 
@@ -93,7 +93,7 @@ class Remote:
     def fetch(self, prune: bool = False, prune_tags: bool = False, tags: bool = False,
               depth: Optional[int] = None, branch: Optional[str] = None, unshallow: bool = False,
               jobs: Optional[int] = None, fetch_all: bool = False, check: bool = True,
-              print_output: bool = True) -> None:
+              print_output: Optional[bool] = None) -> None:
         output = self.name
         if branch is not None:
             branch = branch
@@ -109,6 +109,25 @@ class Remote:
                 raise
             CONSOLE.stdout(f' - {message}')
 
+    async def fetch_async(self, prune: bool = False, prune_tags: bool = False, tags: bool = False,
+                          depth: Optional[int] = None, branch: Optional[str] = None, unshallow: bool = False,
+                          jobs: Optional[int] = None, fetch_all: bool = False, check: bool = True,
+                          print_output: Optional[bool] = None) -> None:
+        output = self.name
+        if branch is not None:
+            output = f'{output} {branch}'
+        CONSOLE.stdout(f'Fetch from {output}')
+        try:
+            await GitOnline.fetch_async(self.path, remote=self.name, prune=prune, prune_tags=prune_tags, tags=tags,
+                                        depth=depth, branch=branch, unshallow=unshallow, jobs=jobs,
+                                        fetch_all=fetch_all, print_output=print_output)
+        except Exception:  # noqa
+            message = f'Failed to fetch from {output}'
+            if check:
+                GIT_LOG.error(message)
+                raise
+            CONSOLE.stdout(f' - {message}')
+
     def print_branches(self) -> None:
         raise NotImplementedError
 
@@ -26,6 +26,9 @@ from .tag.local_tag import LocalTag
 from .tag.remote_tag import RemoteTag
 
 if TYPE_CHECKING:
+    from clowder.util.git.snapshot import RepoSnapshot
+    from clowder.util.git.status import RepoStatus
+    from clowder.util.git.validation import RepoValidation
     from .diff import Diff
     from .submodule import Submodule
     from .factory import AllBranches
@@ -88,6 +91,16 @@ class Repo:
     def is_rebase_in_progress(self) -> bool:
         return GitOffline.is_rebase_in_progress(self.path)
 
+    def get_status(self) -> 'RepoStatus':
+        return GitOffline.get_status(self.path)
+
+    async def get_status_async(self) -> 'RepoStatus':
+        return await GitOffline.get_status_async(self.path)
+
+    def get_snapshot(self) -> 'RepoSnapshot':
+        from clowder.util.git.model.factory import GitFactory
+        return GitFactory.get_snapshot(self.path)
+
     def get_remotes(self) -> List[Remote]:
         from clowder.util.git.model.factory import GitFactory
         return GitFactory.get_remotes(self.path)
@@ -217,16 +230,22 @@ class Repo:
         :return: True, if repo not dirty or doesn't exist on disk
         """
 
-        if not self.exists:
-            return allow_missing
+        return self.get_validation().is_valid(allow_missing=allow_missing)
 
-        if self.is_dirty or self.is_rebase_in_progress or self.has_untracked_files:
-            return False
+    def get_validation(self) -> 'RepoValidation':
+        """Read status of repo and submodules needed to validate it
 
-        submodules = self.get_submodules()
-        if not submodules:
-            return True
-        return all([s.is_valid(allow_missing=allow_missing) for s in submodules])
+        Submodules are listed recursively once, so nested submodules aren't scanned again for each parent
+
+        :return: Repo validation
+        """
+
+        from clowder.util.git.validation import RepoValidation
+        if not self.exists:
+            return RepoValidation(self.path, False)
+        submodules = [RepoValidation(s.path, s.exists, s.get_status() if s.exists else None)
+                      for s in self.get_submodules()]
+        return RepoValidation(self.path, True, self.get_status(), submodules)
 
     def remote(self, name: str) -> Optional[Remote]:
         from clowder.util.git.model.factory import GitFactory
@@ -379,10 +398,15 @@ class Repo:
             else:
                 CONSOLE.stdout(branch)
 
-    def print_validation(self, allow_missing: bool = False) -> None:
-        """Print validation message"""
+    def print_validation(self, allow_missing: bool = False, validation: Optional['RepoValidation'] = None) -> None:
+        """Print validation message
 
-        if not self.exists or self.is_valid(allow_missing=allow_missing):
+        :param bool allow_missing: Whether to allow validation to succeed with missing repo
+        :param Optional[RepoValidation] validation: Validation already read for repo, read again if None
+        """
+
+        validation = self.get_validation() if validation is None else validation
+        if not validation.exists or validation.is_valid(allow_missing=allow_missing):
             return
         self.status()
         CONSOLE.stdout(f'Dirty repo. Please stash, commit, or discard your changes')
@@ -399,22 +423,27 @@ class Repo:
     def formatted_ref(self) -> str:
         """Formatted project repo ref"""
 
-        if self.is_detached:
-            return Format.Git.ref(Format.escape(f'[HEAD @ {self.sha()}]'))
+        return self.format_ref(self.get_status())
 
-        current_branch_output = Format.Git.ref(Format.escape(f'[{self.current_branch}]'))
+    @staticmethod
+    def format_ref(status: 'RepoStatus') -> str:
+        """Format repo ref from status
 
-        local_commits_count = GitOffline.new_commits_count(self.path)
-        no_local_commits = local_commits_count == 0
-        # TODO: Specify correct remote
-        upstream_commits_count = GitOffline.new_commits_count(self.path, upstream=True)
-        no_upstream_commits = upstream_commits_count == 0
+        :param RepoStatus status: Repo status
+        :return: Current branch with new local and upstream commit counts, or detached HEAD sha
+        """
+
+        if status.is_detached:
+            return Format.Git.ref(Format.escape(f'[HEAD @ {status.sha}]'))
 
-        if no_local_commits and no_upstream_commits:
+        current_branch_output = Format.Git.ref(Format.escape(f'[{status.current_branch}]'))
+
+        # TODO: Specify correct remote
+        if status.ahead == 0 and status.behind == 0:
             return current_branch_output
 
-        local_commits_output = Format.yellow(f'+{local_commits_count}')
-        upstream_commits_output = Format.red(f'-{upstream_commits_count}')
+        local_commits_output = Format.yellow(f'+{status.ahead}')
+        upstream_commits_output = Format.red(f'-{status.behind}')
         return f'{current_branch_output}({local_commits_output}/{upstream_commits_output})'
 
     def print_remote_branches(self) -> None:
@@ -435,12 +464,13 @@ class Repo:
     def fetch(self, prune: bool = False, prune_tags: bool = False, tags: bool = False,
               depth: Optional[int] = None, remote: Optional[str] = None, branch: Optional[str] = None,
               unshallow: bool = False, jobs: Optional[int] = None, fetch_all: bool = False, check: bool = True,
-              print_output: bool = True):
+              print_output: Optional[bool] = None):
         # FIXME: Consolidate this implementation with the one for Remotes
         CONSOLE.stdout(f' - Fetch repo')
         try:
             GitOnline.fetch(self.path, remote=remote, prune=prune, prune_tags=prune_tags, tags=tags, depth=depth,
-                            branch=branch, unshallow=unshallow, jobs=jobs, fetch_all=fetch_all, print_output=print_output)
+                            branch=branch, unshallow=unshallow, jobs=jobs, fetch_all=fetch_all,
+                            print_output=print_output)
         except Exception:  # noqa
             message = f'Failed to fetch repo'
             if check:
@@ -1,6 +1,7 @@
 """Misc git utils"""
 
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from subprocess import CalledProcessError, CompletedProcess
 from typing import Dict, List, Optional, Tuple
@@ -9,8 +10,14 @@ import clowder.util.command as cmd
 import clowder.util.filesystem as fs
 from clowder.util.format import Format
 
+from .cache import cached_read, invalidates_cache
+from .config_reader import ConfigReader, ConfigValues
 from .constants import HEAD, FETCH_URL, PUSH_URL
 from .process_output import ProcessOutput
+from .refs import RefStore, UnsupportedRefStoreError
+from .snapshot import RepoSnapshot
+from .status import RepoStatus
+from .worker import GIT_WORKERS
 
 
 class GitOffline:
@@ -30,14 +37,42 @@ class GitOffline:
         return remotes[remote][PUSH_URL]
 
     @classmethod
+    @cached_read
     def get_remotes_info(cls, path: Path) -> Dict[str, Dict[str, str]]:
-        output = cmd.get_stdout('git remote -v', cwd=path)
-        if output is None:
+        config = GitOffline.get_repo_config(path)
+        if config is None:
             return {}
-        remotes = ProcessOutput.remotes(output)
+        remotes = {}
+        for name, values in config.subsections('remote').items():
+            urls = values.get('url', [])
+            if not urls:
+                continue
+            push_urls = values.get('pushurl', [])
+            if push_urls:
+                push_url = config.rewrite_url(push_urls[-1])
+            else:
+                push_url = config.rewrite_url(urls[-1], push=True)
+            remotes[name] = {
+                FETCH_URL: config.rewrite_url(urls[0]),
+                PUSH_URL: push_url
+            }
         return remotes
 
     @classmethod
+    def get_repo_config(cls, path: Path) -> Optional[ConfigValues]:
+        """Get git config values for repo, read in process and cached until config files change
+
+        :param Path path: Path to git repo
+        :return: Config values from system, global and repo config files, or None if path isn't a repo
+        """
+
+        git_dir = GitOffline.git_dir(path)
+        if git_dir is None:
+            return None
+        return ConfigReader.read_repo(git_dir)
+
+    @classmethod
+    @cached_read
     def get_remote_url(cls, path: Path, remote_name: str) -> Optional[str]:
         """Get url of remote
 
@@ -46,18 +81,26 @@ class GitOffline:
         :return: URL of remote
         """
 
-        return cmd.get_stdout(f'git remote get-url {remote_name}', cwd=path)
+        config = GitOffline.get_repo_config(path)
+        if config is None:
+            return None
+        urls = config.get_all(f'remote.{remote_name}.url')
+        if not urls:
+            return None
+        return config.rewrite_url(urls[0])
 
     @classmethod
+    @invalidates_cache
     def create_remote(cls, path: Path, name: str, url: str, fetch: bool = False, tags: bool = False) -> None:
-        args = ''
+        args = []
         if fetch:
-            args += ' -f '
+            args += ['-f']
         if tags:
-            args += ' --tags '
-        cmd.run_silent(f'git remote add {name} {url}', cwd=path)
+            args += ['--tags']
+        cmd.run_silent(['git', 'remote', 'add', name, url], cwd=path)
 
     @classmethod
+    @cached_read
     def find_rev_by_timestamp(cls, path: Path, timestamp: str, ref: str, author: Optional[str] = None) -> Optional[str]:
         """Find rev by timestamp
 
@@ -68,30 +111,33 @@ class GitOffline:
         :return: Commit sha at or before timestamp
         """
 
-        args = ''
+        args = []
         if author is not None:
-            args += f' --author {author} '
-        return cmd.get_stdout(f'git log -1 --format=%H --before={timestamp} {ref}', cwd=path)
+            args += ['--author', author]
+        return cmd.get_stdout(['git', 'log', '-1', '--format=%H', f'--before={timestamp}', ref], cwd=path)
 
     @classmethod
+    @invalidates_cache
     def install_lfs_hooks(cls, path: Path, local: bool = False) -> CompletedProcess:
         """Install git lfs hooks"""
 
-        args = ''
+        args = []
         if local:
-            args = ' --local '
-        return cmd.run(f'git lfs install {args}', cwd=path)
+            args = ['--local']
+        return cmd.run(['git', 'lfs', 'install'] + args, cwd=path)
 
     @classmethod
+    @invalidates_cache
     def rename_remote(cls, path: Path, old_name: str, new_name: str) -> CompletedProcess:
-        return cmd.run(f'git remote rename {old_name} {new_name}', cwd=path)
+        return cmd.run(['git', 'remote', 'rename', old_name, new_name], cwd=path)
 
     @classmethod
+    @cached_read
     def get_default_branch(cls, path: Path, remote: str) -> Optional[str]:
         """Get default branch from local repo"""
 
         try:
-            command = f'git symbolic-ref refs/remotes/{remote}/{HEAD}'
+            command = ['git', 'symbolic-ref', f'refs/remotes/{remote}/{HEAD}']
             output = cmd.get_stdout(command, cwd=path)
             if output is None:
                 return None
@@ -103,6 +149,7 @@ class GitOffline:
             return None
 
     @classmethod
+    @invalidates_cache
     def save_default_branch(cls, git_dir: Path, remote: str, branch: str) -> None:
         """Save default branch"""
 
@@ -116,10 +163,11 @@ class GitOffline:
             remote_head_ref.write_text(contents)
 
     @classmethod
+    @cached_read
     def current_timestamp(cls, path: Path) -> Optional[str]:
         """Current timestamp of HEAD commit"""
 
-        return cmd.get_stdout('git log -1 --format=%cI', cwd=path)
+        return cmd.get_stdout(['git', 'log', '-1', '--format=%cI'], cwd=path)
 
     @classmethod
     def is_repo_cloned(cls, path: Path) -> bool:
@@ -136,22 +184,43 @@ class GitOffline:
 
     @classmethod
     def is_dirty(cls, path: Path) -> bool:
-        GitOffline.update_index(path, refresh=True)
-        changes = GitOffline.diff_index(path)
-        return changes is not None
+        return GitOffline.get_status(path).is_dirty
+
+    @classmethod
+    @cached_read
+    def get_status(cls, path: Path) -> RepoStatus:
+        """Get branch, upstream, ahead/behind counts and working tree state from a single git process
+
+        :param Path path: Path to git repo
+        :return: Repo status
+        """
+
+        return RepoStatus.load(path)
+
+    @classmethod
+    @cached_read
+    async def get_status_async(cls, path: Path) -> RepoStatus:
+        """Async version of :meth:`get_status`, sharing its cached results
+
+        :param Path path: Path to git repo
+        :return: Repo status
+        """
+
+        return await RepoStatus.load_async(path)
 
     @classmethod
     def diff_index(cls, path: Path, treeish: str = HEAD) -> Optional[str]:
-        return cmd.get_stdout(f'git diff-index {treeish}', cwd=path)
+        return cmd.get_stdout(['git', 'diff-index', treeish], cwd=path)
 
     @classmethod
     def update_index(cls, path: Path, refresh: bool = False) -> CompletedProcess:
-        args = ''
+        args = []
         if refresh:
-            args += ' --refresh '
-        return cmd.run_silent(f'git update-index {args}', path)
+            args += ['--refresh']
+        return cmd.run_silent(['git', 'update-index'] + args, path)
 
     @classmethod
+    @cached_read
     def get_diff_index_info(cls, path: Path) -> Dict[str, List[Dict[str, str]]]:
         GitOffline.update_index(path, refresh=True)
         output = GitOffline.diff_index(path)
@@ -159,35 +228,48 @@ class GitOffline:
 
     @classmethod
     def is_rebase_in_progress(cls, path: Path) -> bool:
-        rebase_merge = path / ".git" / "rebase-merge"
-        rebase_apply = path / ".git" / "rebase-apply"
+        git_dir = GitOffline.git_dir(path)
+        if git_dir is None:
+            return False
+        rebase_merge = git_dir / "rebase-merge"
+        rebase_apply = git_dir / "rebase-apply"
         rebase_merge_exists = rebase_merge.exists() and rebase_merge.is_dir()
         rebase_apply_exists = rebase_apply.exists() and rebase_apply.is_dir()
         return rebase_merge_exists or rebase_apply_exists
 
     @classmethod
+    @cached_read
     def get_local_branches_info(cls, path: Path) -> List[str]:
-        output = cmd.get_stdout("git branch", cwd=path)
+        ref_store = GitOffline._ref_store(path)
+        if ref_store is not None:
+            return sorted(ref_store.refs('refs/heads/').keys())
+        output = cmd.get_stdout(['git', 'branch'], cwd=path)
         if output is None:
             return []
         branches = ProcessOutput.local_branches(output)
         return branches
 
     @classmethod
+    @cached_read
     def get_local_tags_info(cls, path: Path) -> Dict[str, str]:
-        output = cmd.get_stdout("git show-ref --tags", cwd=path)
+        ref_store = GitOffline._ref_store(path)
+        if ref_store is not None:
+            return ref_store.refs('refs/tags/')
+        output = cmd.get_stdout(['git', 'show-ref', '--tags'], cwd=path)
         if output is None:
             return {}
         return ProcessOutput.tag_shas(output)
 
     @classmethod
+    @cached_read
     def get_untracked_files(cls, path: Path) -> List[Path]:
-        output = cmd.get_stdout('git ls-files . --exclude-standard --others', cwd=path)
+        output = cmd.get_stdout(['git', 'ls-files', '.', '--exclude-standard', '--others'], cwd=path)
         if output is None:
             return []
         return [Path(line.strip()) for line in output.splitlines()]
 
     @classmethod
+    @cached_read
     def new_commits_count(cls, path: Path, upstream: bool = False) -> int:
         """Returns the number of new commits
 
@@ -205,7 +287,7 @@ class GitOffline:
             local_sha = GitOffline.get_branch_sha(path, local_branch)
             remote_sha = GitOffline.get_branch_sha(path, upstream_branch[0], remote=upstream_branch[1])
             commits = f'{local_sha}...{remote_sha}'
-            output = cmd.get_stdout(f'git rev-list --count --left-right {commits}', cwd=path)
+            output = cmd.get_stdout(['git', 'rev-list', '--count', '--left-right', commits], cwd=path)
             if output is None:
                 return 0
             index = 1 if upstream else 0
@@ -237,14 +319,16 @@ class GitOffline:
             path = path.parent
 
     @classmethod
+    @cached_read
     def get_submodule_commit(cls, path: Path, submodule_path: Path) -> Optional[str]:
-        output = cmd.get_stdout(f'git ls-tree {HEAD} {submodule_path}', cwd=path)
+        output = cmd.get_stdout(['git', 'ls-tree', HEAD, str(submodule_path)], cwd=path)
         if output is None:
             return None
         components = output.split()
         return components[2]
 
     @classmethod
+    @cached_read
     def get_submodules_info(cls, path: Path) -> Dict[str, Dict[str, str]]:
         submodules = GitOffline.get_submodules_info_from_gitmodules(path)
         git_config_submodules = GitOffline.get_submodules_info_from_git_config(path)
@@ -257,22 +341,31 @@ class GitOffline:
 
     @classmethod
     def get_submodules_info_from_gitmodules(cls, path: Path) -> Dict[str, Dict[str, str]]:
-        output = GitOffline.get_config_info(path, 'submodule', path / '.gitmodules')
-        submodules = ProcessOutput.submodules(output)
-        return submodules
+        return GitOffline.get_config_file_info(path / '.gitmodules', 'submodule')
 
     @classmethod
     def get_submodules_info_from_git_config(cls, path: Path) -> Dict[str, Dict[str, str]]:
         git_dir = GitOffline.git_dir(path)
         if git_dir is None:
             return {}
-        output = GitOffline.get_config_info(path, 'submodule', git_dir / 'config')
-        submodules = ProcessOutput.submodules(output)
-        return submodules
+        return GitOffline.get_config_file_info(git_dir / 'config', 'submodule')
+
+    @classmethod
+    def get_config_file_info(cls, file: Path, section: str) -> Dict[str, Dict[str, str]]:
+        """Get values in config file section grouped by subsection, like ``git config --file``
+
+        :param Path file: Config file
+        :param str section: Config section name
+        :return: Dict of subsection name to dict of variable name to value
+        """
+
+        subsections = ConfigReader.read_file(file).subsections(section)
+        return {name: {key: values[-1] for key, values in variables.items()}
+                for name, variables in subsections.items()}
 
     @classmethod
     def get_config_info(cls, path: Path, name: str, file: Path) -> List[str]:
-        output = cmd.get_stdout(f'git config --file {file} --get-regexp {name}', cwd=path)
+        output = cmd.get_stdout(['git', 'config', '--file', str(file), '--get-regexp', name], cwd=path)
         if output is None:
             return []
         return output.splitlines()
@@ -333,18 +426,18 @@ class GitOffline:
             'required'
         ]
 
-        for lfs_filter in lfs_filters:
-            result = cmd.run_silent(f'git config --get filter.lfs.{lfs_filter}', cwd=path)
-            if result.returncode != 0:
-                return False
-        return True
+        config = GitOffline.get_repo_config(path)
+        if config is None:
+            return False
+        return all([f'filter.lfs.{lfs_filter}' in config for lfs_filter in lfs_filters])
 
     @classmethod
+    @invalidates_cache
     def uninstall_lfs_hooks(cls, path: Path) -> List[CompletedProcess]:
         commands = [
-            'git lfs uninstall --local',
-            'git lfs uninstall --system',
-            'git lfs uninstall'
+            ['git', 'lfs', 'uninstall', '--local'],
+            ['git', 'lfs', 'uninstall', '--system'],
+            ['git', 'lfs', 'uninstall']
         ]
 
         results = []
@@ -356,12 +449,13 @@ class GitOffline:
         return results
 
     @classmethod
+    @invalidates_cache
     def uninstall_lfs_filters(cls, path: Path) -> List[CompletedProcess]:
         commands = [
-            'git config --system --unset filter.lfs.clean',
-            'git config --system --unset filter.lfs.smudge',
-            'git config --system --unset filter.lfs.process',
-            'git config --system --unset filter.lfs.required'
+            ['git', 'config', '--system', '--unset', 'filter.lfs.clean'],
+            ['git', 'config', '--system', '--unset', 'filter.lfs.smudge'],
+            ['git', 'config', '--system', '--unset', 'filter.lfs.process'],
+            ['git', 'config', '--system', '--unset', 'filter.lfs.required']
         ]
 
         results = []
@@ -374,7 +468,7 @@ class GitOffline:
 
     @classmethod
     def is_lfs_file_pointer(cls, path: Path, file: str) -> bool:
-        output = cmd.get_stdout(f'git lfs ls-files -I "{file}"', cwd=path)
+        output = cmd.get_stdout(['git', 'lfs', 'ls-files', '-I', file], cwd=path)
         if output is None:
             # TODO: Should this return None?
             return False
@@ -383,7 +477,7 @@ class GitOffline:
 
     @classmethod
     def is_lfs_file_not_pointer(cls, path: Path, file: str) -> bool:
-        output = cmd.get_stdout(f'git lfs ls-files -I "{file}"', cwd=path)
+        output = cmd.get_stdout(['git', 'lfs', 'ls-files', '-I', file], cwd=path)
         if output is None:
             # TODO: Should this return None?
             return False
@@ -392,74 +486,93 @@ class GitOffline:
 
     @classmethod
     def get_git_config(cls, path: Path) -> Optional[str]:
-        return cmd.get_stdout('git config --list --show-origin', cwd=path)
+        return cmd.get_stdout(['git', 'config', '--list', '--show-origin'], cwd=path)
 
     @classmethod
+    @invalidates_cache
     def stash(cls, path: Path) -> CompletedProcess:
-        return cmd.run('git stash', cwd=path)
+        return cmd.run(['git', 'stash'], cwd=path)
 
     @classmethod
     def status(cls, path: Path, verbose: bool = False) -> CompletedProcess:
-        args = ''
+        args = []
         if verbose:
-            args = ' -vv '
-        return cmd.run(f'git status {args}', cwd=path)
+            args = ['-vv']
+        return cmd.run(['git', 'status'] + args, cwd=path)
 
     @classmethod
+    @cached_read
     def current_head_commit_sha(cls, path: Path, short: bool = False) -> Optional[str]:
-        args = ''
+        if not short:
+            ref_store = GitOffline._ref_store(path)
+            if ref_store is not None:
+                _, sha = ref_store.head()
+                if sha is not None:
+                    return sha
+            return GitOffline.get_sha(path, ref=HEAD)
+        args = []
         if short:
-            args = ' --short '
-        return cmd.get_stdout(f'git rev-parse {args} {HEAD}', cwd=path)
+            args = ['--short']
+        return cmd.get_stdout(['git', 'rev-parse'] + args + [HEAD], cwd=path)
 
     @classmethod
+    @cached_read
     def get_branch_sha(cls, path: Path, branch: str, remote: Optional[str] = None,
                        short: bool = False) -> Optional[str]:
+        if not short and GitOffline._is_plain_ref_name(branch):
+            ref_store = GitOffline._ref_store(path)
+            if ref_store is not None:
+                ref = f'refs/heads/{branch}' if remote is None else f'refs/remotes/{remote}/{branch}'
+                return ref_store.read_ref(ref)
         branch = branch if remote is None else f'{remote}/{branch}'
         return GitOffline.get_sha(path, ref=branch, short=short)
 
     @classmethod
+    @invalidates_cache
     def add(cls, path: Path, files: List[str]) -> CompletedProcess:
-        files = " ".join(files)
-        return cmd.run(f"git add {files}", cwd=path)
+        return cmd.run(['git', 'add'] + [str(f) for f in files], cwd=path)
 
     @classmethod
+    @invalidates_cache
     def commit(cls, path: Path, message: str) -> CompletedProcess:
-        return cmd.run(f"git commit -m '{message}'", cwd=path)
+        return cmd.run(['git', 'commit', '-m', message], cwd=path)
 
     @classmethod
+    @invalidates_cache
     def create_local_branch(cls, path: Path, name: str, branch: Optional[str] = None,
                             remote: Optional[str] = None, track: bool = True) -> CompletedProcess:
         remote = '' if remote is None else f'{remote}/'
         start_point = HEAD if branch is None else f'{remote}{branch}'
 
-        # TODO: Use a list for args and join with ' '
-        args = ''
+        args = []
         if track:
-            args += ' --track '
+            args += ['--track']
         else:
-            args += ' --no-track '
-        return cmd.run(f"git branch {args} {name} {start_point}", cwd=path)
+            args += ['--no-track']
+        return cmd.run(['git', 'branch'] + args + [name, start_point], cwd=path)
 
     @classmethod
+    @invalidates_cache
     def delete_local_branch(cls, path: Path, branch: str, force: bool = False) -> CompletedProcess:
-        args = ''
+        args = []
         if force:
-            args += ' --force '
-        return cmd.run(f'git branch --delete {args} {branch}', cwd=path)
+            args += ['--force']
+        return cmd.run(['git', 'branch', '--delete'] + args + [branch], cwd=path)
 
     @classmethod
+    @invalidates_cache
     def delete_local_tag(cls, path: Path, name: str) -> CompletedProcess:
-        return cmd.run(f'git tag --delete {name}', cwd=path)
+        return cmd.run(['git', 'tag', '--delete', name], cwd=path)
 
     @classmethod
+    @lru_cache(maxsize=None)
     def check_ref_format(cls, refname: str) -> bool:
         """Check git ref format
 
         :param str refname: Files to git add
         """
 
-        result = cmd.run_silent(f'git check-ref-format --normalize {refname}')
+        result = cmd.run_silent(['git', 'check-ref-format', '--normalize', refname])
         return result.returncode == 0
 
     @classmethod
@@ -477,33 +590,32 @@ class GitOffline:
         return GitOffline.checkout(path, rev)
 
     @classmethod
+    @invalidates_cache
     def submodule_add(cls, path: Path, url: str, branch: Optional[str] = None, force: bool = False,
                       name: Optional[str] = None, reference: Optional[str] = None, depth: Optional[int] = None,
                       submodule_path: Optional[Path] = None) -> CompletedProcess:
-        args = ''
+        args = []
         if branch is not None:
-            args += f' -b {branch} '
+            args += ['-b', branch]
         if force:
-            args += ' --force '
+            args += ['--force']
         if name is not None:
-            args += f' --name {name} '
+            args += ['--name', name]
         if reference is not None:
-            args += f' --reference {reference} '
+            args += ['--reference', reference]
         if depth is not None:
-            args += f' --depth {depth} '
+            args += ['--depth', str(depth)]
         if submodule_path is not None:
-            submodule_path = str(submodule_path)
+            submodule_path = [str(submodule_path)]
         else:
-            submodule_path = ''
-        return cmd.run(f'git submodule add {args} {url} {submodule_path}', cwd=path)
+            submodule_path = []
+        return cmd.run(['git', 'submodule', 'add'] + args + [url] + submodule_path, cwd=path)
 
     @classmethod
+    @invalidates_cache
     def submodule_absorbgitdirs(cls, path: Path, paths: Optional[List[Path]] = None) -> CompletedProcess:
-        if paths is not None and paths:
-            paths = ' '.join([str(p) for p in paths])
-        else:
-            paths = ''
-        return cmd.run(f'git submodule absorbgitdirs {paths}', cwd=path)
+        paths = [] if paths is None else [str(p) for p in paths]
+        return cmd.run(['git', 'submodule', 'absorbgitdirs'] + paths, cwd=path)
 
     @classmethod
     def submodule_foreach_clean(cls, path: Path, recursive: bool = False) -> CompletedProcess:
@@ -513,72 +625,71 @@ class GitOffline:
     def submodule_foreach_reset(cls, path: Path, recursive: bool = False, hard: bool = False) -> CompletedProcess:
         args = ''
         if hard:
-            args += ' --hard '
-        return GitOffline.submodule_foreach(path, f'git reset {args}', recursive=recursive)
+            args += ' --hard'
+        return GitOffline.submodule_foreach(path, f'git reset{args}', recursive=recursive)
 
     @classmethod
+    @invalidates_cache
     def submodule_foreach(cls, path: Path, command: str, recursive: bool = False) -> CompletedProcess:
-        args = ''
+        args = []
         if recursive:
-            args += ' --recursive '
-        return cmd.run(f'git submodule foreach {args} {command}', cwd=path)
+            args += ['--recursive']
+        # git submodule foreach runs command with the shell
+        return cmd.run(['git', 'submodule', 'foreach'] + args + [command], cwd=path)
 
     @classmethod
+    @invalidates_cache
     def submodule_sync(cls, path: Path, recursive: bool = False,
                        paths: Optional[List[Path]] = None) -> CompletedProcess:
-        args = ''
+        args = []
         if recursive:
-            args += ' --recursive '
-        if paths is not None and paths:
-            paths = ' '.join([str(p) for p in paths])
-        else:
-            paths = ''
-        return cmd.run(f'git submodule sync {args} {paths}', cwd=path)
+            args += ['--recursive']
+        paths = [] if paths is None else [str(p) for p in paths]
+        return cmd.run(['git', 'submodule', 'sync'] + args + paths, cwd=path)
 
     @classmethod
+    @invalidates_cache
     def submodule_deinit(cls, path: Path, force: bool = False, paths: Optional[List[Path]] = None) -> CompletedProcess:
-        args = ''
+        args = []
         if force:
-            args += ' --force '
+            args += ['--force']
         if paths is not None and paths:
-            paths = ' '.join([str(p) for p in paths])
+            paths = [str(p) for p in paths]
         else:
-            paths = ' --all '
-        return cmd.run(f'git submodule deinit {args} {paths}', cwd=path)
+            paths = ['--all']
+        return cmd.run(['git', 'submodule', 'deinit'] + args + paths, cwd=path)
 
     @classmethod
+    @invalidates_cache
     def submodule_init(cls, path: Path, paths: Optional[List[Path]] = None) -> CompletedProcess:
-        if paths is not None and paths:
-            paths = ' '.join([str(p) for p in paths])
-        else:
-            paths = ''
-        return cmd.run(f'git submodule init {paths}', cwd=path)
+        paths = [] if paths is None else [str(p) for p in paths]
+        return cmd.run(['git', 'submodule', 'init'] + paths, cwd=path)
 
     @classmethod
+    @invalidates_cache
     def submodule_set_branch(cls, path: Path, submodule_path: Path, branch: str) -> CompletedProcess:
-        return cmd.run(f'git submodule set-url --branch {branch} {submodule_path}', cwd=path)
+        return cmd.run(['git', 'submodule', 'set-url', '--branch', branch, str(submodule_path)], cwd=path)
 
     @classmethod
+    @invalidates_cache
     def submodule_unset_branch(cls, path: Path, submodule_path: Path) -> CompletedProcess:
-        return cmd.run(f'git submodule set-url --default {submodule_path}', cwd=path)
+        return cmd.run(['git', 'submodule', 'set-url', '--default', str(submodule_path)], cwd=path)
 
     @classmethod
+    @invalidates_cache
     def submodule_set_url(cls, path: Path, submodule_path: Path, url: str) -> CompletedProcess:
-        return cmd.run(f'git submodule set-url {submodule_path} {url}', cwd=path)
+        return cmd.run(['git', 'submodule', 'set-url', str(submodule_path), url], cwd=path)
 
     @classmethod
     def submodule_status(cls, path: Path, cached: bool = False, recursive: bool = False,
                          paths: Optional[List[Path]] = None) -> CompletedProcess:
-        args = ''
+        args = []
         if cached:
-            args += ' --cached '
+            args += ['--cached']
         if recursive:
-            args += ' -- recursive '
-        if paths is not None and paths:
-            paths = ' '.join([str(p) for p in paths])
-        else:
-            paths = ''
-        return cmd.run(f'git submodule status {args} {paths}', cwd=path)
+            args += ['--recursive']
+        paths = [] if paths is None else [str(p) for p in paths]
+        return cmd.run(['git', 'submodule', 'status'] + args + paths, cwd=path)
 
     @classmethod
     def has_ignored_files(cls, path: Path) -> bool:
@@ -586,8 +697,13 @@ class GitOffline:
         return bool(ignored_files)
 
     @classmethod
+    @cached_read
     def check_ignore(cls, path: Path) -> List[str]:
-        output = cmd.get_stdout('git check-ignore -v *', cwd=path)
+        # Match the files the shell would expand * to
+        files = sorted([p.name for p in path.iterdir() if not p.name.startswith('.')]) if path.is_dir() else []
+        if not files:
+            return []
+        output = cmd.get_stdout(['git', 'check-ignore', '-v', '--'] + files, cwd=path)
         if output is None:
             return []
         # TODO: Process output
@@ -596,6 +712,7 @@ class GitOffline:
         return output.splitlines()
 
     @classmethod
+    @invalidates_cache
     def clean(cls, path: Path, untracked_directories: bool = False, force: bool = False,
               ignored: bool = False, untracked_files: bool = False) -> CompletedProcess:
         """Discard changes for repo
@@ -616,35 +733,38 @@ class GitOffline:
             args += 'X'
         if untracked_files:
             args += 'x'
-        return cmd.run(f"git clean {args}", cwd=path)
+        return cmd.run(['git', 'clean', args], cwd=path)
 
     @classmethod
+    @invalidates_cache
     def checkout(cls, path: Path, ref: str, track: bool = False) -> CompletedProcess:
-        track = ' --track ' if track else ''
-        return cmd.run(f"git -c advice.detachedHead=false checkout {track} {ref}", cwd=path)
+        track = ['--track'] if track else []
+        return cmd.run(['git', '-c', 'advice.detachedHead=false', 'checkout'] + track + [ref], cwd=path)
 
     @classmethod
+    @cached_read
     def local_branch_exists(cls, path: Path, branch: str) -> bool:
-        result = cmd.run_silent(f"git rev-parse --quiet --verify refs/heads/{branch}", cwd=path)
+        try:
+            return GitOffline._worker_resolve(path, f'refs/heads/{branch}') is not None
+        except OSError:
+            pass
+        result = cmd.run_silent(['git', 'rev-parse', '--quiet', '--verify', f'refs/heads/{branch}'], cwd=path)
         return result.returncode == 0
 
     @classmethod
     def get_tracking_branches_info(cls, path: Path) -> Dict[str, Dict[str, str]]:
-        local_branches = GitOffline.get_local_branches_info(path)
-        upstream_branches = {}
-        for branch in local_branches:
-            upstream_branch = GitOffline.get_upstream_branch(path, branch)
-            push_branch_info = GitOffline.get_push_branch(path, branch)
-            push_branch = None if push_branch_info is None else push_branch_info[0]
-            push_remote = None if push_branch_info is None else push_branch_info[1]
-            if upstream_branch is not None:
-                upstream_branches[branch] = {
-                    'upstream_branch': upstream_branch[0],
-                    'upstream_remote': upstream_branch[1],
-                    'push_branch': push_branch,
-                    'push_remote': push_remote
-                }
-        return upstream_branches
+        return GitOffline.get_snapshot(path).get_tracking_branches_info()
+
+    @classmethod
+    @cached_read
+    def get_snapshot(cls, path: Path) -> RepoSnapshot:
+        """Get snapshot of branches, tags and tracking branches from a single git process
+
+        :param Path path: Path to git repo
+        :return: Repo ref snapshot
+        """
+
+        return RepoSnapshot.load(path)
 
     @classmethod
     def get_upstream_branch(cls, path: Path, branch: str) -> Optional[Tuple[str, Optional[str]]]:
@@ -655,28 +775,30 @@ class GitOffline:
         return GitOffline.rev_parse_tracking_branch(path, branch, 'push')
 
     @classmethod
+    @cached_read
     def rev_parse_tracking_branch(cls, path: Path, branch: str, arg: str) -> Optional[Tuple[str, Optional[str]]]:
-        output = cmd.get_stdout(f'git rev-parse --symbolic-full-name {branch}@{{{arg}}}', cwd=path)
+        output = cmd.get_stdout(['git', 'rev-parse', '--symbolic-full-name', f'{branch}@{{{arg}}}'], cwd=path)
         if output is None:
             return None
         return ProcessOutput.tracking_branches(output)
 
     @classmethod
+    @cached_read
     def get_full_branch_ref(cls, path: Path, branch: str) -> Optional[str]:
-        return cmd.get_stdout(f'git rev-parse --symbolic-full-name {branch}', cwd=path)
+        return cmd.get_stdout(['git', 'rev-parse', '--symbolic-full-name', branch], cwd=path)
 
     @classmethod
     def git_remote_show(cls, path: Path, remote: str) -> Optional[str]:
-        return cmd.get_stdout(f'git remote show {remote}', cwd=path)
+        return cmd.get_stdout(['git', 'remote', 'show', remote], cwd=path)
 
     @classmethod
     def has_tracking_branch(cls, path: Path, branch: str) -> bool:
-        result = cmd.run_silent(f'git config --get branch.{branch}.merge', cwd=path)
-        return result.returncode == 0
+        config = GitOffline.get_repo_config(path)
+        return config is not None and f'branch.{branch}.merge' in config
 
     @classmethod
     def check_remote_url(cls, path: Path, remote, url) -> bool:
-        output = cmd.get_stdout(f"git remote get-url {remote}", cwd=path)
+        output = GitOffline.get_remote_url(path, remote)
         if output is None:
             # TODO: Should this return None?
             return False
@@ -687,22 +809,32 @@ class GitOffline:
         return GitOffline.current_branch(path) == branch
 
     @classmethod
+    @cached_read
     def current_branch(cls, path: Path) -> Optional[str]:
-        branch = cmd.get_stdout(f'git rev-parse --abbrev-ref {HEAD}', cwd=path)
+        ref_store = GitOffline._ref_store(path)
+        if ref_store is not None:
+            target, sha = ref_store.head()
+            if target is None and sha is not None:
+                return HEAD
+            if target is not None and target.startswith('refs/heads/') and sha is not None:
+                return Format.remove_prefix(target, 'refs/heads/')
+        branch = cmd.get_stdout(['git', 'rev-parse', '--abbrev-ref', HEAD], cwd=path)
         if branch is None:
             return None
         return Format.remove_prefix(branch, 'heads/')
 
     @classmethod
+    @invalidates_cache
     def set_upstream_branch(cls, path: Path, local_branch: str, upstream_branch: str,
                             remote: Optional[str] = None) -> CompletedProcess:
         remote_arg = ''
         if remote is not None:
             remote_arg = f'{remote}/'
 
-        return cmd.run(f'git branch --set-upstream-to={remote_arg}{upstream_branch} {local_branch}', cwd=path)
+        return cmd.run(['git', 'branch', f'--set-upstream-to={remote_arg}{upstream_branch}', local_branch], cwd=path)
 
     @classmethod
+    @invalidates_cache
     def git_config_unset_all_local(cls, path: Path, variable: str) -> CompletedProcess:
         """Unset all local git config values for given variable key
 
@@ -711,13 +843,14 @@ class GitOffline:
         """
 
         try:
-            return cmd.run(f'git config --local --unset-all {variable}', cwd=path)
+            return cmd.run(['git', 'config', '--local', '--unset-all', variable], cwd=path)
         except CalledProcessError as err:
             # git returns error code 5 when trying to unset variable that doesn't exist
             if err.returncode != 5:
                 raise
 
     @classmethod
+    @invalidates_cache
     def git_config_add_local(cls, path: Path, variable: str, value: str) -> CompletedProcess:
         """Add local git config value for given variable key
 
@@ -727,53 +860,103 @@ class GitOffline:
         """
 
         # TODO: Use Python ConfigParser for this
-        return cmd.run(f'git config --local --add "{variable}" "{value}"', cwd=path)
+        return cmd.run(['git', 'config', '--local', '--add', variable, value], cwd=path)
 
     @classmethod
     def is_detached(cls, path: Path) -> bool:
         return GitOffline.current_branch(path) == HEAD
 
     @classmethod
+    @cached_read
     def get_tag_commit_sha(cls, path: Path, tag: str) -> Optional[str]:
-        return cmd.get_stdout(f'git rev-list -n 1 {tag}', cwd=path)
+        try:
+            return GitOffline._worker_resolve(path, f'{tag}^{{commit}}')
+        except OSError:
+            pass
+        return cmd.get_stdout(['git', 'rev-list', '-n', '1', tag], cwd=path)
 
     @classmethod
+    @cached_read
     def get_sha(cls, path: Path, ref: str = HEAD, short: bool = False) -> Optional[str]:
-        args = ''
+        if not short:
+            ref_store = GitOffline._ref_store(path) if GitOffline._is_plain_ref_name(ref) else None
+            sha = None if ref_store is None else ref_store.resolve(ref)
+            if sha is not None:
+                return sha
+            try:
+                return GitOffline._worker_resolve(path, ref)
+            except OSError:
+                pass
+        args = []
         if short:
-            args = ' --short '
-        return cmd.get_stdout(f'git rev-parse {args} {ref}', cwd=path)
+            args = ['--short']
+        return cmd.get_stdout(['git', 'rev-parse'] + args + [ref], cwd=path)
+
+    @classmethod
+    def _ref_store(cls, path: Path) -> Optional[RefStore]:
+        """Get native ref store for repo
+
+        :param Path path: Path to git repo
+        :return: Ref store, or None if refs have to be read by running git
+        """
+
+        try:
+            return RefStore.from_repo(path)
+        except UnsupportedRefStoreError:
+            return None
 
     @classmethod
+    def _is_plain_ref_name(cls, name: str) -> bool:
+        """Check whether name is a plain ref name rather than a revision expression"""
+
+        return bool(name) and not any(c in name for c in '~^:@{}?*[\\ ') and not name.startswith(('-', '/'))
+
+    @classmethod
+    def _worker_resolve(cls, path: Path, rev: str) -> Optional[str]:
+        """Resolve rev with the persistent git worker for the repo
+
+        :param Path path: Path to git repo
+        :param str rev: Object name to resolve
+        :return: Full sha of rev, or None if it doesn't exist
+        :raise OSError: If no worker is available and the caller should run git directly
+        """
+
+        if GitOffline.git_dir(path) is None:
+            raise OSError(f'No git directory found for {path}')
+        return GIT_WORKERS.resolve(path, rev)
+
+    @classmethod
+    @cached_read
     def number_of_commits_between_refs(cls, path: Path, first: str, second: str) -> int:
-        output = cmd.get_stdout(f"git rev-list {first}..{second} --count", cwd=path)
+        output = cmd.get_stdout(['git', 'rev-list', f'{first}..{second}', '--count'], cwd=path)
         if output is None:
             # TODO: Should this return None?
             return 0
         return int(output)
 
     @classmethod
+    @invalidates_cache
     def reset(cls, path: Path, ref: str = HEAD, hard: bool = False, mixed: bool = False,
               soft: bool = False, merge: bool = False, keep: bool = False) -> CompletedProcess:
-        args = ''
+        args = []
         if sum([hard, mixed, soft, merge, keep]) > 1:
             raise Exception('Only one of args hard, mixed, soft, merge, keep allowed to be true')
         if hard:
-            args = ' --hard '
+            args = ['--hard']
         if mixed:
-            args = ' --mixed '
+            args = ['--mixed']
         if soft:
-            args = ' --soft '
+            args = ['--soft']
         if merge:
-            args = ' --merge '
+            args = ['--merge']
         if keep:
-            args = ' --keep '
-        return cmd.run(f"git reset {args} {ref}", cwd=path)
+            args = ['--keep']
+        return cmd.run(['git', 'reset'] + args + [ref], cwd=path)
 
     @classmethod
     def reset_back(cls, path: Path, number: int) -> CompletedProcess:
         sha = GitOffline.current_head_commit_sha(path)
-        result = cmd.run(f"git reset --hard {HEAD}~{number}", cwd=path)
+        result = GitOffline.reset(path, f'{HEAD}~{number}', hard=True)
         assert GitOffline.number_of_commits_between_refs(path, HEAD, sha) == number
         return result
 
@@ -800,8 +983,9 @@ class GitOffline:
         return GitOffline.number_of_commits_between_refs(path, start, end)
 
     @classmethod
+    @invalidates_cache
     def abort_rebase(cls, path: Path) -> CompletedProcess:
-        return cmd.run('git rebase --abort', cwd=path)
+        return cmd.run(['git', 'rebase', '--abort'], cwd=path)
 
     @classmethod
     def get_commit_messages_behind(cls, path: Path, ref: str, count: int = 1) -> List[str]:
@@ -814,12 +998,14 @@ class GitOffline:
         return results
 
     @classmethod
+    @cached_read
     def get_commit_message(cls, path: Path, ref: str) -> Optional[str]:
-        return cmd.get_stdout(f"git log --format=%B -n 1 {ref}", cwd=path)
+        return cmd.get_stdout(['git', 'log', '--format=%B', '-n', '1', ref], cwd=path)
 
     @classmethod
+    @cached_read
     def is_shallow_repo(cls, path: Path) -> bool:
-        output = cmd.get_stdout("git rev-parse --is-shallow-repository", cwd=path)
+        output = cmd.get_stdout(['git', 'rev-parse', '--is-shallow-repository'], cwd=path)
         if output is None:
             # TODO: Should this return None?
             return False
@@ -827,14 +1013,12 @@ class GitOffline:
 
     @classmethod
     def get_remote_branches_info(cls, path: Path, remote: str) -> Tuple[List[str], Optional[str]]:
-        output = cmd.get_stdout('git branch -r', cwd=path)
-        if output is None:
-            return [], None
-        return ProcessOutput.remote_branches(output, remote=remote)
+        return GitOffline.get_snapshot(path).get_remote_branches(remote)
 
     @classmethod
+    @cached_read
     def get_commit_date(cls, path: Path, commit: str) -> Optional[datetime]:
-        output = cmd.get_stdout(f'git show -s --format=%ci {commit}', cwd=path)
+        output = cmd.get_stdout(['git', 'show', '-s', '--format=%ci', commit], cwd=path)
         if output is None:
             return None
         date = datetime.strptime(output, '%Y-%m-%d %H:%M:%S %z')
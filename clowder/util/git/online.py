@@ -6,15 +6,19 @@ from typing import Dict, List, Optional
 
 import clowder.util.command as cmd
 import clowder.util.filesystem as fs
-from clowder.util.format import Format
+from clowder.util.process_watch import current_process_watch
 
+from .cache import invalidates_cache
 from .constants import HEAD, ORIGIN
-from .process_output import ProcessOutput
+from .host_limits import limited_by_host
+from .remote_refs import REMOTE_REFS, invalidates_remote_refs, remote_url
 
 
 class GitOnline:
 
     @classmethod
+    @invalidates_cache
+    @limited_by_host
     def pull(cls, path: Path, remote: Optional[str] = None, branch: Optional[str] = None,
              rebase: bool = False, prune: bool = False, tags: bool = False,
              jobs: Optional[int] = None, no_edit: bool = False, autostash: bool = False,
@@ -26,36 +30,41 @@ class GitOnline:
             remote = ORIGIN if remote is None else remote
             refspec = f'refs/heads/{branch}:refs/remotes/{remote}/heads/{branch}'
 
-        remote = '' if remote is None else remote
-        refspec = '' if refspec is None else refspec
+        remote = [] if remote is None else [remote]
+        refspec = [] if refspec is None else [refspec]
 
-        args = ''
+        args = []
         if rebase:
-            args += ' --rebase '
+            args += ['--rebase']
         if prune:
-            args += ' --prune '
+            args += ['--prune']
         if tags:
-            args += ' --tags '
+            args += ['--tags']
         if no_edit:
-            args += ' --no-edit '
+            args += ['--no-edit']
         if autostash:
-            args += ' --autostash '
+            args += ['--autostash']
         if jobs is not None:
-            args += f' --jobs={jobs} '
+            args += [f'--jobs={jobs}']
         if depth is not None:
-            args += f' --depth={depth} '
+            args += [f'--depth={depth}']
         if fetch_all:
-            args += f' --all '
-        return cmd.run(f'git pull {args} {remote} {refspec}', cwd=path)
+            args += ['--all']
+        args += cls._progress_args()
+        return cmd.run(['git', 'pull'] + args + remote + refspec, cwd=path)
 
     @classmethod
+    @invalidates_cache
+    @limited_by_host
     def pull_lfs(cls, path: Path) -> CompletedProcess:
         """Pull lfs files"""
 
-        return cmd.run('git lfs pull', cwd=path)
+        return cmd.run(['git', 'lfs', 'pull'], cwd=path)
 
     # See: https://github.blog/2020-12-21-get-up-to-speed-with-partial-clone-and-shallow-clone/
     @classmethod
+    @invalidates_cache
+    @limited_by_host
     def clone(cls, path: Path, url: str, depth: Optional[int] = None, branch: Optional[str] = None,
               tag: Optional[str] = None, jobs: Optional[int] = None, single_branch: bool = False,
               blobless: bool = False, treeless: bool = False, origin: Optional[str] = None) -> CompletedProcess:
@@ -64,30 +73,34 @@ class GitOnline:
                 raise Exception(f'Existing directory at clone path {path}')
             fs.remove_dir(path)
 
-        args = ''
+        args = []
         if branch is not None:
-            args += f' --branch {branch} '
+            args += ['--branch', branch]
         elif tag is not None:
-            args += f' --branch {tag} '
+            args += ['--branch', tag]
 
         if single_branch:
-            args += ' --single-branch '
+            args += ['--single-branch']
         if jobs is not None:
-            args += f' --jobs {jobs} '
+            args += ['--jobs', str(jobs)]
         if depth is not None:
-            args += f' --depth {depth} '
+            args += ['--depth', str(depth)]
         if origin is not None:
-            args += f' --origin {origin} '
+            args += ['--origin', origin]
 
         assert not (blobless and treeless)
         if blobless:
-            args += ' --filter=blob:none '
+            args += ['--filter=blob:none']
         elif treeless:
-            args += ' --filter=tree:0 '
+            args += ['--filter=tree:0']
 
-        return cmd.run(f'git clone {args} {url} {path}')
+        args += cls._progress_args()
+        return cmd.run(['git', 'clone'] + args + [url, str(path)])
 
     @classmethod
+    @invalidates_cache
+    @invalidates_remote_refs
+    @limited_by_host
     def push(cls, path: Path, remote: Optional[str] = None, local_branch: Optional[str] = None,
              remote_branch: Optional[str] = None, force: bool = False, set_upstream: bool = False) -> CompletedProcess:
         refspec = None
@@ -100,132 +113,163 @@ class GitOnline:
             remote_branch = local_branch
             refspec = f'refs/heads/{local_branch}:refs/heads/{remote_branch}'
 
-        remote = '' if remote is None else remote
-        refspec = '' if refspec is None else refspec
+        remote = [] if remote is None else [remote]
+        refspec = [] if refspec is None else [refspec]
 
-        args = ''
+        args = []
         if force:
-            args += ' --force '
+            args += ['--force']
         if set_upstream:
-            args += ' --set-upstream '
+            args += ['--set-upstream']
 
-        return cmd.run(f'git push {args} {remote} {refspec}', cwd=path)
+        return cmd.run(['git', 'push'] + args + remote + refspec, cwd=path)
 
     @classmethod
+    @invalidates_cache
+    @limited_by_host
     def fetch(cls, path: Path, prune: bool = False, prune_tags: bool = False, tags: bool = False,
               depth: Optional[int] = None, remote: Optional[str] = None, branch: Optional[str] = None,
               unshallow: bool = False, jobs: Optional[int] = None, fetch_all: bool = False,
-              print_output: bool = True) -> CompletedProcess:
+              print_output: Optional[bool] = None) -> CompletedProcess:
+        args = cls._fetch_args(prune=prune, prune_tags=prune_tags, tags=tags, depth=depth, remote=remote,
+                               branch=branch, unshallow=unshallow, jobs=jobs, fetch_all=fetch_all)
+        return cmd.run(args, cwd=path, print_output=print_output)
 
+    @classmethod
+    @invalidates_cache
+    @limited_by_host
+    async def fetch_async(cls, path: Path, prune: bool = False, prune_tags: bool = False, tags: bool = False,
+                          depth: Optional[int] = None, remote: Optional[str] = None, branch: Optional[str] = None,
+                          unshallow: bool = False, jobs: Optional[int] = None, fetch_all: bool = False,
+                          print_output: Optional[bool] = None) -> CompletedProcess:
+        args = cls._fetch_args(prune=prune, prune_tags=prune_tags, tags=tags, depth=depth, remote=remote,
+                               branch=branch, unshallow=unshallow, jobs=jobs, fetch_all=fetch_all)
+        return await cmd.run_async(args, cwd=path, print_output=print_output)
+
+    @classmethod
+    def _fetch_args(cls, prune: bool = False, prune_tags: bool = False, tags: bool = False,
+                    depth: Optional[int] = None, remote: Optional[str] = None, branch: Optional[str] = None,
+                    unshallow: bool = False, jobs: Optional[int] = None, fetch_all: bool = False) -> List[str]:
         refspec = None
         if branch is not None:
             remote = ORIGIN if remote is None else remote
             refspec = f'refs/heads/{branch}:refs/remotes/{remote}/heads/{branch}'
 
-        remote = '' if remote is None else remote
-        refspec = '' if refspec is None else refspec
+        remote = [] if remote is None else [remote]
+        refspec = [] if refspec is None else [refspec]
 
-        args = ''
+        args = []
         if prune:
-            args += ' --prune '
+            args += ['--prune']
         if prune_tags:
-            args += ' --prune-tags '
+            args += ['--prune-tags']
         if tags:
-            args += ' --tags '
+            args += ['--tags']
         if depth is not None:
-            args += f' --depth {depth}'
+            args += ['--depth', str(depth)]
         if unshallow:
-            args += ' --unshallow '
+            args += ['--unshallow']
         if jobs is not None:
-            args += ' --jobs '
+            args += [f'--jobs={jobs}']
         if fetch_all:
-            args += ' --all '
+            args += ['--all']
+        args += cls._progress_args()
+
+        return ['git', 'fetch'] + args + remote + refspec
 
-        return cmd.run(f"git fetch {args} {remote} {refspec}", cwd=path, print_output=print_output)
+    @staticmethod
+    def _progress_args() -> List[str]:
+        # Git only prints progress to a terminal, so ask for it when a stall limit watches the output, otherwise
+        # a healthy clone or fetch with nothing else to print looks stalled
+        watch = current_process_watch()
+        if watch is None or watch.limits.stall is None:
+            return []
+        return ['--progress']
 
     @classmethod
+    @invalidates_cache
+    @invalidates_remote_refs
+    @limited_by_host
     def delete_remote_tag(cls, path: Path, tag: str, remote: Optional[str] = None,
                           force: bool = False) -> CompletedProcess:
         refspec = f':refs/tags/{tag}'
         remote = ORIGIN if remote is None else remote
-        args = ''
+        args = []
         if force:
-            args += ' --force '
-        return cmd.run(f'git push {remote} {args} {refspec}', cwd=path)
+            args += ['--force']
+        return cmd.run(['git', 'push', remote] + args + [refspec], cwd=path)
 
     @classmethod
+    @invalidates_cache
+    @invalidates_remote_refs
+    @limited_by_host
     def delete_remote_branch(cls, path: Path, branch: str, remote: str = ORIGIN,
                              force: bool = False) -> CompletedProcess:
         refspec = f':refs/heads/{branch}'
         remote = ORIGIN if remote is None else remote
-        args = ''
+        args = []
         if force:
-            args += ' --force '
-        return cmd.run(f'git push {remote} {args} {refspec}', cwd=path)
+            args += ['--force']
+        return cmd.run(['git', 'push', remote] + args + [refspec], cwd=path)
 
     @classmethod
     def branch_exists_at_remote_url(cls, url: str, branch: str) -> bool:
-        output = cmd.get_stdout(f'git ls-remote --heads {url} {branch}')
-        if output is None:
+        refs = REMOTE_REFS.get(url)
+        if refs is None:
             # TODO: Should this return None?
             return False
-        return bool(output)
+        return branch in refs.branches
 
     @classmethod
     def branch_exists_on_remote(cls, path: Path, branch: str, remote: str = ORIGIN) -> bool:
-        output = cmd.get_stdout(f'git ls-remote --heads {remote} {branch}', cwd=path)
-        if output is None:
+        refs = REMOTE_REFS.get(remote_url(path, remote), path=path)
+        if refs is None:
             # TODO: Should this return None?
             return False
-        return bool(output)
+        return branch in refs.branches
 
     @classmethod
     def get_default_branch(cls, url: str) -> Optional[str]:
         """Get default branch from remote repo"""
 
-        command = f'git ls-remote --symref {url} {HEAD}'
-        output = cmd.get_stdout(command)
-        if output is None:
+        refs = REMOTE_REFS.get(url)
+        if refs is None:
             return None
-        output_list = output.split()
-        branch = [Format.remove_prefix(chunk, 'refs/heads/')
-                  for chunk in output_list if chunk.startswith('refs/heads/')]
-        return branch[0]
+        return refs.default_branch
 
     @classmethod
+    @invalidates_cache
+    @limited_by_host
     def submodule_update(cls, path: Path, init: bool = False, depth: Optional[int] = None, single_branch: bool = False,
                          jobs: Optional[int] = None, recursive: bool = False, remote: bool = False,
                          no_fetch: bool = False, checkout: bool = False, rebase: bool = False, merge: bool = False,
                          paths: Optional[List[Path]] = None) -> CompletedProcess:
-        args = ''
+        args = []
         if init:
-            args += ' --init '
+            args += ['--init']
         if single_branch:
-            args += ' --single-branch '
+            args += ['--single-branch']
         if jobs is not None:
-            args += f' --jobs {jobs} '
+            args += ['--jobs', str(jobs)]
         if depth is not None:
-            args += f' --depth {depth} '
+            args += ['--depth', str(depth)]
         if recursive is not None:
-            args += ' --recursive '
+            args += ['--recursive']
         if remote:
-            args += ' --remote '
+            args += ['--remote']
         if no_fetch:
-            args += ' --no-fetch '
+            args += ['--no-fetch']
 
         # TODO: Validate that at most one of these is True
         if checkout:
-            args += ' --checkout '
+            args += ['--checkout']
         if merge:
-            args += ' --merge '
+            args += ['--merge']
         if rebase:
-            args += ' --rebase '
+            args += ['--rebase']
 
-        if paths is not None and paths:
-            paths = ' '.join([str(p) for p in paths])
-        else:
-            paths = ''
-        return cmd.run(f'git submodule update {args} {paths}', cwd=path)
+        paths = [] if paths is None else [str(p) for p in paths]
+        return cmd.run(['git', 'submodule', 'update'] + args + paths, cwd=path)
 
     @classmethod
     def get_remote_tag_sha(cls, path: Path, name: str, remote: str = ORIGIN) -> Optional[str]:
@@ -235,10 +279,10 @@ class GitOnline:
 
     @classmethod
     def get_remote_tags_info(cls, path: Path = Path.cwd(), remote: str = ORIGIN) -> Dict[str, str]:
-        output = cmd.get_stdout(f"git ls-remote --tags {remote}", cwd=path)
-        if output is None:
+        refs = REMOTE_REFS.get(remote_url(path, remote), path=path)
+        if refs is None:
             return {}
-        return ProcessOutput.tag_shas(output)
+        return dict(refs.tags)
 
     @classmethod
     def get_remote_tag(cls, path: Path, name: str, remote: str = ORIGIN) -> Optional[str]:
@@ -248,7 +292,7 @@ class GitOnline:
 
     @classmethod
     def get_remote_branches_info(cls, path: Path = Path.cwd(), remote: str = ORIGIN) -> Dict[str, str]:
-        output = cmd.get_stdout(f'git ls-remote --heads {remote}', cwd=path)
-        if output is None:
+        refs = REMOTE_REFS.get(remote_url(path, remote), path=path)
+        if refs is None:
             return {}
-        return ProcessOutput.branch_shas(output)
+        return dict(refs.branches)
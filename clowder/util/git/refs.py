@@ -0,0 +1,206 @@
+"""Native git ref store reader
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import os
+import re
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from clowder.util.format import Format
+
+from .constants import HEAD
+
+SHA_PATTERN = re.compile(r'^[0-9a-f]{40}([0-9a-f]{24})?$')
+"""Full sha1 or sha256 object name"""
+
+SYMREF_PREFIX: str = 'ref: '
+MAX_SYMREF_DEPTH: int = 5
+
+PER_WORKTREE_PREFIXES: Tuple[str, ...] = ('refs/bisect/', 'refs/worktree/', 'refs/rewritten/')
+
+
+class UnsupportedRefStoreError(Exception):
+    """Raised when refs can't be read without git, e.g. with the reftable backend"""
+
+
+class RefStore:
+    """Read refs from HEAD, loose refs and packed-refs without starting a git process
+
+    :ivar Path git_dir: Repo git dir, which for a worktree is ``.git/worktrees/<name>``
+    :ivar Path common_dir: Shared git dir holding refs and packed-refs
+    """
+
+    _packed_refs_cache: Dict[Path, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+    _packed_refs_lock: Lock = Lock()
+
+    def __init__(self, git_dir: Path):
+        """RefStore __init__
+
+        :param Path git_dir: Repo git dir
+        :raise UnsupportedRefStoreError:
+        """
+
+        self.git_dir: Path = git_dir
+        self.common_dir: Path = self._find_common_dir(git_dir)
+        if (self.common_dir / 'reftable').is_dir() or (self.common_dir / 'refs' / 'heads').is_file():
+            raise UnsupportedRefStoreError(f'Unsupported ref storage format in {self.common_dir}')
+
+    @classmethod
+    def from_repo(cls, path: Path) -> 'RefStore':
+        """Get ref store for repo
+
+        :param Path path: Path to git repo
+        :return: Ref store for repo
+        :raise UnsupportedRefStoreError:
+        """
+
+        from .offline import GitOffline
+        git_dir = GitOffline.git_dir(path)
+        if git_dir is None or not (git_dir / HEAD).is_file():
+            raise UnsupportedRefStoreError(f'No git directory found for {path}')
+        return RefStore(git_dir)
+
+    def head(self) -> Tuple[Optional[str], Optional[str]]:
+        """Read HEAD
+
+        :return: Tuple of full ref name HEAD points to (None if detached) and commit sha (None if unborn)
+        """
+
+        contents = self._read_loose_ref(HEAD)
+        if contents is None:
+            return None, None
+        if not contents.startswith(SYMREF_PREFIX):
+            return None, contents
+        target = Format.remove_prefix(contents, SYMREF_PREFIX).strip()
+        return target, self.read_ref(target)
+
+    def read_ref(self, name: str) -> Optional[str]:
+        """Read sha of fully qualified ref, following symbolic refs
+
+        :param str name: Full ref name, e.g. ``refs/heads/master``
+        :return: Sha ref points to, or None if it doesn't exist
+        """
+
+        for _ in range(MAX_SYMREF_DEPTH):
+            contents = self._read_loose_ref(name)
+            if contents is None:
+                contents = self._packed_refs().get(name, None)
+            if contents is None:
+                return None
+            if not contents.startswith(SYMREF_PREFIX):
+                return contents if SHA_PATTERN.match(contents) else None
+            name = Format.remove_prefix(contents, SYMREF_PREFIX).strip()
+        return None
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Resolve short ref name using the same lookup order as ``git rev-parse``
+
+        :param str name: Ref name, e.g. ``master``, ``origin/master``, ``v1.0`` or ``refs/heads/master``
+        :return: Sha ref points to, or None if no matching ref exists
+        """
+
+        if SHA_PATTERN.match(name):
+            return name
+        candidates = [
+            name,
+            f'refs/{name}',
+            f'refs/tags/{name}',
+            f'refs/heads/{name}',
+            f'refs/remotes/{name}',
+            f'refs/remotes/{name}/{HEAD}'
+        ]
+        for candidate in candidates:
+            # Only HEAD-like pseudo refs are looked up outside of refs/
+            if candidate == name and not name.startswith('refs/') and not name.isupper():
+                continue
+            sha = self.read_ref(candidate)
+            if sha is not None:
+                return sha
+        return None
+
+    def refs(self, prefix: str) -> Dict[str, str]:
+        """Read all refs under prefix
+
+        :param str prefix: Ref prefix ending in ``/``, e.g. ``refs/heads/``
+        :return: Dict of ref name with prefix removed to the value of the ref
+        """
+
+        refs = {k: v for k, v in self._packed_refs().items() if k.startswith(prefix)}
+        refs_dir = self._ref_base_dir(prefix) / prefix
+        if refs_dir.is_dir():
+            for root, _, files in os.walk(refs_dir):
+                for file in files:
+                    if file.endswith('.lock'):
+                        continue
+                    ref_path = Path(root, file)
+                    name = ref_path.relative_to(self._ref_base_dir(prefix)).as_posix()
+                    contents = self._read_file(ref_path)
+                    if contents is not None:
+                        refs[name] = contents
+        results = {}
+        for name, value in refs.items():
+            if value.startswith(SYMREF_PREFIX):
+                value = self.read_ref(name)
+            if value is None or not SHA_PATTERN.match(value):
+                continue
+            results[Format.remove_prefix(name, prefix)] = value
+        return results
+
+    def _ref_base_dir(self, name: str) -> Path:
+        if not name.startswith('refs/') or name.startswith(PER_WORKTREE_PREFIXES):
+            return self.git_dir
+        return self.common_dir
+
+    def _read_loose_ref(self, name: str) -> Optional[str]:
+        return self._read_file(self._ref_base_dir(name) / name)
+
+    def _packed_refs(self) -> Dict[str, str]:
+        packed_refs_path = self.common_dir / 'packed-refs'
+        try:
+            stat = packed_refs_path.stat()
+        except OSError:
+            return {}
+        key = (stat.st_mtime_ns, stat.st_size)
+        with RefStore._packed_refs_lock:
+            cached = RefStore._packed_refs_cache.get(packed_refs_path, None)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+        contents = self._read_file(packed_refs_path)
+        refs = {}
+        if contents is not None:
+            # Expected format:
+            # # pack-refs with: peeled fully-peeled sorted
+            # bc787b2888acf4b7bd8351b9a72982c71c143362 refs/heads/master
+            # 6def4cee3c6abe73ab2889d155421a90722282ef refs/tags/v1.0
+            # ^1ca96862f7814d9ec8b28fff17e913e11add342f
+            for line in contents.splitlines():
+                if not line or line.startswith(('#', '^')):
+                    continue
+                components = line.split(' ', 1)
+                if len(components) == 2:
+                    refs[components[1].strip()] = components[0]
+        with RefStore._packed_refs_lock:
+            RefStore._packed_refs_cache[packed_refs_path] = (key, refs)
+        return refs
+
+    @staticmethod
+    def _find_common_dir(git_dir: Path) -> Path:
+        common_dir_file = git_dir / 'commondir'
+        contents = RefStore._read_file(common_dir_file)
+        if contents is None:
+            return git_dir
+        common_dir = Path(contents)
+        if not common_dir.is_absolute():
+            common_dir = git_dir / common_dir
+        return common_dir.resolve(strict=False)
+
+    @staticmethod
+    def _read_file(path: Path) -> Optional[str]:
+        try:
+            return path.read_text().strip()
+        except (OSError, UnicodeDecodeError):
+            return None
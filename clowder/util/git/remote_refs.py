@@ -0,0 +1,356 @@
+"""Cache of remote refs read with ls-remote
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import json
+import os
+import time
+from functools import wraps
+from pathlib import Path
+from subprocess import CalledProcessError, CompletedProcess
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import clowder.util.command as cmd
+from clowder.util.connectivity import CONNECTIVITY
+from clowder.util.format import Format
+
+from .constants import HEAD
+from .host_limits import HOST_LIMITS
+from .log import GIT_LOG
+from .retry import GIT_RETRY
+
+CACHE_VERSION: int = 1
+DEFAULT_TTL: int = 300
+"""Seconds cached remote refs are used before running ls-remote again"""
+
+SYMREF_PREFIX: str = 'ref: '
+PEELED_SUFFIX: str = '^{}'
+
+
+class RemoteRefs:
+    """Branches, tags and default branch of a remote read from a single ``git ls-remote --symref`` call
+
+    :ivar str url: Remote url
+    :ivar float timestamp: Time refs were read, in seconds since the epoch
+    :ivar Optional[str] default_branch: Branch the remote HEAD points to
+    :ivar Dict[str, str] branches: Branch name to sha
+    :ivar Dict[str, str] tags: Tag name to sha the tag ref points to
+    :ivar Dict[str, str] tag_commits: Tag name to peeled commit sha
+    """
+
+    def __init__(self, url: str, timestamp: float, default_branch: Optional[str] = None,
+                 branches: Optional[Dict[str, str]] = None, tags: Optional[Dict[str, str]] = None,
+                 tag_commits: Optional[Dict[str, str]] = None):
+        self.url: str = url
+        self.timestamp: float = timestamp
+        self.default_branch: Optional[str] = default_branch
+        self.branches: Dict[str, str] = {} if branches is None else branches
+        self.tags: Dict[str, str] = {} if tags is None else tags
+        self.tag_commits: Dict[str, str] = {} if tag_commits is None else tag_commits
+
+    @classmethod
+    def load(cls, url: str, path: Optional[Path] = None) -> Optional['RemoteRefs']:
+        """Read refs of remote
+
+        :param str url: Remote url or remote name
+        :param Optional[Path] path: Path to run ls-remote in
+        :return: Remote refs, or None if remote couldn't be read
+        """
+
+        def ls_remote() -> Tuple[float, CompletedProcess]:
+            with HOST_LIMITS.limit(url):
+                return time.time(), cmd.run(cls._command(url), cwd=Path.cwd() if path is None else path,
+                                            print_output=False)
+
+        try:
+            timestamp, result = GIT_RETRY.call(ls_remote)
+        except CalledProcessError:
+            return None
+        return RemoteRefs.parse(url, result.stdout, timestamp)
+
+    @classmethod
+    async def load_async(cls, url: str, path: Optional[Path] = None) -> Optional['RemoteRefs']:
+        """Read refs of remote from a trio event loop
+
+        :param str url: Remote url or remote name
+        :param Optional[Path] path: Path to run ls-remote in
+        :return: Remote refs, or None if remote couldn't be read
+        """
+
+        async def ls_remote() -> Tuple[float, CompletedProcess]:
+            async with HOST_LIMITS.limit_async(url):
+                return time.time(), await cmd.run_async(cls._command(url), print_output=False,
+                                                        cwd=Path.cwd() if path is None else path)
+
+        try:
+            timestamp, result = await GIT_RETRY.call_async(ls_remote)
+        except CalledProcessError:
+            return None
+        return RemoteRefs.parse(url, result.stdout, timestamp)
+
+    @classmethod
+    def parse(cls, url: str, output: str, timestamp: float) -> 'RemoteRefs':
+        """Parse ls-remote output
+
+        :param str url: Remote url
+        :param str output: Output of ``git ls-remote --symref``
+        :param float timestamp: Time refs were read
+        :return: Remote refs
+        """
+
+        # Expected output format:
+        # ref: refs/heads/master	HEAD
+        # a1b94ff469db1386e3854e768c02a1e487dfa690	HEAD
+        # a1b94ff469db1386e3854e768c02a1e487dfa690	refs/heads/master
+        # fda0bae2c25820337d7326ff5faa80038ab99b22	refs/tags/v2
+        # a1b94ff469db1386e3854e768c02a1e487dfa690	refs/tags/v2^{}
+        refs = RemoteRefs(url, timestamp)
+        for line in output.splitlines():
+            components = line.split('\t')
+            if len(components) != 2:
+                continue
+            value, name = components
+            if value.startswith(SYMREF_PREFIX):
+                target = Format.remove_prefix(value, SYMREF_PREFIX).strip()
+                if name == HEAD and target.startswith('refs/heads/'):
+                    refs.default_branch = Format.remove_prefix(target, 'refs/heads/')
+            elif name.startswith('refs/heads/'):
+                refs.branches[Format.remove_prefix(name, 'refs/heads/')] = value
+            elif name.startswith('refs/tags/') and name.endswith(PEELED_SUFFIX):
+                tag = Format.remove_prefix(name, 'refs/tags/')[:-len(PEELED_SUFFIX)]
+                refs.tag_commits[tag] = value
+            elif name.startswith('refs/tags/'):
+                tag = Format.remove_prefix(name, 'refs/tags/')
+                refs.tags[tag] = value
+                refs.tag_commits.setdefault(tag, value)
+        return refs
+
+    @classmethod
+    def from_dict(cls, url: str, values: Dict[str, Any]) -> 'RemoteRefs':
+        return RemoteRefs(url,
+                          timestamp=values['timestamp'],
+                          default_branch=values.get('default_branch', None),
+                          branches=values.get('branches', {}),
+                          tags=values.get('tags', {}),
+                          tag_commits=values.get('tag_commits', {}))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'timestamp': self.timestamp,
+            'default_branch': self.default_branch,
+            'branches': self.branches,
+            'tags': self.tags,
+            'tag_commits': self.tag_commits
+        }
+
+    def is_fresh(self, ttl: int) -> bool:
+        return time.time() - self.timestamp < ttl
+
+    @staticmethod
+    def _command(url: str) -> List[str]:
+        return ['git', 'ls-remote', '--symref', url, HEAD, 'refs/heads/*', 'refs/tags/*']
+
+
+class RemoteRefsCache:
+    """Remote refs keyed by url, persisted to a json file between commands
+
+    Refs read in this process are used until invalidated, e.g. by a push. Refs read by an earlier command
+    are used while they are younger than the ttl. Remotes that can't be read aren't persisted
+
+    :ivar Optional[Path] file: Cache file, or None to only cache in memory
+    :ivar int ttl: Seconds refs read by earlier commands are used for
+    :ivar int hits: Number of lookups served without running ls-remote
+    :ivar int misses: Number of lookups that ran ls-remote
+    """
+
+    def __init__(self):
+        self.file: Optional[Path] = None
+        self.ttl: int = DEFAULT_TTL
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock: Lock = Lock()
+        self._url_locks: Dict[str, Lock] = {}
+        self._persisted: Dict[str, RemoteRefs] = {}
+        self._current: Dict[str, Optional[RemoteRefs]] = {}
+        self._dirty: bool = False
+
+    def configure(self, file: Optional[Path], ttl: Optional[int] = None) -> None:
+        """Set cache file and load persisted refs
+
+        :param Optional[Path] file: Cache file, or None to only cache in memory
+        :param Optional[int] ttl: Seconds refs read by earlier commands are used for, defaults to DEFAULT_TTL
+        """
+
+        with self._lock:
+            self.file = file
+            self.ttl = DEFAULT_TTL if ttl is None else ttl
+            self._persisted = self._read_file(file)
+
+    def get(self, url: str, path: Optional[Path] = None) -> Optional[RemoteRefs]:
+        """Get refs of remote, running ls-remote if they aren't cached
+
+        :param str url: Remote url
+        :param Optional[Path] path: Path to run ls-remote in
+        :return: Remote refs, or None if remote couldn't be read
+        """
+
+        if CONNECTIVITY.offline:
+            # Use refs saved by earlier commands regardless of age rather than reaching the remote
+            with self._lock:
+                self.hits += 1
+                return self._current.get(url, None) or self._persisted.get(url, None)
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, Lock())
+        # Concurrent lookups of the same url wait for a single ls-remote
+        with url_lock:
+            with self._lock:
+                refs = self._cached(url)
+                if refs is not None or url in self._current:
+                    self.hits += 1
+                    return refs
+                self.misses += 1
+            refs = RemoteRefs.load(url, path=path)
+            self._store(url, refs)
+            return refs
+
+    def refresh(self, urls: Iterable[str], force: bool = False, jobs: Optional[int] = None) -> None:
+        """Read refs of multiple remotes concurrently and save cache
+
+        :param Iterable[str] urls: Remote urls
+        :param bool force: Whether to run ls-remote for urls that are already cached
+        :param Optional[int] jobs: Number of concurrent ls-remote processes
+        """
+
+        from clowder.util.tasks import Task, TaskPool
+
+        urls = sorted(set(urls))
+        if force:
+            for url in urls:
+                self.invalidate(url)
+        if CONNECTIVITY.offline:
+            return
+        with self._lock:
+            urls = [url for url in urls if self._cached(url) is None and url not in self._current]
+
+        class RemoteRefsTask(Task):
+            def __init__(self, url: str):
+                super().__init__(url)
+                self._url: str = url
+
+            def run(self) -> Optional[RemoteRefs]:
+                return REMOTE_REFS.get(self._url)
+
+        if urls:
+            TaskPool(jobs=len(urls) if jobs is None else jobs).run([RemoteRefsTask(url) for url in urls])
+        self.save()
+
+    def invalidate(self, url: str) -> None:
+        """Drop cached refs of remote, e.g. after pushing to it
+
+        :param str url: Remote url
+        """
+
+        with self._lock:
+            self._current.pop(url, None)
+            if self._persisted.pop(url, None) is not None:
+                self._dirty = True
+
+    def save(self) -> None:
+        """Write refs to cache file, if they changed"""
+
+        with self._lock:
+            if self.file is None or not self._dirty or self.ttl <= 0:
+                return
+            contents = {
+                'version': CACHE_VERSION,
+                'remotes': {url: refs.to_dict() for url, refs in self._persisted.items() if refs.is_fresh(self.ttl)}
+            }
+            self._dirty = False
+            file = self.file
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = file.with_name(f'{file.name}.{os.getpid()}.tmp')
+            temp_file.write_text(json.dumps(contents, indent=2, sort_keys=True))
+            os.replace(temp_file, file)
+        except OSError as err:
+            GIT_LOG.debug(f'Failed to save remote refs cache {file}', err)
+
+    def report(self) -> None:
+        if self.hits == 0 and self.misses == 0:
+            return
+        GIT_LOG.debug(f'remote refs cache: {self.hits} hits, {self.misses} ls-remote calls')
+
+    def _store(self, url: str, refs: Optional[RemoteRefs]) -> None:
+        with self._lock:
+            self._current[url] = refs
+            if refs is not None:
+                self._persisted[url] = refs
+                self._dirty = True
+
+    def _cached(self, url: str) -> Optional[RemoteRefs]:
+        if url in self._current:
+            return self._current[url]
+        refs = self._persisted.get(url, None)
+        if refs is not None and refs.is_fresh(self.ttl):
+            return refs
+        return None
+
+    @staticmethod
+    def _read_file(file: Optional[Path]) -> Dict[str, RemoteRefs]:
+        if file is None:
+            return {}
+        try:
+            contents = json.loads(file.read_text())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(contents, dict) or contents.get('version', None) != CACHE_VERSION:
+            return {}
+        remotes: Dict[str, Dict[str, Any]] = contents.get('remotes', {})
+        try:
+            return {url: RemoteRefs.from_dict(url, values) for url, values in remotes.items()}
+        except (KeyError, TypeError, AttributeError):
+            return {}
+
+
+REMOTE_REFS: RemoteRefsCache = RemoteRefsCache()
+
+
+def remote_url(path: Optional[Path], remote: str) -> str:
+    """Get url to cache refs of remote by
+
+    :param Optional[Path] path: Path to git repo
+    :param str remote: Remote name or url
+    :return: Fetch url of remote if it's configured for the repo, otherwise remote
+    """
+
+    if path is None:
+        return remote
+    from .offline import GitOffline
+    url = GitOffline.get_remote_url(path, remote)
+    return remote if url is None else url
+
+
+def remote_urls(path: Path) -> List[str]:
+    """Get fetch and push urls of all remotes of repo"""
+
+    from .offline import GitOffline
+    remotes = GitOffline.get_remotes_info(path)
+    return sorted({url for info in remotes.values() for url in info.values()})
+
+
+def invalidates_remote_refs(func: Callable) -> Callable:
+    """Drop cached refs of all remotes of repo after classmethod taking repo path as the first argument,
+    decorated before classmethod"""
+
+    @wraps(func)
+    def wrapper(cls, path: Path, *args, **kwargs):
+        try:
+            return func(cls, path, *args, **kwargs)
+        finally:
+            for url in remote_urls(path):
+                REMOTE_REFS.invalidate(url)
+
+    return wrapper
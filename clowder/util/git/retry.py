@@ -0,0 +1,66 @@
+"""Retries of network git commands
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from subprocess import CalledProcessError
+from typing import Tuple
+
+from clowder.util.retry import RetryPolicy
+
+TRANSIENT_RETURN_CODES: Tuple[int, ...] = (1, 128, 255)
+"""Exit codes of git, and of ssh run by git, for failures that may be transient"""
+
+TRANSIENT_ERRORS: Tuple[str, ...] = (
+    'could not resolve host',
+    'temporary failure in name resolution',
+    'connection timed out',
+    'operation timed out',
+    'connection reset',
+    'connection refused',
+    'failed to connect to',
+    "couldn't connect to server",
+    'connection closed by',
+    'broken pipe',
+    'the remote end hung up unexpectedly',
+    'early eof',
+    'unexpected disconnect',
+    'rpc failed',
+    'index-pack failed',
+    'gnutls_handshake() failed',
+    'ssl_error_syscall',
+    'kex_exchange_identification',
+    'ssh_exchange_identification',
+    'the requested url returned error: 429',
+    'the requested url returned error: 500',
+    'the requested url returned error: 502',
+    'the requested url returned error: 503',
+    'the requested url returned error: 504',
+    'internal server error',
+    'service unavailable',
+    'too many requests'
+)
+"""Lowercase fragments of git output for failures that may succeed when retried"""
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether error is from a git command that failed for a reason that may go away, e.g. a dropped connection
+
+    :param Exception error: Error raised running command
+    :return: True if command is worth retrying
+    """
+
+    if not isinstance(error, CalledProcessError) or error.returncode not in TRANSIENT_RETURN_CODES:
+        return False
+    output = error.output if error.output is not None else error.stderr
+    if not output:
+        return False
+    if isinstance(output, bytes):
+        output = output.decode(errors='replace')
+    output = output.lower()
+    return any([fragment in output for fragment in TRANSIENT_ERRORS])
+
+
+GIT_RETRY: RetryPolicy = RetryPolicy(attempts=3, backoff=1.0, max_backoff=30.0, jitter=0.5,
+                                     retryable=is_transient_error)
@@ -0,0 +1,155 @@
+"""Repo ref snapshot
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import clowder.util.command as cmd
+from clowder.util.format import Format
+
+from .constants import HEAD
+
+SEPARATOR: str = '%00'
+
+FIELDS: Tuple[str, ...] = (
+    'refname',
+    'objectname',
+    '*objectname',
+    'symref',
+    'upstream',
+    'upstream:remotename',
+    'push',
+    'push:remotename'
+)
+
+FOR_EACH_REF_FORMAT: str = SEPARATOR.join([f'%({field})' for field in FIELDS])
+
+TrackingInfo = Tuple[str, Optional[str]]
+
+
+class RepoSnapshot:
+    """Branches, tags and tracking relationships of a repo read from a single ``git for-each-ref`` call
+
+    :ivar Path path: Path to git repo
+    :ivar Dict[str, str] local_branches: Local branch name to sha
+    :ivar Dict[str, str] remote_branches: ``<remote>/<branch>`` to sha
+    :ivar Dict[str, str] remote_default_branches: Remote name to default branch from ``refs/remotes/<remote>/HEAD``
+    :ivar Dict[str, str] tags: Tag name to sha the tag ref points to
+    :ivar Dict[str, str] tag_commits: Tag name to peeled commit sha
+    :ivar Dict[str, TrackingInfo] upstream_branches: Local branch name to upstream branch and remote
+    :ivar Dict[str, TrackingInfo] push_branches: Local branch name to push branch and remote
+    """
+
+    def __init__(self, path: Path, output: Optional[str] = None):
+        """RepoSnapshot __init__
+
+        :param Path path: Path to git repo
+        :param Optional[str] output: Output of ``git for-each-ref`` with :data:`FOR_EACH_REF_FORMAT`
+        """
+
+        self.path: Path = path
+        self.local_branches: Dict[str, str] = {}
+        self.remote_branches: Dict[str, str] = {}
+        self.remote_default_branches: Dict[str, str] = {}
+        self.tags: Dict[str, str] = {}
+        self.tag_commits: Dict[str, str] = {}
+        self.upstream_branches: Dict[str, TrackingInfo] = {}
+        self.push_branches: Dict[str, TrackingInfo] = {}
+        if output is not None:
+            self._parse(output)
+
+    @classmethod
+    def load(cls, path: Path) -> 'RepoSnapshot':
+        """Load snapshot of repo refs
+
+        :param Path path: Path to git repo
+        :return: Snapshot of repo refs, empty if refs couldn't be read
+        """
+
+        output = cmd.get_stdout(['git', 'for-each-ref', f'--format={FOR_EACH_REF_FORMAT}'], cwd=path)
+        return RepoSnapshot(path, output)
+
+    def has_local_branch(self, branch: str) -> bool:
+        return branch in self.local_branches
+
+    def has_remote_branch(self, branch: str, remote: str) -> bool:
+        return f'{remote}/{branch}' in self.remote_branches
+
+    def has_local_tag(self, tag: str) -> bool:
+        return tag in self.tags
+
+    def has_tracking_branch(self, branch: str) -> bool:
+        return branch in self.upstream_branches
+
+    def get_remote_branches(self, remote: str) -> Tuple[List[str], Optional[str]]:
+        """Get remote branches
+
+        :param str remote: Remote name
+        :return: Tuple of branch names for remote and remote default branch
+        """
+
+        prefix = f'{remote}/'
+        branches = [Format.remove_prefix(b, prefix) for b in self.remote_branches.keys() if b.startswith(prefix)]
+        return branches, self.remote_default_branches.get(remote, None)
+
+    def get_tracking_branches_info(self) -> Dict[str, Dict[str, Optional[str]]]:
+        tracking_branches = {}
+        for branch, (upstream_branch, upstream_remote) in self.upstream_branches.items():
+            push_branch, push_remote = self.push_branches.get(branch, (None, None))
+            tracking_branches[branch] = {
+                'upstream_branch': upstream_branch,
+                'upstream_remote': upstream_remote,
+                'push_branch': push_branch,
+                'push_remote': push_remote
+            }
+        return tracking_branches
+
+    def _parse(self, output: str) -> None:
+        # Expected output format, with fields separated by NUL:
+        # refs/heads/master bc787b2... <peeled> <symref> refs/remotes/origin/master origin refs/remotes/origin/master origin
+        # refs/remotes/origin/HEAD bc787b2... <peeled> refs/remotes/origin/master <upstream> ...
+        # refs/tags/v1.0 6def4ce... 1ca9686... <symref> <upstream> ...
+        for line in output.splitlines():
+            values = line.split('\0')
+            if len(values) != len(FIELDS):
+                continue
+            info = dict(zip(FIELDS, values))
+            refname = info['refname']
+            sha = info['objectname']
+            if refname.startswith('refs/heads/'):
+                branch = Format.remove_prefix(refname, 'refs/heads/')
+                self.local_branches[branch] = sha
+                upstream = self._tracking_info(info['upstream'], info['upstream:remotename'])
+                if upstream is not None:
+                    self.upstream_branches[branch] = upstream
+                push = self._tracking_info(info['push'], info['push:remotename'])
+                if push is not None:
+                    self.push_branches[branch] = push
+            elif refname.startswith('refs/remotes/'):
+                name = Format.remove_prefix(refname, 'refs/remotes/')
+                if name.endswith(f'/{HEAD}') and info['symref']:
+                    remote = name[:-len(f'/{HEAD}')]
+                    target = Format.remove_prefix(info['symref'], f'refs/remotes/{remote}/')
+                    self.remote_default_branches[remote] = target
+                    continue
+                self.remote_branches[name] = sha
+            elif refname.startswith('refs/tags/'):
+                tag = Format.remove_prefix(refname, 'refs/tags/')
+                self.tags[tag] = sha
+                self.tag_commits[tag] = info['*objectname'] if info['*objectname'] else sha
+
+    @staticmethod
+    def _tracking_info(ref: str, remote: str) -> Optional[TrackingInfo]:
+        if not ref:
+            return None
+        if ref.startswith('refs/heads/'):
+            return Format.remove_prefix(ref, 'refs/heads/'), None
+        if remote and ref.startswith(f'refs/remotes/{remote}/'):
+            return Format.remove_prefix(ref, f'refs/remotes/{remote}/'), remote
+        if ref.startswith('refs/remotes/'):
+            remote, _, branch = Format.remove_prefix(ref, 'refs/remotes/').partition('/')
+            return branch, remote
+        return None
@@ -0,0 +1,121 @@
+"""Repo status
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from pathlib import Path
+from typing import List, Optional
+
+import clowder.util.command as cmd
+from clowder.util.format import Format
+
+from .constants import HEAD
+
+STATUS_COMMAND: List[str] = ['git', 'status', '--porcelain=v2', '--branch', '--untracked-files=normal']
+
+
+class RepoStatus:
+    """Repo status read from a single ``git status --porcelain=v2`` call
+
+    :ivar Path path: Path to git repo
+    :ivar Optional[str] branch: Current branch, None if detached or status couldn't be read
+    :ivar Optional[str] sha: HEAD commit sha, None if there are no commits yet
+    :ivar Optional[str] upstream: Upstream branch, e.g. ``origin/master``
+    :ivar int ahead: Number of local commits not on upstream
+    :ivar int behind: Number of upstream commits not on local branch
+    :ivar bool is_dirty: Whether there are staged or unstaged changes to tracked files
+    :ivar bool has_untracked_files: Whether there are untracked files
+    :ivar bool is_rebase_in_progress: Whether a rebase is in progress
+    """
+
+    def __init__(self, path: Path, output: Optional[str] = None, is_rebase_in_progress: bool = False):
+        """RepoStatus __init__
+
+        :param Path path: Path to git repo
+        :param Optional[str] output: Output of ``git status --porcelain=v2 --branch``
+        :param bool is_rebase_in_progress: Whether a rebase is in progress
+        """
+
+        self.path: Path = path
+        self.branch: Optional[str] = None
+        self.sha: Optional[str] = None
+        self.upstream: Optional[str] = None
+        self.ahead: int = 0
+        self.behind: int = 0
+        self.is_dirty: bool = False
+        self.has_untracked_files: bool = False
+        self.is_rebase_in_progress: bool = is_rebase_in_progress
+        self._is_detached: bool = False
+        if output is not None:
+            self._parse(output)
+
+    @classmethod
+    def load(cls, path: Path) -> 'RepoStatus':
+        """Load repo status
+
+        :param Path path: Path to git repo
+        :return: Repo status
+        """
+
+        from .offline import GitOffline
+        output = cmd.get_stdout(STATUS_COMMAND, cwd=path)
+        return RepoStatus(path, output, is_rebase_in_progress=GitOffline.is_rebase_in_progress(path))
+
+    @classmethod
+    async def load_async(cls, path: Path) -> 'RepoStatus':
+        """Load repo status from a trio event loop
+
+        :param Path path: Path to git repo
+        :return: Repo status
+        """
+
+        from .offline import GitOffline
+        output = await cmd.get_stdout_async(STATUS_COMMAND, cwd=path)
+        return RepoStatus(path, output, is_rebase_in_progress=GitOffline.is_rebase_in_progress(path))
+
+    @property
+    def is_detached(self) -> bool:
+        return self._is_detached
+
+    @property
+    def current_branch(self) -> Optional[str]:
+        """Current branch, or HEAD if detached, matching ``GitOffline.current_branch``"""
+
+        return HEAD if self._is_detached else self.branch
+
+    @property
+    def is_valid(self) -> bool:
+        """Whether repo has no changes, untracked files or rebase in progress"""
+
+        return not self.is_dirty and not self.has_untracked_files and not self.is_rebase_in_progress
+
+    def _parse(self, output: str) -> None:
+        # Expected output format:
+        # # branch.oid 6def4cee3c6abe73ab2889d155421a90722282ef
+        # # branch.head master
+        # # branch.upstream origin/master
+        # # branch.ab +1 -2
+        # 1 .M N... 100644 100644 100644 375928e... 375928e... README.md
+        # ? untracked_file
+        for line in output.splitlines():
+            if line.startswith('# '):
+                components = line[2:].split(' ', 1)
+                if len(components) != 2:
+                    continue
+                key, value = components
+                if key == 'branch.oid':
+                    self.sha = None if value == '(initial)' else value
+                elif key == 'branch.head':
+                    self._is_detached = value == '(detached)'
+                    self.branch = None if self._is_detached else value
+                elif key == 'branch.upstream':
+                    self.upstream = value
+                elif key == 'branch.ab':
+                    ahead, behind = value.split()
+                    self.ahead = int(Format.remove_prefix(ahead, '+'))
+                    self.behind = int(Format.remove_prefix(behind, '-'))
+            elif line.startswith(('1 ', '2 ', 'u ')):
+                self.is_dirty = True
+            elif line.startswith('? '):
+                self.has_untracked_files = True
@@ -0,0 +1,48 @@
+"""Repo validation
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from pathlib import Path
+from typing import List, Optional
+
+from .status import RepoStatus
+
+
+class RepoValidation:
+    """Validation state of repo and its submodules, read once so it can be both printed and evaluated
+
+    :ivar Path path: Path to git repo
+    :ivar bool exists: Whether repo exists on disk
+    :ivar Optional[RepoStatus] status: Repo status, None if repo doesn't exist
+    :ivar List[RepoValidation] submodules: Validation of submodules, including nested submodules
+    """
+
+    def __init__(self, path: Path, exists: bool, status: Optional[RepoStatus] = None,
+                 submodules: Optional[List['RepoValidation']] = None):
+        """RepoValidation __init__
+
+        :param Path path: Path to git repo
+        :param bool exists: Whether repo exists on disk
+        :param Optional[RepoStatus] status: Repo status, None if repo doesn't exist
+        :param Optional[List[RepoValidation]] submodules: Validation of submodules, including nested submodules
+        """
+
+        self.path: Path = path
+        self.exists: bool = exists
+        self.status: Optional[RepoStatus] = status
+        self.submodules: List[RepoValidation] = [] if submodules is None else submodules
+
+    def is_valid(self, allow_missing: bool = True) -> bool:
+        """Validate repo state
+
+        :param bool allow_missing: Whether to allow validation to succeed with missing repo
+        :return: True, if repo and submodules not dirty or don't exist on disk
+        """
+
+        if not self.exists:
+            return allow_missing
+        if not self.status.is_valid:
+            return False
+        return all([s.is_valid(allow_missing=allow_missing) for s in self.submodules])
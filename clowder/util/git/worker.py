@@ -0,0 +1,233 @@
+"""Persistent git worker processes
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import atexit
+import subprocess
+import time
+from collections import OrderedDict
+from pathlib import Path
+from subprocess import DEVNULL, PIPE
+from threading import Lock
+from typing import Dict, Optional
+
+from clowder.util.profiler import COMMAND_PROFILER
+
+from .log import GIT_LOG
+
+MAX_WORKERS: int = 32
+
+
+class GitWorker:
+    """Long lived ``git cat-file --batch-check`` process for a single repo
+
+    Object name lookups are written to the process stdin one per line and the answers are read back
+    from stdout, so any number of lookups cost a single process for the lifetime of the worker
+    """
+
+    def __init__(self, path: Path):
+        self.path: Path = path
+        self.queries: int = 0
+        self._lock: Lock = Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._start_time: float = time.time()
+        self._start_counter: float = time.perf_counter()
+        self._start()
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def resolve(self, rev: str) -> Optional[str]:
+        """Resolve object name to sha
+
+        :param str rev: Any object name accepted by ``git cat-file``
+        :return: Full sha of object, or None if it doesn't exist
+        :raise OSError: If worker process is no longer usable
+        """
+
+        rev = rev.strip()
+        if not rev or '\n' in rev:
+            return None
+        with self._lock:
+            if not self.is_alive:
+                raise BrokenPipeError(f'git worker for {self.path} is not running')
+            self._process.stdin.write(f'{rev}\n')
+            self._process.stdin.flush()
+            output = self._process.stdout.readline()
+            if not output:
+                self._close()
+                raise BrokenPipeError(f'git worker for {self.path} exited')
+            self.queries += 1
+        components = output.split()
+        # Responses are '<sha> <type> <size>' or '<rev> missing' / '<rev> ambiguous'
+        if len(components) != 3:
+            return None
+        return components[0]
+
+    def close(self) -> None:
+        """Stop worker process, waiting for a lookup in progress to finish"""
+
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._process is None:
+            return
+        process = self._process
+        self._process = None
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        COMMAND_PROFILER.record(process.args, self.path, self._start_time,
+                                time.perf_counter() - self._start_counter, process.returncode)
+
+    def _start(self) -> None:
+        # TODO: Replace universal_newlines with text when Python 3.6 support is dropped
+        self._process = subprocess.Popen(
+            ['git', 'cat-file', '--batch-check'],
+            cwd=self.path,
+            stdin=PIPE,
+            stdout=PIPE,
+            stderr=DEVNULL,
+            universal_newlines=True,
+            bufsize=1
+        )
+
+
+class GitWorkerPool:
+    """Pool of persistent git workers keyed by repo path
+
+    At most max_workers processes run at once. Starting a worker for another repo closes the least recently used
+    one, so workspaces with many projects don't hold a process and two pipes open per repo
+
+    :ivar int max_workers: Max number of running workers
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.enabled: bool = True
+        self.max_workers: int = max(max_workers, 1)
+        self._lock: Lock = Lock()
+        self._workers: Dict[Path, GitWorker] = OrderedDict()
+        self._failed: Dict[Path, bool] = {}
+        self._processes: int = 0
+        self._closed_queries: int = 0
+
+    @property
+    def queries(self) -> int:
+        return self._closed_queries + sum([w.queries for w in self._workers.values()])
+
+    @property
+    def processes(self) -> int:
+        return self._processes
+
+    @property
+    def running(self) -> int:
+        """Number of worker processes currently running"""
+
+        with self._lock:
+            return len([w for w in self._workers.values() if w.is_alive])
+
+    @property
+    def processes_avoided(self) -> int:
+        """Number of git processes that would have been started without workers"""
+
+        return max(self.queries - self.processes, 0)
+
+    def resolve(self, path: Path, rev: str) -> Optional[str]:
+        """Resolve object name to sha using repo worker
+
+        :param Path path: Path to git repo
+        :param str rev: Object name to resolve
+        :return: Full sha of object, or None if it doesn't exist
+        :raise OSError: If a worker isn't available for the repo
+        """
+
+        worker = self._worker(path)
+        try:
+            return worker.resolve(rev)
+        except OSError:
+            if self._discard(path, worker):
+                raise
+        # Another lookup evicted the worker before it answered, so start a new one
+        worker = self._worker(path)
+        try:
+            return worker.resolve(rev)
+        except OSError:
+            self._discard(path, worker)
+            raise
+
+    def close(self, path: Optional[Path] = None) -> None:
+        """Close workers
+
+        :param Optional[Path] path: Repo path of worker to close, or all workers if None
+        """
+
+        with self._lock:
+            paths = list(self._workers.keys()) if path is None else [path]
+            for worker_path in paths:
+                worker = self._workers.pop(worker_path, None)
+                if worker is None:
+                    continue
+                self._closed_queries += worker.queries
+                worker.close()
+
+    def report(self) -> None:
+        if self._processes == 0:
+            return
+        GIT_LOG.debug(f'git workers: {self.queries} queries served by {self.processes} processes, '
+                      f'{self.processes_avoided} processes avoided')
+
+    def _discard(self, path: Path, worker: GitWorker) -> bool:
+        # Only remove the worker that failed, a lookup racing with eviction may already have started a new one
+        with self._lock:
+            pooled = self._workers.get(path, None) is worker
+            if pooled:
+                del self._workers[path]
+                self._closed_queries += worker.queries
+        worker.close()
+        return pooled
+
+    def _worker(self, path: Path) -> GitWorker:
+        with self._lock:
+            if not self.enabled or self._failed.get(path, False):
+                raise OSError(f'git worker not available for {path}')
+            worker = self._workers.get(path, None)
+            if worker is not None and worker.is_alive:
+                self._workers.move_to_end(path)
+                return worker
+            if worker is not None:
+                del self._workers[path]
+                self._closed_queries += worker.queries
+            while len(self._workers) >= self.max_workers:
+                _, evicted = self._workers.popitem(last=False)
+                self._closed_queries += evicted.queries
+                evicted.close()
+            try:
+                worker = GitWorker(path)
+            except OSError:
+                self._failed[path] = True
+                raise
+            self._processes += 1
+            self._workers[path] = worker
+            return worker
+
+
+GIT_WORKERS: GitWorkerPool = GitWorkerPool()
+
+
+def _shutdown() -> None:
+    GIT_WORKERS.close()
+    GIT_WORKERS.report()
+
+
+atexit.register(_shutdown)
@@ -4,71 +4,202 @@
 
 """
 
+import os
 from functools import partial
-from typing import Callable, Iterable, List, Optional, Union
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Union
 
 from clowder.util.console import CONSOLE
-from clowder.util.format import Format
-from clowder.util.tasks import ProgressTask, ProgressTaskPool, Task, TaskPool
+from clowder.util.git import GIT_RETRY
+from clowder.util.tasks import (
+    AdaptiveLimiter,
+    AUTO_JOBS,
+    Jobs,
+    print_task_results,
+    ProgressTask,
+    ProgressTaskPool,
+    Stage,
+    StagedTask,
+    StageStep,
+    Task,
+    TaskPool,
+    TaskResult
+)
+from clowder.config import Config
 from clowder.controller import CLOWDER_CONTROLLER, ClowderRepo, ProjectRepo
+from clowder.log import LOG
 
 
 class ForallTask(ProgressTask):
     def __init__(self, project: ProjectRepo, func: str, **kwargs):
         project_func = getattr(project, func)
         self._func: Callable = partial(project_func, **kwargs)
-        super().__init__(str(project.path), start=False)
+        super().__init__(str(project.path), start=False, display_name=str(project.relative_path))
 
     def run(self) -> None:
         self._func()
 
 
-def forall(projects: Iterable[ProjectRepo], jobs: int, command: str, check: bool) -> None:
+class ProjectTask(ProgressTask):
+    """Task printing project status and running function for project, with output buffered while running
+
+    :ivar List[Any] output: Buffered output of project
+    """
+
+    def __init__(self, project: ProjectRepo, func: Callable[[ProjectRepo], None]):
+        super().__init__(str(project.path), start=False, display_name=str(project.relative_path))
+        self._project: ProjectRepo = project
+        self._func: Callable[[ProjectRepo], None] = func
+        self.output: List[Any] = []
+
+    def run(self) -> None:
+        with CONSOLE.capture(self.output):
+            CONSOLE.stdout(self._project.status())
+            self._func(self._project)
+
+
+class HerdStages:
+    """Stages of parallel herd, each with its own concurrency limit
+
+    Network stages retry transient git failures. Each stage has the time limits configured for it, if any
+
+    :ivar Stage network: Clone, pull and upstream fetch, limited by jobs, or tuned while running for auto jobs
+    :ivar Stage local: Checkout and git config, limited by cpu count
+    :ivar Stage lfs: Git lfs pull, limited by half of jobs
+    :ivar Stage submodules: Submodule update, limited by half of jobs
+    """
+
+    def __init__(self, jobs: Jobs):
+        config = Config()
+        network_limits = config.stage_time_limits('network')
+        if jobs == AUTO_JOBS:
+            adaptive = AdaptiveLimiter('network')
+            self.network: Stage = Stage('network', adaptive=adaptive, retry=GIT_RETRY, time_limits=network_limits)
+            jobs = adaptive.jobs
+        else:
+            self.network: Stage = Stage('network', jobs, retry=GIT_RETRY, time_limits=network_limits)
+        self.local: Stage = Stage('local', os.cpu_count(), time_limits=config.stage_time_limits('local'))
+        self.lfs: Stage = Stage('lfs', max(jobs // 2, 1), retry=GIT_RETRY,
+                                time_limits=config.stage_time_limits('lfs'))
+        self.submodules: Stage = Stage('submodules', max(jobs // 2, 1), retry=GIT_RETRY,
+                                       time_limits=config.stage_time_limits('submodules'))
+
+
+class HerdTask(StagedTask):
+    def __init__(self, project: ProjectRepo, stages: HerdStages, branch: Optional[str] = None,
+                 tag: Optional[str] = None, depth: Optional[int] = None, rebase: bool = False):
+        super().__init__(str(project.path), start=False, display_name=str(project.relative_path))
+        self._project: ProjectRepo = project
+        self._stages: HerdStages = stages
+        self._branch: Optional[str] = branch
+        self._tag: Optional[str] = tag
+        self._depth: Optional[int] = depth
+        self._rebase: bool = rebase
+        self._is_initial_clone: bool = False
+
+    def stages(self) -> Iterator[StageStep]:
+        project = self._project
+        yield self._stages.network, self._clone
+        yield self._stages.local, project.herd_configure
+        if not self._is_initial_clone:
+            yield self._stages.network, partial(project.herd_update, branch=self._branch, tag=self._tag,
+                                                rebase=self._rebase)
+        if project.git_settings.lfs:
+            yield self._stages.lfs, project.herd_lfs
+        if project.upstream is not None:
+            yield self._stages.network, project.herd_upstream
+        if project.git_settings.recursive:
+            yield self._stages.submodules, project.herd_submodules
+
+    def _clone(self) -> None:
+        self._is_initial_clone = self._project.herd_clone(branch=self._branch, tag=self._tag, depth=self._depth)
+
+
+def forall(projects: Iterable[ProjectRepo], jobs: Jobs, command: str, check: bool, keep_going: bool = False) -> None:
     """Runs command or script for projects in parallel
 
     :param Iterable[ProjectRepo] projects: Projects to run command for
-    :param int jobs: Number of jobs to use running parallel commands
+    :param Jobs jobs: Number of jobs to use running parallel commands, or auto
     :param str command: Command to run
     :param bool check: Whether to exit if command returns a non-zero exit code
+    :param bool keep_going: Whether to keep going after a project fails and print a summary of results
     """
 
     CONSOLE.stdout(' - Run forall commands in parallel\n')
-    for project in projects:
-        CONSOLE.stdout(project.status())
-        if not project.path.is_dir():
-            CONSOLE.stdout(Format.red(" - Project missing"))
-
-    tasks = [ForallTask(p, 'run', command=command, check=check) for p in projects]
-    pool = ProgressTaskPool(jobs=jobs, title='Projects')
-    pool.run(tasks)
-
+    tasks = [ProjectTask(p, lambda project: project.run(command, check=check)) for p in projects]
+    limit = _pool_jobs(jobs, 'forall')
+    pool = ProgressTaskPool(jobs=limit, title='Projects', keep_going=keep_going, operation='forall')
+    try:
+        pool.run(tasks)
+    finally:
+        # Output of commands is buffered per project and printed in project order, including projects that failed
+        for task in tasks:
+            CONSOLE.print_buffer(task.output)
+    _print_auto_jobs(limit)
+    _check_results(pool)
+
+
+def run_projects(projects: Iterable[ProjectRepo], jobs: Optional[Jobs], func: Callable[[ProjectRepo], None]) -> None:
+    """Print status of projects and run function for each one, in parallel if jobs are set
+
+    Output of each project is buffered while running in parallel and printed in project order afterwards
+
+    :param Iterable[ProjectRepo] projects: Projects to run function for
+    :param Optional[Jobs] jobs: Number of jobs to use running function in parallel, auto, or None to run serially
+    :param Callable[[ProjectRepo], None] func: Function to run for each project
+    """
 
-def herd(projects: Iterable[ProjectRepo], jobs: int, branch: Optional[str] = None,
-         tag: Optional[str] = None, depth: Optional[int] = None, rebase: bool = False) -> None:
+    if jobs is None or os.name != "posix":
+        for project in projects:
+            CONSOLE.stdout(project.status())
+            func(project)
+        return
+
+    tasks = [ProjectTask(p, func) for p in projects]
+    limit = _pool_jobs(jobs, 'projects')
+    pool = ProgressTaskPool(jobs=limit, title='Projects')
+    try:
+        pool.run(tasks)
+    finally:
+        # Projects that didn't finish are printed too, so output leading up to an error isn't lost
+        for task in tasks:
+            CONSOLE.print_buffer(task.output)
+    _print_auto_jobs(limit)
+
+
+def herd(projects: Iterable[ProjectRepo], jobs: Jobs, branch: Optional[str] = None, tag: Optional[str] = None,
+         depth: Optional[int] = None, rebase: bool = False, keep_going: bool = False) -> None:
     """Clone projects or update latest from upstream in parallel
 
     :param Iterable[ProjectRepo] projects: Projects to herd
-    :param int jobs: Number of jobs to use running parallel commands
+    :param Jobs jobs: Number of jobs to use running parallel network commands, or auto
     :param Optional[str] branch: Branch to attempt to herd
     :param Optional[str] tag: Tag to attempt to herd
     :param Optional[int] depth: Git clone depth. 0 indicates full clone, otherwise must be a positive integer
     :param bool rebase: Whether to use rebase instead of pulling latest changes
+    :param bool keep_going: Whether to keep going after a project fails and print a summary of results
     """
 
     CONSOLE.stdout(' - Herd projects in parallel\n')
     CLOWDER_CONTROLLER.validate_projects_state(projects)
 
-    tasks = [ForallTask(p, 'herd', branch=branch, tag=tag, depth=depth, rebase=rebase) for p in projects]
-    pool = ProgressTaskPool(jobs=jobs, title='Projects')
+    # Stages limit concurrency, so projects in local stages don't wait on network slots
+    stages = HerdStages(jobs)
+    tasks = [HerdTask(p, stages, branch=branch, tag=tag, depth=depth, rebase=rebase) for p in projects]
+    network_jobs = stages.network.jobs if stages.network.adaptive is None else stages.network.adaptive.jobs
+    pool = ProgressTaskPool(title='Projects', keep_going=keep_going, operation='herd', prediction_jobs=network_jobs)
     pool.run(tasks)
+    _print_auto_jobs(stages.network.adaptive)
+    _check_results(pool)
 
 
-def reset(projects: Iterable[ProjectRepo], jobs: int, timestamp_project: Optional[str] = None) -> None:
+def reset(projects: Iterable[ProjectRepo], jobs: Jobs, timestamp_project: Optional[str] = None,
+          keep_going: bool = False) -> None:
     """Reset project branches to upstream or checkout tag/sha as detached HEAD in parallel
 
     :param Iterable[ProjectRepo] projects: Project names to reset
-    :param int jobs: Number of jobs to use running parallel commands
+    :param Jobs jobs: Number of jobs to use running parallel commands, or auto
     :param Optional[str] timestamp_project: Reference project to checkout other project timestamps relative to
+    :param bool keep_going: Whether to keep going after a project fails and print a summary of results
     """
 
     CONSOLE.stdout(' - Reset projects in parallel\n')
@@ -79,11 +210,20 @@ def reset(projects: Iterable[ProjectRepo], jobs: int, timestamp_project: Optiona
         timestamp = CLOWDER_CONTROLLER.get_timestamp(timestamp_project)
 
     tasks = [ForallTask(p, 'reset', timestamp=timestamp) for p in projects]
-    pool = ProgressTaskPool(jobs=jobs, title='Projects')
+    limit = _pool_jobs(jobs, 'reset')
+    pool = ProgressTaskPool(jobs=limit, title='Projects', keep_going=keep_going)
     pool.run(tasks)
+    _print_auto_jobs(limit)
+    _check_results(pool)
+
 
+def status(projects: Iterable[ProjectRepo], padding: int, on_status: Callable[[str], None]) -> None:
+    """Get status of projects in parallel, handling each one in project order as soon as it's ready
 
-def status(projects: Iterable[ProjectRepo], padding: int) -> List[str]:
+    :param Iterable[ProjectRepo] projects: Projects to get status of
+    :param int padding: Amount of padding to use for printing project on left and current ref on right
+    :param Callable[[str], None] on_status: Called with status of each project
+    """
 
     class StatusTask(Task):
         def __init__(self, project: ProjectRepo):
@@ -93,22 +233,61 @@ def status(projects: Iterable[ProjectRepo], padding: int) -> List[str]:
         def run(self) -> str:
             return self._project.status(padding=padding)
 
+        async def run_async(self) -> str:
+            return await self._project.status_async(padding=padding)
+
     tasks = [StatusTask(p) for p in projects]
-    results = TaskPool().run(tasks)
-    return results
+    limit = AdaptiveLimiter('status')
+    TaskPool(jobs=limit).run_streaming(tasks, on_status)
+    LOG.debug(limit.report())
 
 
-def fetch(projects: Iterable[ProjectRepo], clowder_repo: Optional[ClowderRepo]) -> None:
+def fetch(projects: Iterable[ProjectRepo], clowder_repo: Optional[ClowderRepo],
+          keep_going: bool = False) -> List[TaskResult]:
+    """Fetch repos in parallel
+
+    :param Iterable[ProjectRepo] projects: Projects to fetch
+    :param Optional[ClowderRepo] clowder_repo: Clowder repo to fetch
+    :param bool keep_going: Whether to keep going after a repo fails instead of raising
+    :return: Result of fetching each repo
+    """
 
     class FetchTask(ProgressTask):
         def __init__(self, repo: Union[ProjectRepo, ClowderRepo]):
-            super().__init__(str(id(repo)))
+            name = str(repo.relative_path) if isinstance(repo, ProjectRepo) else str(repo.path.name)
+            super().__init__(str(id(repo)), retry=GIT_RETRY, display_name=name, time_limits=time_limits)
             self._repo: Union[ProjectRepo, ClowderRepo] = repo
 
         def run(self) -> None:
             self._repo.fetch()
 
+        async def run_async(self) -> None:
+            await self._repo.fetch_async()
+
+    time_limits = Config().stage_time_limits('network')
     tasks = [FetchTask(p) for p in projects]
     if clowder_repo is not None:
         tasks = [FetchTask(clowder_repo)] + tasks
-    ProgressTaskPool(title='Fetch repos', print_subprogress=False, units='repos').run(tasks)
+    limit = AdaptiveLimiter('fetch')
+    pool = ProgressTaskPool(title='Fetch repos', print_subprogress=False, units='repos', jobs=limit,
+                            keep_going=keep_going, operation='fetch')
+    pool.run(tasks)
+    LOG.debug(limit.report())
+    return pool.task_results
+
+
+def _check_results(pool: TaskPool) -> None:
+    # Tasks that exceeded their time limits are reported even without keep going, since the others kept running
+    if not pool.keep_going and not pool.timed_out:
+        return
+    print_task_results(pool.task_results)
+    pool.check_results()
+
+
+def _pool_jobs(jobs: Jobs, name: str) -> Union[int, AdaptiveLimiter]:
+    return AdaptiveLimiter(name) if jobs == AUTO_JOBS else jobs
+
+
+def _print_auto_jobs(limit: Optional[Union[int, AdaptiveLimiter]]) -> None:
+    if isinstance(limit, AdaptiveLimiter):
+        CONSOLE.stdout(f' - Auto {limit.report()}')
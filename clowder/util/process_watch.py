@@ -0,0 +1,151 @@
+"""Time limits for subprocesses
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import os
+import signal
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Iterator, Optional, Set
+
+
+class TimeLimits:
+    """Wall clock and stall limits for a step of a task
+
+    :ivar Optional[float] timeout: Max seconds the step may run for
+    :ivar Optional[float] stall: Max seconds a command of the step may run without printing output
+    """
+
+    def __init__(self, timeout: Optional[float] = None, stall: Optional[float] = None):
+        self.timeout: Optional[float] = timeout
+        self.stall: Optional[float] = stall
+
+    @property
+    def is_set(self) -> bool:
+        return self.timeout is not None or self.stall is not None
+
+
+class TimeLimitExceededError(Exception):
+    """Raised by a command killed for exceeding the time limits of its step
+
+    :ivar str name: Name of task the command ran for
+    :ivar str reason: Which limit was exceeded
+    """
+
+    def __init__(self, name: str, reason: str):
+        self.name: str = name
+        self.reason: str = reason
+        super().__init__(f'{name} {reason}')
+
+
+class ProcessWatch:
+    """Enforces time limits on commands run while it's active, by killing their process groups
+
+    Commands run in a new session while a watch is active, so killing the group also stops processes git
+    started, e.g. ssh waiting on a host key prompt. Limits are checked by :meth:`check`, which the task pool
+    calls periodically
+
+    :ivar str name: Name of task the commands run for
+    :ivar TimeLimits limits: Limits to enforce
+    :ivar Optional[str] expired: Which limit was exceeded, None while within limits
+    """
+
+    def __init__(self, name: str, limits: TimeLimits):
+        self.name: str = name
+        self.limits: TimeLimits = limits
+        self.expired: Optional[str] = None
+        self._lock: Lock = Lock()
+        self._pids: Set[int] = set()
+        self._started: float = time.monotonic()
+        self._last_output: float = self._started
+
+    @contextmanager
+    def process(self, pid: int) -> Iterator[None]:
+        """Watch process group while in context
+
+        :param int pid: Pid of process leading its own process group
+        """
+
+        with self._lock:
+            self._pids.add(pid)
+            self._last_output = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pids.discard(pid)
+
+    def output_received(self) -> None:
+        self._last_output = time.monotonic()
+
+    def check(self, now: Optional[float] = None) -> bool:
+        """Kill watched processes if a limit was exceeded
+
+        :param Optional[float] now: Current monotonic time
+        :return: True if a limit was exceeded
+        """
+
+        if self.expired is not None:
+            return True
+        now = time.monotonic() if now is None else now
+        timeout = self.limits.timeout
+        stall = self.limits.stall
+        if timeout is not None and now - self._started > timeout:
+            self.kill(f'timed out after {timeout:g}s')
+        elif stall is not None and self._pids and now - self._last_output > stall:
+            self.kill(f'stalled with no output for {stall:g}s')
+        return self.expired is not None
+
+    def kill(self, reason: str) -> None:
+        """Kill process groups of watched commands
+
+        :param str reason: Which limit was exceeded
+        """
+
+        self.expired = reason
+        with self._lock:
+            pids = list(self._pids)
+        for pid in pids:
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    def raise_if_expired(self) -> None:
+        """Raise if a limit was exceeded
+
+        :raise TimeLimitExceededError:
+        """
+
+        if self.expired is not None:
+            raise TimeLimitExceededError(self.name, self.expired)
+
+
+PROCESS_WATCH: ContextVar[Optional[ProcessWatch]] = ContextVar('process_watch', default=None)
+"""Watch of the current task step, also seen by worker threads trio starts from the task"""
+
+
+def current_process_watch() -> Optional[ProcessWatch]:
+    """Watch enforcing time limits on commands run from current context, None if there are no limits"""
+
+    if os.name != 'posix':
+        return None
+    return PROCESS_WATCH.get()
+
+
+@contextmanager
+def watching(watch: ProcessWatch) -> Iterator[ProcessWatch]:
+    """Enforce time limits of watch on commands run from current context
+
+    :param ProcessWatch watch: Watch to enforce
+    """
+
+    token = PROCESS_WATCH.set(watch)
+    try:
+        yield watch
+    finally:
+        PROCESS_WATCH.reset(token)
@@ -0,0 +1,200 @@
+"""Subprocess profiling utilities
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import json
+import os
+import shlex
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .console import CONSOLE
+from .format import Format
+
+HISTOGRAM_WIDTH: int = 40
+SLOWEST_PROJECTS_COUNT: int = 10
+
+
+class CommandRecord:
+    """Record of a single spawned command
+
+    :ivar List[str] args: Command argv, or ``[<shell command>]`` for shell commands
+    :ivar str name: Command name used for grouping, e.g. ``git status``
+    :ivar Path cwd: Working directory the command ran in
+    :ivar float start: Start time in seconds since the epoch
+    :ivar float duration: Wall time in seconds
+    :ivar Optional[int] returncode: Exit code, None if the command couldn't be started
+    :ivar bool shell: Whether command ran in a shell
+    """
+
+    def __init__(self, args: List[str], cwd: Path, start: float, duration: float,
+                 returncode: Optional[int], shell: bool = False):
+        self.args: List[str] = args
+        self.name: str = self.command_name(args[0] if shell else args, shell=shell)
+        self.cwd: Path = Path(cwd)
+        self.start: float = start
+        self.duration: float = duration
+        self.returncode: Optional[int] = returncode
+        self.shell: bool = shell
+
+    @staticmethod
+    def command_name(command: Union[str, List[str]], shell: bool = False) -> str:
+        """Get command name for grouping records
+
+        :param Union[str, List[str]] command: Command argv, or shell command string
+        :param bool shell: Whether command is a shell command
+        :return: Program name, followed by the subcommand for git commands
+        """
+
+        if shell:
+            try:
+                command = shlex.split(command)
+            except ValueError:
+                command = command.split()
+        if not command:
+            return ''
+        program = os.path.basename(command[0])
+        if program != 'git':
+            return program
+        index = 1
+        while index < len(command) and command[index].startswith('-'):
+            # Skip global options, including the values of -C <path> and -c <name>=<value>
+            index += 2 if command[index] in ('-C', '-c') else 1
+        if index >= len(command):
+            return program
+        if command[index] in ('lfs', 'submodule', 'remote', 'stash') and index + 1 < len(command):
+            return f'{program} {command[index]} {command[index + 1]}'
+        return f'{program} {command[index]}'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'args': self.args,
+            'cwd': str(self.cwd),
+            'start': self.start,
+            'duration': self.duration,
+            'returncode': self.returncode,
+            'shell': self.shell
+        }
+
+
+class CommandProfiler:
+    """Collects records of spawned commands and reports where time was spent
+
+    :ivar bool enabled: Whether commands are recorded
+    :ivar List[CommandRecord] records: Recorded commands
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.records: List[CommandRecord] = []
+        self._lock: Lock = Lock()
+
+    def record(self, args: List[str], cwd: Path, start: float, duration: float,
+               returncode: Optional[int], shell: bool = False) -> None:
+        """Record spawned command
+
+        :param List[str] args: Command argv, or ``[<shell command>]`` for shell commands
+        :param Path cwd: Working directory the command ran in
+        :param float start: Start time in seconds since the epoch
+        :param float duration: Wall time in seconds
+        :param Optional[int] returncode: Exit code, None if the command couldn't be started
+        :param bool shell: Whether command ran in a shell
+        """
+
+        if not self.enabled:
+            return
+        record = CommandRecord(list(args), cwd, start, duration, returncode, shell=shell)
+        with self._lock:
+            self.records.append(record)
+
+    def histogram(self) -> List[Tuple[str, int, float, float]]:
+        """Group records by command name
+
+        :return: List of command name, count, total time and max time, sorted by total time
+        """
+
+        groups: Dict[str, List[float]] = {}
+        with self._lock:
+            for record in self.records:
+                groups.setdefault(record.name, []).append(record.duration)
+        results = [(name, len(durations), sum(durations), max(durations)) for name, durations in groups.items()]
+        return sorted(results, key=lambda r: r[2], reverse=True)
+
+    def slowest_projects(self, root: Optional[Path] = None,
+                         count: int = SLOWEST_PROJECTS_COUNT) -> List[Tuple[str, int, float]]:
+        """Group records by working directory
+
+        :param Optional[Path] root: Directory project paths are displayed relative to
+        :param int count: Max number of projects to return
+        :return: List of project path, command count and total time, sorted by total time
+        """
+
+        groups: Dict[Path, List[float]] = {}
+        with self._lock:
+            for record in self.records:
+                groups.setdefault(record.cwd, []).append(record.duration)
+        results = [(self._display_path(path, root), len(durations), sum(durations))
+                   for path, durations in groups.items()]
+        return sorted(results, key=lambda r: r[2], reverse=True)[:count]
+
+    def report(self, root: Optional[Path] = None) -> None:
+        """Print per command histogram, slowest projects and total process count
+
+        :param Optional[Path] root: Directory project paths are displayed relative to
+        """
+
+        with self._lock:
+            total_count = len(self.records)
+            total_time = sum([r.duration for r in self.records])
+            failed_count = len([r for r in self.records if r.returncode != 0])
+
+        CONSOLE.stdout(Format.h1('Subprocess profile'), force=True)
+        histogram = self.histogram()
+        if histogram:
+            name_width = max([len(name) for name, _, _, _ in histogram])
+            max_total = histogram[0][2]
+            CONSOLE.stdout(f'\n{"command":<{name_width}}  {"count":>6}  {"total":>8}  {"mean":>8}  {"max":>8}',
+                           force=True)
+            for name, count, total, longest in histogram:
+                bar = '#' * (max(round(total / max_total * HISTOGRAM_WIDTH), 1) if max_total > 0 else 1)
+                CONSOLE.stdout(f'{Format.escape(name):<{name_width}}  {count:>6}  {total:>7.3f}s  '
+                               f'{total / count:>7.3f}s  {longest:>7.3f}s  {Format.green(bar)}', force=True)
+
+        projects = self.slowest_projects(root)
+        if projects:
+            path_width = max([len(path) for path, _, _ in projects])
+            CONSOLE.stdout(f'\n{"project":<{path_width}}  {"count":>6}  {"total":>8}', force=True)
+            for path, count, total in projects:
+                CONSOLE.stdout(f'{Format.escape(path):<{path_width}}  {count:>6}  {total:>7.3f}s', force=True)
+
+        CONSOLE.stdout(f'\nTotal processes: {Format.bold(total_count)}, '
+                       f'total time: {Format.bold(f"{total_time:.3f}s")}, '
+                       f'failed: {Format.bold(failed_count)}', force=True)
+
+    def write_json(self, file: Path) -> None:
+        """Write raw records to json file
+
+        :param Path file: Output file
+        """
+
+        with self._lock:
+            records = [r.to_dict() for r in self.records]
+        with open(file, 'w') as f:
+            json.dump({'records': records}, f, indent=2)
+
+    @staticmethod
+    def _display_path(path: Path, root: Optional[Path]) -> str:
+        if root is None:
+            return str(path)
+        try:
+            relative_path = path.resolve().relative_to(root.resolve())
+        except ValueError:
+            return str(path)
+        return '.' if relative_path == Path('.') else str(relative_path)
+
+
+COMMAND_PROFILER: CommandProfiler = CommandProfiler()
@@ -104,6 +104,14 @@ class Progress:
         if clear_lines:
             self.clear_lines()
 
+    def describe_task(self, identifier: Any, description: str) -> None:
+        task_id = self._get_task_id(identifier)
+        self._progress.update(task_id, description=description)
+
+    def describe_subtask(self, identifier: Any, description: str) -> None:
+        task_id = self._get_subtask_id(identifier)
+        self._progress.update(task_id, description=description)
+
     def update_task(self, identifier: Any, advance: int) -> None:
         task_id = self._get_task_id(identifier)
         self._progress.update(task_id, advance=advance)
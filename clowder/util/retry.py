@@ -0,0 +1,98 @@
+"""Retry utilities
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+RetryCallback = Callable[[int, Exception, float], None]
+"""Called before waiting to retry, with the number of the failed attempt, its error and the delay in seconds"""
+
+
+class RetryPolicy:
+    """Retry failed calls with exponential backoff and jitter
+
+    :ivar int attempts: Max number of attempts, including the first one
+    :ivar float backoff: Seconds to wait before the first retry, doubled for every later retry
+    :ivar float max_backoff: Max seconds to wait before a retry
+    :ivar float jitter: Fraction of the delay that is randomized, so concurrent retries are spread out
+    """
+
+    def __init__(self, attempts: int = 3, backoff: float = 1.0, max_backoff: float = 30.0, jitter: float = 0.5,
+                 retryable: Optional[Callable[[Exception], bool]] = None):
+        """RetryPolicy __init__
+
+        :param int attempts: Max number of attempts, including the first one
+        :param float backoff: Seconds to wait before the first retry, doubled for every later retry
+        :param float max_backoff: Max seconds to wait before a retry
+        :param float jitter: Fraction of the delay that is randomized
+        :param Optional[Callable[[Exception], bool]] retryable: Whether an error is worth retrying,
+            all errors are retried if None
+        """
+
+        self.attempts: int = max(attempts, 1)
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+        self.jitter: float = min(max(jitter, 0), 1)
+        self._retryable: Optional[Callable[[Exception], bool]] = retryable
+
+    def is_retryable(self, error: Exception) -> bool:
+        return self._retryable is None or self._retryable(error)
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt
+
+        :param int attempt: Number of the failed attempt, starting at 1
+        :return: Delay before the next attempt
+        """
+
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    def call(self, func: Callable[[], Any], on_retry: Optional[RetryCallback] = None) -> Any:
+        """Call function, retrying retryable errors
+
+        :param Callable[[], Any] func: Function to call
+        :param Optional[RetryCallback] on_retry: Called before waiting to retry
+        :return: Result of function
+        """
+
+        attempt = 1
+        while True:
+            try:
+                return func()
+            except Exception as err:
+                delay = self._retry_delay(attempt, err, on_retry)
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, func: Callable[[], Awaitable[Any]], on_retry: Optional[RetryCallback] = None) -> Any:
+        """Await async function from a trio event loop, retrying retryable errors
+
+        :param Callable[[], Awaitable[Any]] func: Async function to await
+        :param Optional[RetryCallback] on_retry: Called before waiting to retry
+        :return: Result of function
+        """
+
+        import trio
+
+        attempt = 1
+        while True:
+            try:
+                return await func()
+            except Exception as err:
+                delay = self._retry_delay(attempt, err, on_retry)
+            await trio.sleep(delay)
+            attempt += 1
+
+    def _retry_delay(self, attempt: int, error: Exception, on_retry: Optional[RetryCallback]) -> float:
+        # Re-raises the error being handled if it shouldn't be retried
+        if attempt >= self.attempts or not self.is_retryable(error):
+            raise error
+        delay = self.delay(attempt)
+        if on_retry is not None:
+            on_retry(attempt, error, delay)
+        return delay
@@ -4,5 +4,9 @@
 
 """
 
+from .adaptive_limiter import AdaptiveLimiter, AUTO_JOBS, Jobs
+from .task_durations import predict_makespan, TASK_DURATIONS, TaskDurations
+from .task_result import print_task_results, TaskResult, TasksFailedError
 from .task_pool import Task, TaskPool
 from .progress_task_pool import ProgressTask, ProgressTaskPool
+from .staged_task import Stage, StagedTask, StageStep
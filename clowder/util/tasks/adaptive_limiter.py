@@ -0,0 +1,143 @@
+"""adaptive limiter
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import os
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+import trio
+
+AUTO_JOBS: str = 'auto'
+"""Jobs value for tuning the number of jobs while running"""
+
+Jobs = Union[int, str]
+
+FAILURE_RATE_LIMIT: float = 0.25
+"""Fraction of failed tasks in a window above which the number of jobs is halved"""
+
+THROUGHPUT_TOLERANCE: float = 0.1
+"""Relative change in throughput or latency between windows that is treated as noise"""
+
+MIN_WINDOW: int = 4
+"""Min number of completed tasks between adjustments"""
+
+
+class AdaptiveLimiter:
+    """Capacity limiter that tunes its number of jobs from observed task latency, queue depth and failure rate
+
+    Completed tasks are grouped into windows the size of the current number of jobs. After each window, the
+    number of jobs is halved if too many tasks failed and lowered if latency rose without improving throughput.
+    Otherwise it's raised while tasks are waiting for a slot, as long as latency holds or throughput improves
+
+    :ivar str name: Name used when reporting the chosen number of jobs
+    :ivar int initial_jobs: Number of jobs started with
+    :ivar int jobs: Current number of jobs
+    :ivar int minimum: Min number of jobs
+    :ivar int maximum: Max number of jobs
+    :ivar int peak: Highest number of jobs used
+    :ivar int adjustments: Number of times the number of jobs changed
+    """
+
+    def __init__(self, name: str, jobs: Optional[int] = None, minimum: int = 1, maximum: Optional[int] = None):
+        cpu_count = os.cpu_count() or 1
+        self.name: str = name
+        self.minimum: int = max(minimum, 1)
+        self.jobs: int = max(cpu_count, 2, self.minimum) if jobs is None else max(jobs, self.minimum)
+        self.maximum: int = max(4 * cpu_count, self.jobs) if maximum is None else max(maximum, self.jobs)
+        self.initial_jobs: int = self.jobs
+        self.peak: int = self.jobs
+        self.adjustments: int = 0
+        self._limiter: Optional[trio.CapacityLimiter] = None
+        self._threads: Optional[trio.CapacityLimiter] = None
+        self._started: Dict[Hashable, float] = {}
+        self._window: List[Tuple[float, bool]] = []
+        self._window_start: Optional[float] = None
+        self._previous: Optional[Tuple[float, float]] = None
+
+    @property
+    def limiter(self) -> trio.CapacityLimiter:
+        # Created lazily since trio objects must be created inside trio.run
+        if self._limiter is None:
+            self._limiter = trio.CapacityLimiter(self.jobs)
+        return self._limiter
+
+    async def acquire_on_behalf_of(self, borrower: Hashable) -> None:
+        await self.limiter.acquire_on_behalf_of(borrower)
+        now = time.monotonic()
+        self._started[borrower] = now
+        if self._window_start is None:
+            self._window_start = now
+
+    def release_on_behalf_of(self, borrower: Hashable, failed: bool = False) -> None:
+        """Release slot and record latency of task
+
+        :param Hashable borrower: Borrower the slot was acquired on behalf of
+        :param bool failed: Whether task failed
+        """
+
+        started = self._started.pop(borrower)
+        # Read queue depth before releasing, since releasing hands the slot to a waiting task
+        waiting = self.limiter.statistics().tasks_waiting
+        self.limiter.release_on_behalf_of(borrower)
+        self._window.append((time.monotonic() - started, failed))
+        if len(self._window) >= max(self.jobs, MIN_WINDOW):
+            self._adjust(waiting)
+
+    async def run_sync(self, func: Callable[[], Any]) -> Any:
+        """Run function in a worker thread while holding a slot
+
+        :param Callable[[], Any] func: Function to run
+        :return: Result of function
+        """
+
+        if self._threads is None:
+            # Threads are already limited by the slots, so don't also wait on trio's default thread limit
+            self._threads = trio.CapacityLimiter(self.maximum)
+        borrower = object()
+        await self.acquire_on_behalf_of(borrower)
+        failed = True
+        try:
+            result = await trio.to_thread.run_sync(func, limiter=self._threads)
+            failed = False
+            return result
+        finally:
+            self.release_on_behalf_of(borrower, failed=failed)
+
+    def report(self) -> str:
+        """Describe the chosen number of jobs
+
+        :return: Summary of jobs
+        """
+
+        return f'{self.name} jobs: {self.jobs} (started at {self.initial_jobs}, peak {self.peak}, ' \
+               f'{self.adjustments} adjustments)'
+
+    def _adjust(self, waiting: int) -> None:
+        now = time.monotonic()
+        count = len(self._window)
+        throughput = count / max(now - self._window_start, 1e-6)
+        latency = sum([d for d, _ in self._window]) / count
+        failure_rate = len([f for _, f in self._window if f]) / count
+
+        improved = self._previous is None or throughput > self._previous[0] * (1 + THROUGHPUT_TOLERANCE)
+        slower = self._previous is not None and latency > self._previous[1] * (1 + THROUGHPUT_TOLERANCE)
+
+        jobs = self.jobs
+        if failure_rate > FAILURE_RATE_LIMIT:
+            jobs = max(self.minimum, jobs // 2)
+        elif slower and not improved:
+            jobs = max(self.minimum, jobs - max(jobs // 4, 1))
+        elif waiting > 0:
+            jobs = min(self.maximum, jobs + max(jobs // 4, 1))
+
+        if jobs != self.jobs:
+            self.adjustments += 1
+            self.jobs = jobs
+            self.peak = max(self.peak, jobs)
+            self.limiter.total_tokens = jobs
+        self._window = []
+        self._window_start = now
+        self._previous = (throughput, latency)
@@ -4,18 +4,24 @@
 
 """
 
-from typing import List, Optional
+import time
+from typing import List, Optional, Union
 
 from clowder.util.console import CONSOLE, Console
+from clowder.util.process_watch import TimeLimits
 from clowder.util.progress import Progress
+from clowder.util.retry import RetryPolicy
 
+from .adaptive_limiter import AdaptiveLimiter
 from .task_pool import Task, TaskPool
 
 
 class ProgressTask(Task):
 
-    def __init__(self, name: str, total: int = 1, units: str = '', start: bool = True):
-        super().__init__(name)
+    def __init__(self, name: str, total: int = 1, units: str = '', start: bool = True,
+                 retry: Optional[RetryPolicy] = None, display_name: Optional[str] = None,
+                 time_limits: Optional[TimeLimits] = None):
+        super().__init__(name, retry=retry, display_name=display_name, time_limits=time_limits)
         self.progress: Optional[Progress] = None
         self.total: int = total
         self.units: str = units
@@ -25,25 +31,36 @@ class ProgressTask(Task):
         super().before_task()
         if self.progress is not None:
             self.progress.add_subtask(self.name, total=self.total, units=self.units, start=self.start)
+            if self.predicted_duration is not None:
+                self.progress.describe_subtask(self.name, f'{self.name} (~{self.predicted_duration:.1f}s)')
 
     def after_task(self) -> None:
         super().after_task()
         if self.progress is not None and not self.cancelled:
             self.progress.complete_subtask(self.name)
 
+    def on_retry(self, attempt: int, error: Exception, delay: float) -> None:
+        super().on_retry(attempt, error, delay)
+        if self.progress is not None:
+            self.progress.describe_subtask(self.name, f'{self.name} (retry {attempt} in {delay:.0f}s)')
+
     def run(self) -> None:
         raise NotImplementedError
 
 
 class ProgressTaskPool(TaskPool):
 
-    def __init__(self, title: str, units: str = '', jobs: Optional[int] = None,
-                 console: Console = CONSOLE.stdout_console, print_subprogress: bool = True):
-        super().__init__(jobs)
+    def __init__(self, title: str, units: str = '', jobs: Optional[Union[int, AdaptiveLimiter]] = None,
+                 console: Console = CONSOLE.stdout_console, print_subprogress: bool = True, keep_going: bool = False,
+                 operation: Optional[str] = None, prediction_jobs: Optional[int] = None):
+        super().__init__(jobs, keep_going=keep_going, operation=operation)
         self._title: str = title
         self._units = units
         self.progress: Progress = Progress(console=console)
         self._print_subprogress: bool = print_subprogress
+        self._prediction_jobs: Optional[int] = prediction_jobs
+        self._predicted: Optional[float] = None
+        self._started: Optional[float] = None
 
     def __enter__(self):
         self.progress.start()
@@ -59,6 +76,15 @@ class ProgressTaskPool(TaskPool):
                 task.progress = self.progress
         self.progress.start()
         self.progress.add_task(self._title, total=len(tasks), units=self._units)
+        self._started = time.monotonic()
+        self._predicted = self.predict_duration(tasks, jobs=self._prediction_jobs)
+        if self._predicted is not None:
+            self.progress.describe_task(self._title, f'{self._title} (predicted {self._predicted:.1f}s)')
+
+    def on_retry(self, task: ProgressTask, attempt: int, error: Exception, delay: float) -> None:
+        super().on_retry(task, attempt, error, delay)
+        retries = 'retry' if self.retries == 1 else 'retries'
+        self.progress.describe_task(self._title, f'{self._title} ({self.retries} {retries})')
 
     def after_task(self, task: ProgressTask) -> None:
         super().after_task(task)
@@ -69,4 +95,8 @@ class ProgressTaskPool(TaskPool):
         super().after_tasks(tasks)
         if not self.cancelled:
             self.progress.complete_task(self._title)
+            if self._predicted is not None:
+                elapsed = time.monotonic() - self._started
+                self.progress.describe_task(self._title, f'{self._title} ({elapsed:.1f}s, '
+                                                         f'predicted {self._predicted:.1f}s)')
         self.progress.stop(clear_lines=not self.cancelled)
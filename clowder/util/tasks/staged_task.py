@@ -0,0 +1,92 @@
+"""staged task
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from functools import partial
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+import trio
+
+from clowder.util.process_watch import TimeLimits
+from clowder.util.retry import RetryPolicy
+
+from .adaptive_limiter import AdaptiveLimiter
+from .progress_task_pool import ProgressTask
+
+
+class Stage:
+    """Step of a pipeline shared by all tasks in a pool, with its own concurrency limit
+
+    :ivar str name: Stage name
+    :ivar Optional[int] jobs: Max number of tasks running the stage at the same time, None for no limit
+    :ivar Optional[AdaptiveLimiter] adaptive: Limiter tuning the number of jobs while running, used instead of jobs
+    :ivar Optional[RetryPolicy] retry: Policy for retrying failed steps, without holding a slot while waiting
+    :ivar Optional[TimeLimits] time_limits: Wall clock and stall limits for each attempt of a step
+    """
+
+    def __init__(self, name: str, jobs: Optional[int] = None, adaptive: Optional[AdaptiveLimiter] = None,
+                 retry: Optional[RetryPolicy] = None, time_limits: Optional[TimeLimits] = None):
+        self.name: str = name
+        self.jobs: Optional[int] = jobs
+        self.adaptive: Optional[AdaptiveLimiter] = adaptive
+        self.retry: Optional[RetryPolicy] = retry
+        self.time_limits: Optional[TimeLimits] = time_limits
+        self._limiter: Optional[trio.CapacityLimiter] = None
+
+    @property
+    def limiter(self) -> trio.CapacityLimiter:
+        # Created lazily since trio objects must be created inside trio.run
+        if self._limiter is None:
+            total_tokens = float('inf') if self.jobs is None else max(self.jobs, 1)
+            self._limiter = trio.CapacityLimiter(total_tokens)
+        return self._limiter
+
+    async def run(self, step: Callable[[], Any]) -> Any:
+        """Run step in a worker thread while holding a slot of the stage
+
+        :param Callable[[], Any] step: Step to run
+        :return: Result of step
+        """
+
+        if self.adaptive is not None:
+            return await self.adaptive.run_sync(step)
+        return await trio.to_thread.run_sync(step, limiter=self.limiter)
+
+
+StageStep = Tuple[Stage, Callable[[], None]]
+
+
+class StagedTask(ProgressTask):
+    """Task that runs as a sequence of stages
+
+    Each step runs in a worker thread while holding a slot of its stage, so tasks in different stages
+    run concurrently, e.g. local steps of one task overlap with network steps of others.
+    A task only moves to its next step once the previous step succeeded
+    """
+
+    def stages(self) -> Iterator[StageStep]:
+        """Steps of task, evaluated lazily so later steps can depend on the results of earlier ones"""
+
+        raise NotImplementedError
+
+    def run(self) -> None:
+        for stage, step in self.stages():
+            if stage.retry is None:
+                step()
+            else:
+                stage.retry.call(step, on_retry=self.on_retry)
+
+    async def run_async(self) -> None:
+        for stage, step in self.stages():
+            step = partial(self._run_time_limited_step, stage, step)
+            if stage.retry is None:
+                await stage.run(step)
+            else:
+                await stage.retry.call_async(partial(stage.run, step), on_retry=self.on_retry)
+
+    def _run_time_limited_step(self, stage: Stage, step: Callable[[], Any]) -> Any:
+        # Limits start once the step holds a slot of its stage, so time spent waiting for a slot doesn't count
+        with self.time_limited(stage.time_limits):
+            return step()
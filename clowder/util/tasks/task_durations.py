@@ -0,0 +1,122 @@
+"""task durations
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import heapq
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, Optional
+
+CACHE_VERSION: int = 1
+
+DURATION_WEIGHT: float = 0.5
+"""Weight of the latest duration in the smoothed duration of a task, the rest is from earlier runs"""
+
+
+class TaskDurations:
+    """Durations of tasks in earlier runs, by operation and task name
+
+    Used to start the longest tasks first, so they don't finish last on their own while other slots are idle
+
+    :ivar Optional[Path] file: Cache file, or None to not persist durations
+    """
+
+    def __init__(self):
+        self.file: Optional[Path] = None
+        self._lock: Lock = Lock()
+        self._durations: Dict[str, Dict[str, float]] = {}
+        self._dirty: bool = False
+
+    def configure(self, file: Optional[Path]) -> None:
+        """Set cache file and load persisted durations
+
+        :param Optional[Path] file: Cache file, or None to not persist durations
+        """
+
+        with self._lock:
+            self.file = file
+            self._durations = self._read_file(file)
+
+    def get(self, operation: str, name: str) -> Optional[float]:
+        """Smoothed duration of task in earlier runs
+
+        :param str operation: Operation the task ran, e.g. herd
+        :param str name: Task name
+        :return: Seconds the task took, None if it hasn't run before
+        """
+
+        with self._lock:
+            return self._durations.get(operation, {}).get(name, None)
+
+    def record(self, operation: str, name: str, duration: float) -> None:
+        """Record duration of successful task
+
+        :param str operation: Operation the task ran, e.g. herd
+        :param str name: Task name
+        :param float duration: Seconds the task took
+        """
+
+        with self._lock:
+            durations = self._durations.setdefault(operation, {})
+            previous = durations.get(name, None)
+            if previous is not None:
+                duration = DURATION_WEIGHT * duration + (1 - DURATION_WEIGHT) * previous
+            durations[name] = round(duration, 3)
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write durations to cache file, if they changed"""
+
+        with self._lock:
+            if self.file is None or not self._dirty:
+                return
+            contents = {
+                'version': CACHE_VERSION,
+                'operations': self._durations
+            }
+            self._dirty = False
+            file = self.file
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = file.with_name(f'{file.name}.{os.getpid()}.tmp')
+            temp_file.write_text(json.dumps(contents, indent=2, sort_keys=True))
+            os.replace(temp_file, file)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _read_file(file: Optional[Path]) -> Dict[str, Dict[str, float]]:
+        if file is None:
+            return {}
+        try:
+            contents = json.loads(file.read_text())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(contents, dict) or contents.get('version', None) != CACHE_VERSION:
+            return {}
+        try:
+            return {operation: {name: float(duration) for name, duration in durations.items()}
+                    for operation, durations in contents.get('operations', {}).items()}
+        except (TypeError, ValueError, AttributeError):
+            return {}
+
+
+def predict_makespan(durations: Iterable[float], jobs: int) -> float:
+    """Predict wall time of running tasks in the given order, each starting on the first free slot
+
+    :param Iterable[float] durations: Durations of tasks in the order they start
+    :param int jobs: Number of tasks running at the same time
+    :return: Seconds until the last task finishes
+    """
+
+    slots = [0.0] * max(jobs, 1)
+    for duration in durations:
+        heapq.heapreplace(slots, slots[0] + duration)
+    return max(slots)
+
+
+TASK_DURATIONS: TaskDurations = TaskDurations()
@@ -4,19 +4,36 @@
 
 """
 
+import math
+import time
+from contextlib import asynccontextmanager, contextmanager
 from threading import Lock
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import trio
 
 from clowder.util.console import disable_output
+from clowder.util.process_watch import ProcessWatch, TimeLimitExceededError, TimeLimits, watching
+from clowder.util.retry import RetryPolicy
 from clowder.util.util import values_sorted_by_key
 
+from .adaptive_limiter import AdaptiveLimiter
+from .task_durations import predict_makespan, TASK_DURATIONS
+from .task_result import TaskResult, TasksFailedError
+
+WATCHDOG_INTERVAL: float = 0.5
+"""Seconds between checks of the time limits of running tasks"""
+
 
 class Task:
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, retry: Optional[RetryPolicy] = None, display_name: Optional[str] = None,
+                 time_limits: Optional[TimeLimits] = None):
         self.name: str = name
+        self.display_name: str = name if display_name is None else display_name
+        self.retry: Optional[RetryPolicy] = retry
+        self.time_limits: Optional[TimeLimits] = time_limits
+        self.predicted_duration: Optional[float] = None
         self._pool: Optional[TaskPool] = None
 
     def __enter__(self):
@@ -40,17 +57,91 @@ class Task:
     def after_task(self) -> None:
         pass
 
+    def on_retry(self, attempt: int, error: Exception, delay: float) -> None:
+        """Called before waiting to retry a failed attempt
+
+        :param int attempt: Number of the failed attempt, starting at 1
+        :param Exception error: Error of the failed attempt
+        :param float delay: Seconds until the next attempt
+        """
+
+        if self._pool is not None:
+            self._pool.on_retry(self, attempt, error, delay)
+
+    @contextmanager
+    def time_limited(self, time_limits: Optional[TimeLimits]) -> Iterator[None]:
+        """Enforce time limits on commands the task runs while in context
+
+        Limits are checked by the pool, which kills the process group of a command that exceeded them
+
+        :param Optional[TimeLimits] time_limits: Limits to enforce, none if None
+        """
+
+        if time_limits is None or not time_limits.is_set or self._pool is None:
+            yield
+            return
+        watch = ProcessWatch(self.display_name, time_limits)
+        with self._pool.watch(watch), watching(watch):
+            yield
+
     def run(self) -> None:
         raise NotImplementedError
 
+    async def run_with_retry(self) -> Any:
+        """Run task from the pool's event loop, retrying with the task's retry policy"""
+
+        if self.retry is None:
+            return await self._run_time_limited()
+        return await self.retry.call_async(self._run_time_limited, on_retry=self.on_retry)
+
+    async def run_async(self) -> Any:
+        """Run task from the pool's event loop
+
+        Tasks that await subprocesses directly, e.g. with :func:`clowder.util.command.run_async`, override this
+        so they don't occupy a worker thread. By default the synchronous :meth:`run` is called in a worker thread
+        """
+
+        return await trio.to_thread.run_sync(self.run)
+
+    async def _run_time_limited(self) -> Any:
+        with self.time_limited(self.time_limits):
+            return await self.run_async()
+
 
 class TaskPool:
+    """Runs tasks concurrently
+
+    By default the first failed task cancels the others. With keep_going, the remaining tasks run to completion
+    and failures are collected in task_results instead. Tasks that exceeded their time limits are always collected
+    in task_results, so a hung task doesn't take down the others. Results can be streamed in task order with
+    :meth:`stream`
+
+    Pools for an operation record how long each task took. Later runs of the operation start the tasks that took
+    longest first, tasks that haven't run before ahead of them, so long tasks don't finish last on their own
+
+    :ivar bool keep_going: Whether to keep running tasks after one fails
+    :ivar List[TaskResult] task_results: Result of each task after running, in task order
+    :ivar bool cancelled: Whether tasks were cancelled
+    :ivar int retries: Number of retried attempts
+    :ivar Optional[str] operation: Operation durations are recorded for and tasks are ordered by, e.g. herd
+    """
 
-    def __init__(self, jobs: Optional[int] = None):
-        self._jobs: Optional[int] = jobs
+    def __init__(self, jobs: Optional[Union[int, AdaptiveLimiter]] = None, keep_going: bool = False,
+                 operation: Optional[str] = None):
+        self._jobs: Optional[Union[int, AdaptiveLimiter]] = jobs
+        self.operation: Optional[str] = operation
         self._lock: Lock = Lock()
-        self._results: Optional[List[Any]] = None
+        self._results: Optional[Dict[int, Any]] = None
+        self._task_results: Dict[int, TaskResult] = {}
+        self.keep_going: bool = keep_going
+        self.task_results: List[TaskResult] = []
         self.cancelled: bool = False
+        self.retries: int = 0
+        self._stream: Optional[trio.MemorySendChannel] = None
+        self._next_index: int = 0
+        self._watches: Set[ProcessWatch] = set()
+        self._unfinished: int = 0
+        self._tasks_done: Optional[trio.Event] = None
 
     def __enter__(self):
         return self
@@ -70,23 +161,128 @@ class TaskPool:
     def after_tasks(self, tasks: List[Task]) -> None:
         pass
 
+    def on_retry(self, task: Task, attempt: int, error: Exception, delay: float) -> None:
+        with self._lock:
+            self.retries += 1
+
+    @property
+    def parallelism(self) -> Optional[int]:
+        """Number of tasks running at the same time, None if not limited by the pool"""
+
+        if isinstance(self._jobs, AdaptiveLimiter):
+            return self._jobs.jobs
+        return self._jobs
+
+    def predict_duration(self, tasks: List[Task], jobs: Optional[int] = None) -> Optional[float]:
+        """Predict wall time of tasks from their durations in earlier runs
+
+        :param List[Task] tasks: Tasks in the order they start
+        :param Optional[int] jobs: Number of tasks running at the same time, defaults to the pool's parallelism
+        :return: Predicted seconds, None if any task hasn't run before
+        """
+
+        durations = [t.predicted_duration for t in tasks]
+        if not durations or any([d is None for d in durations]):
+            return None
+        jobs = self.parallelism if jobs is None else jobs
+        return predict_makespan(durations, len(durations) if jobs is None else jobs)
+
+    @property
+    def timed_out(self) -> bool:
+        """Whether any task was stopped for exceeding its time limits"""
+
+        return any([isinstance(r.error, TimeLimitExceededError) for r in self.task_results])
+
+    @contextmanager
+    def watch(self, watch: ProcessWatch) -> Iterator[ProcessWatch]:
+        """Check time limits of watch while in context
+
+        :param ProcessWatch watch: Watch of running task step
+        """
+
+        with self._lock:
+            self._watches.add(watch)
+        try:
+            yield watch
+        finally:
+            with self._lock:
+                self._watches.discard(watch)
+
     @disable_output
     def run(self, tasks: List[Task]) -> List[Any]:
         return trio.run(self._run, tasks)
 
+    @disable_output
+    def run_streaming(self, tasks: List[Task], on_result: Callable[[Any], None]) -> None:
+        """Run tasks, handling results in task order as soon as a task and all tasks before it are done
+
+        :param List[Task] tasks: Tasks to run
+        :param Callable[[Any], None] on_result: Called with the result of each task
+        """
+
+        async def _run_streaming() -> None:
+            async with self.stream(tasks) as results:
+                async for result in results:
+                    on_result(result)
+
+        trio.run(_run_streaming)
+
+    @asynccontextmanager
+    async def stream(self, tasks: List[Task]) -> AsyncIterator[trio.MemoryReceiveChannel]:
+        """Run tasks from a trio event loop, streaming results
+
+        The yielded channel is an async iterator over task results in task order. A result is sent as soon as its
+        task and all tasks before it are done, so slow tasks only hold back the results after them
+
+        :param List[Task] tasks: Tasks to run
+        :return: Channel to receive results from
+        """
+
+        send_channel, receive_channel = trio.open_memory_channel(math.inf)
+
+        async def _run_tasks() -> None:
+            async with send_channel:
+                self._stream = send_channel
+                try:
+                    await self._run(tasks)
+                finally:
+                    self._stream = None
+
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(_run_tasks)
+            async with receive_channel:
+                yield receive_channel
+
+    def check_results(self) -> None:
+        """Raise if any task failed while keeping going
+
+        :raise TasksFailedError:
+        """
+
+        if any([not r.succeeded for r in self.task_results]):
+            raise TasksFailedError(self.task_results)
+
     async def _run(self, tasks: List[Task]) -> List[Any]:
         try:
             async with trio.open_nursery() as nursery:
-                limit = None if self._jobs is None else trio.CapacityLimiter(self._jobs)
+                if self._jobs is None or isinstance(self._jobs, AdaptiveLimiter):
+                    limit = self._jobs
+                else:
+                    limit = trio.CapacityLimiter(self._jobs)
+                scheduled = self._schedule(tasks)
                 self.before_tasks(tasks)
                 self._results = {}
-                index = 0
+                self._task_results = {}
+                self._next_index = 0
+                self._unfinished = len(tasks)
+                self._tasks_done = trio.Event()
+                nursery.start_soon(self._watchdog)
                 try:
-                    for task in tasks:
+                    for index, task in scheduled:
                         if limit is not None:
                             await limit.acquire_on_behalf_of(task.name)
-                        nursery.start_soon(self._run_task, index, task, limit, nursery)
-                        index += 1
+                        # Wait for the task to start, so tasks queue for stage slots in scheduled order
+                        await nursery.start(self._run_task, index, task, limit, nursery)
                 except BaseException:
                     nursery.cancel_scope.cancel()
                     self.cancelled = True
@@ -96,23 +292,81 @@ class TaskPool:
             self.cancelled = True
             raise
         finally:
+            self.task_results = values_sorted_by_key(self._task_results)
             self.after_tasks(tasks)
 
-    async def _run_task(self, index: int, task: Task, limit: Optional[trio.CapacityLimiter],
-                        nursery: trio.Nursery) -> Any:
+    async def _run_task(self, index: int, task: Task, limit: Optional[Union[trio.CapacityLimiter, AdaptiveLimiter]],
+                        nursery: trio.Nursery, task_status=trio.TASK_STATUS_IGNORED) -> Any:
+        task_status.started()
         with task.in_pool(self):
+            failed = True
+            start = time.monotonic()
             try:
                 self.before_task(task)
                 task.before_task()
-                result = await trio.to_thread.run_sync(task.run)
+                result = await task.run_with_retry()
+                duration = time.monotonic() - start
                 with self._lock:
                     self._results[index] = result
+                    self._task_results[index] = TaskResult(task.display_name, duration, value=result)
+                if self.operation is not None:
+                    TASK_DURATIONS.record(self.operation, task.display_name, duration)
+                failed = False
+                self._send_results()
+            except Exception as err:
+                if not self.keep_going and not isinstance(err, TimeLimitExceededError):
+                    self.cancelled = True
+                    nursery.cancel_scope.cancel()
+                    raise
+                with self._lock:
+                    self._results[index] = None
+                    self._task_results[index] = TaskResult(task.display_name, time.monotonic() - start, error=err)
+                self._send_results()
             except BaseException:
                 self.cancelled = True
                 nursery.cancel_scope.cancel()
                 raise
             finally:
+                self._unfinished -= 1
+                if self._unfinished == 0:
+                    self._tasks_done.set()
                 task.after_task()
                 self.after_task(task)
-                if limit is not None:
+                if isinstance(limit, AdaptiveLimiter):
+                    limit.release_on_behalf_of(task.name, failed=failed)
+                elif limit is not None:
                     limit.release_on_behalf_of(task.name)
+
+    def _schedule(self, tasks: List[Task]) -> List[Tuple[int, Task]]:
+        # Longest processing time first, with tasks that haven't run before first since their duration is unknown
+        scheduled = list(enumerate(tasks))
+        if self.operation is None:
+            return scheduled
+        for task in tasks:
+            task.predicted_duration = TASK_DURATIONS.get(self.operation, task.display_name)
+        return sorted(scheduled, key=lambda t: -math.inf if t[1].predicted_duration is None
+                      else -t[1].predicted_duration)
+
+    async def _watchdog(self) -> None:
+        while self._unfinished > 0:
+            with trio.move_on_after(WATCHDOG_INTERVAL):
+                await self._tasks_done.wait()
+            now = time.monotonic()
+            with self._lock:
+                watches = list(self._watches)
+            for watch in watches:
+                watch.check(now)
+
+    def _send_results(self) -> None:
+        # Runs in the event loop without awaiting, so results are sent in order without interleaving
+        if self._stream is None:
+            return
+        with self._lock:
+            while self._next_index in self._results:
+                try:
+                    self._stream.send_nowait(self._results[self._next_index])
+                except trio.BrokenResourceError:
+                    # Receiver stopped iterating early, the remaining tasks still run to completion
+                    self._stream = None
+                    return
+                self._next_index += 1
@@ -0,0 +1,70 @@
+"""task result
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+from typing import Any, List, Optional
+
+from clowder.util.console import CONSOLE
+from clowder.util.format import Format
+
+
+class TaskResult:
+    """Outcome of a task run by a pool
+
+    :ivar str name: Task display name
+    :ivar float duration: Seconds the task ran for, including retries
+    :ivar Optional[Exception] error: Error raised by the task, None if it succeeded
+    :ivar Any value: Value returned by the task
+    """
+
+    def __init__(self, name: str, duration: float, error: Optional[Exception] = None, value: Any = None):
+        self.name: str = name
+        self.duration: float = duration
+        self.error: Optional[Exception] = error
+        self.value: Any = value
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    @property
+    def message(self) -> str:
+        """First line of error, or empty string if task succeeded"""
+
+        if self.error is None:
+            return ''
+        lines = str(self.error).strip().splitlines()
+        return lines[0] if lines else type(self.error).__name__
+
+
+class TasksFailedError(Exception):
+    """Raised after a pool that keeps going finished with failed tasks
+
+    :ivar List[TaskResult] results: Results of all tasks
+    """
+
+    def __init__(self, results: List[TaskResult]):
+        self.results: List[TaskResult] = results
+        failed = len([r for r in results if not r.succeeded])
+        super().__init__(f'{failed} of {len(results)} tasks failed')
+
+
+def print_task_results(results: List[TaskResult]) -> None:
+    """Print table of task results
+
+    :param List[TaskResult] results: Results to print
+    """
+
+    if not results:
+        return
+    name_width = max([len(r.name) for r in results] + [len('project')])
+    CONSOLE.stdout(f'\n{"project":<{name_width}}  {"result":<6}  {"time":>8}  error', force=True)
+    for result in results:
+        outcome = Format.green(f'{"ok":<6}') if result.succeeded else Format.red(f'{"failed":<6}')
+        CONSOLE.stdout(f'{Format.escape(result.name):<{name_width}}  {outcome}  {result.duration:>7.2f}s  '
+                       f'{Format.escape(result.message)}', force=True)
+    failed = len([r for r in results if not r.succeeded])
+    summary = f'{len(results) - failed} succeeded, {failed} failed'
+    CONSOLE.stdout(f'\n{Format.red(summary) if failed else Format.green(summary)}', force=True)
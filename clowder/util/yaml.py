@@ -4,15 +4,24 @@
 
 """
 
+import json
 from pathlib import Path
-from typing import Optional
+from threading import Lock
+from typing import Any, Dict, Optional, Union
 
 import jsonschema
 import yaml as pyyaml
 
+# libyaml bindings parse and emit several times faster than the pure python implementation
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
 import clowder.util.filesystem as fs
 from clowder.util.console import CONSOLE
 from clowder.util.format import Format
+from clowder.util.yaml_cache import ValidatedYamlCache
 
 from clowder.environment import ENVIRONMENT
 from clowder.util.error import ExistingFileError, MissingSourceError
@@ -77,6 +86,28 @@ def print_clowder_yaml() -> None:
 YAML: str = '.yaml'
 YML: str = '.yml'
 
+_validators: Dict[Union[str, bytes], Any] = {}
+_validators_lock: Lock = Lock()
+
+
+def schema_validator(schema: Union[str, bytes]) -> Any:
+    """Validator for json schema, checked and compiled on first use and shared after that
+
+    :param Union[str, bytes] schema: Json schema
+    :return: jsonschema validator instance
+    :raise SchemaError:
+    """
+
+    with _validators_lock:
+        validator = _validators.get(schema, None)
+        if validator is None:
+            parsed_schema = json.loads(schema)
+            validator_class = jsonschema.validators.validator_for(parsed_schema)
+            validator_class.check_schema(parsed_schema)
+            validator = validator_class(parsed_schema)
+            _validators[schema] = validator
+        return validator
+
 
 class InvalidYamlError(Exception):
     pass
@@ -147,15 +178,7 @@ class Yaml:
         :raise InvalidYamlError:
         """
 
-        try:
-            with self.path.open() as raw_file:
-                parsed_yaml = pyyaml.safe_load(raw_file)
-                if parsed_yaml is None:
-                    raise InvalidYamlError(f"No entries in {Format.path(self.path, relative_to=relative_to)}")
-                return parsed_yaml
-        except pyyaml.YAMLError:
-            # LOG.error(f"Failed to open file '{yaml_file}'")
-            raise
+        return self._parse(self.path.read_text(), relative_to=relative_to)
 
     def save(self, contents: dict) -> None:
         """Save yaml file to disk
@@ -170,28 +193,44 @@ class Yaml:
         CONSOLE.stdout(f" - Save yaml to file at {Format.path(self.path)}")
         try:
             with self.path.open(mode="w") as raw_file:
-                pyyaml.safe_dump(contents, raw_file, default_flow_style=False, indent=2, sort_keys=False)
+                pyyaml.dump(contents, raw_file, Dumper=SafeDumper, default_flow_style=False, indent=2,
+                            sort_keys=False)
         except pyyaml.YAMLError:
             # LOG.error(f"Failed to save file {Format.path(yaml_file)}")
             raise
 
-    def validate(self, schema: Optional[str] = None, relative_to: Optional[Path] = None) -> dict:
+    def validate(self, schema: Optional[str] = None, relative_to: Optional[Path] = None,
+                 cache: Optional[Path] = None) -> dict:
         """Validate yaml file
 
         :param str schema: json schema
         :param Optional[Path] relative_to: Path to load relative to
+        :param Optional[Path] cache: File caching the last validated contents, to skip parsing and validating them
+            again while the yaml file and schema are unchanged
         :return: Parsed YAML python object
         """
 
         schema = self.schema if schema is None else schema
+        contents = self.path.read_text()
+        yaml_cache = None
+        if cache is not None:
+            yaml_cache = ValidatedYamlCache(cache)
+            key = yaml_cache.key(contents, schema)
+            parsed = yaml_cache.get(key)
+            if parsed is not None:
+                return parsed
         try:
-            schema = pyyaml.safe_load(schema)
-            parsed = self.load(relative_to=relative_to)
-            jsonschema.validate(parsed, schema)
-            return parsed
+            parsed = self._parse(contents, relative_to=relative_to)
+            # Same as jsonschema.validate, without checking and compiling the schema again
+            error = jsonschema.exceptions.best_match(schema_validator(schema).iter_errors(parsed))
+            if error is not None:
+                raise error
         except jsonschema.exceptions.ValidationError:
             # LOG.error(f'Yaml json schema validation failed {Format.invalid_yaml(file_path.name)}\n')
             raise
+        if yaml_cache is not None:
+            yaml_cache.save(key, parsed)
+        return parsed
 
     @staticmethod
     def get_string(dictionary: dict) -> str:
@@ -202,11 +241,30 @@ class Yaml:
         """
 
         try:
-            return pyyaml.safe_dump(dictionary, default_flow_style=False, indent=2, sort_keys=False).strip()
+            return pyyaml.dump(dictionary, Dumper=SafeDumper, default_flow_style=False, indent=2,
+                               sort_keys=False).strip()
         except pyyaml.YAMLError:
             # LOG.error(f"Failed to dump yaml file contents",)
             raise
 
+    def _parse(self, contents: str, relative_to: Optional[Path] = None) -> dict:
+        """Parse contents of yaml file
+
+        :param str contents: Contents of yaml file
+        :param Optional[Path] relative_to: Directory yaml file is relative to
+        :return: YAML python object
+        :raise InvalidYamlError:
+        """
+
+        try:
+            parsed_yaml = pyyaml.load(contents, Loader=SafeLoader)
+            if parsed_yaml is None:
+                raise InvalidYamlError(f"No entries in {Format.path(self.path, relative_to=relative_to)}")
+            return parsed_yaml
+        except pyyaml.YAMLError:
+            # LOG.error(f"Failed to open file '{yaml_file}'")
+            raise
+
     def update_extension(self) -> Optional[Path]:
         if self.path_with_yml_extension.exists():
             self.path = self.path_with_yml_extension
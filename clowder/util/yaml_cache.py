@@ -0,0 +1,81 @@
+"""Cache of validated yaml files
+
+.. codeauthor:: Joe DeCapo <joe@polka.cat>
+
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+CACHE_VERSION: int = 1
+
+
+class ValidatedYamlCache:
+    """Parsed contents of a yaml file that passed schema validation, keyed by hashes of the yaml and schema
+
+    Files are replaced atomically, so concurrent clowder commands only ever read a complete entry, and a stale entry
+    never matches the key of changed contents
+
+    :ivar Path file: Cache file
+    """
+
+    def __init__(self, file: Path):
+        self.file: Path = file
+
+    @staticmethod
+    def key(contents: str, schema: Union[str, bytes]) -> str:
+        """Key of yaml contents validated against schema
+
+        :param str contents: Contents of yaml file
+        :param Union[str, bytes] schema: Json schema
+        :return: Hash of cache version, schema and contents
+        """
+
+        digest = hashlib.sha256()
+        for value in (str(CACHE_VERSION), schema, contents):
+            data = value if isinstance(value, bytes) else value.encode()
+            digest.update(len(data).to_bytes(8, 'little'))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Parsed yaml saved for key
+
+        :param str key: Key of yaml contents and schema
+        :return: Parsed yaml, None if there's no entry for key
+        """
+
+        try:
+            contents = json.loads(self.file.read_text())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(contents, dict) or contents.get('key', None) != key:
+            return None
+        parsed = contents.get('yaml', None)
+        return parsed if isinstance(parsed, dict) else None
+
+    def save(self, key: str, parsed: dict) -> None:
+        """Write parsed yaml to cache file
+
+        Yaml that doesn't round trip through json, e.g. with dates or non-string keys, isn't saved
+
+        :param str key: Key of yaml contents and schema
+        :param dict parsed: Parsed yaml
+        """
+
+        try:
+            data = json.dumps({'key': key, 'yaml': parsed})
+            if json.loads(data)['yaml'] != parsed:
+                return
+        except (TypeError, ValueError):
+            return
+        try:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.file.with_name(f'{self.file.name}.{os.getpid()}.tmp')
+            temp_file.write_text(data)
+            os.replace(temp_file, self.file)
+        except OSError:
+            pass
@@ -56,6 +56,17 @@ Feature: clowder base command
         When I run 'clowder -v' and 'clowder --version'
         Then the commands succeed
 
+    Scenario Outline: version imports
+        Given test directory is empty
+        When I run 'clowder --version' with import times
+        Then the command succeeds
+        And module <module> was not imported
+
+        Examples:
+        | module        |
+        | pkg_resources |
+        | setuptools    |
+
     @fail
     Scenario: fails with unknown argument
         Given test directory is empty
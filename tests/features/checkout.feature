@@ -37,6 +37,21 @@ Feature: clowder checkout command
         | black-cats/sasha  | master       | pytest-checkout |
         | black-cats/june   | master       | pytest-checkout |
 
+    Scenario Outline: checkout default existing local branch in parallel
+        Given cats example is initialized and herded
+        And project at <directory> created local <test_branch>
+        And project at <directory> is on <start_branch>
+        When I run 'clowder checkout pytest-checkout -j 4'
+        Then the command succeeds
+        And project at <directory> is on <test_branch>
+
+        Examples:
+        | directory         | start_branch | test_branch     |
+        | mu                | knead        | pytest-checkout |
+        | duke              | purr         | pytest-checkout |
+        | black-cats/kishka | master       | pytest-checkout |
+        | black-cats/june   | master       | pytest-checkout |
+
     @subdirectory
     Scenario Outline: checkout default existing local branch from subdirectory
         Given cats example is initialized and herded
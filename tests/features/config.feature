@@ -155,3 +155,26 @@ Feature: clowder config
         | black-cats/kit    | master |
         | black-cats/sasha  | master |
         | black-cats/june   | master |
+
+    @cats
+    Scenario: config set remote-cache-ttl
+        Given cats example is initialized
+        And 'clowder config set remote-cache-ttl 60' was run
+        When I run 'clowder status' and 'clowder config clear remote-cache-ttl'
+        Then the commands succeed
+
+    @cats
+    Scenario: config set source-jobs and source-rate
+        Given cats example is initialized
+        And 'clowder config set source-jobs github 2' was run
+        And 'clowder config set source-rate github 4' was run
+        When I run 'clowder herd' and 'clowder config clear source-jobs github'
+        Then the commands succeed
+
+    @cats
+    Scenario: config set stage-timeout and stage-stall
+        Given cats example is initialized
+        And 'clowder config set stage-timeout network 600' was run
+        And 'clowder config set stage-stall network 120' was run
+        When I run 'clowder herd -j 4' and 'clowder config clear stage-timeout network'
+        Then the commands succeed
@@ -132,6 +132,14 @@ Feature: clowder forall
         And I run 'clowder forall --ignore-error "exit 1"'
         Then the commands succeed
 
+    @fail @cats
+    Scenario: forall keep going
+        Given cats example is initialized and herded
+        And forall test scripts were copied to the project directories
+        When I run 'clowder forall -k "./test_forall_env_kit.sh"'
+        And I run 'clowder forall -j 4 --keep-going "./test_forall_env_kit.sh"'
+        Then the commands fail
+
     @fail @cats
     Scenario: forall return code
         Given cats example is initialized and herded
@@ -1,8 +1,6 @@
 @herd
 Feature: clowder herd
 
-# TODO: Add parallel tests
-
     @help @cats
     Scenario: herd help in empty directory
         Given test directory is empty
@@ -29,6 +27,30 @@ Feature: clowder herd
         Then the command fails
         And test directory is empty
 
+    @cats
+    Scenario: herd with reachable git hosts
+        Given cats example is initialized
+        And local connectivity probe listener is running
+        When I run 'clowder herd'
+        Then the command succeeds
+
+    @cats @fail
+    Scenario: herd with unreachable git hosts
+        Given cats example is initialized
+        And local connectivity probe address is unreachable
+        And mu directory doesn't exist
+        When I run 'clowder herd'
+        Then the command fails
+        And mu directory doesn't exist
+
+    @cats @fail
+    Scenario: herd offline
+        Given cats example is initialized
+        And mu directory doesn't exist
+        When I run 'clowder --offline herd'
+        Then the command fails
+        And mu directory doesn't exist
+
     @cats
     Scenario Outline: herd default
         Given cats example is initialized
@@ -50,6 +72,63 @@ Feature: clowder herd
         | black-cats/sasha  | master | origin | https://github.com/JrGoodle/sasha.git  |
         | black-cats/june   | master | origin | https://github.com/JrGoodle/june.git   |
 
+    @cats
+    Scenario Outline: herd parallel
+        Given cats example is initialized
+        And <directory> doesn't exist
+        When I run 'clowder herd -j 4'
+        Then the command succeeds
+        And project at <directory> is a git repository
+        And project at <directory> has tracking <branch>
+        And project at <directory> is on <branch>
+        And project at <directory> is clean
+
+        Examples:
+        | directory         | branch |
+        | mu                | knead  |
+        | duke              | purr   |
+        | black-cats/kishka | master |
+        | black-cats/kit    | master |
+        | black-cats/sasha  | master |
+        | black-cats/june   | master |
+
+    @cats
+    Scenario Outline: herd parallel with stall limit
+        Given cats example is initialized
+        And <directory> doesn't exist
+        And 'clowder config set stage-stall network 5' was run
+        When I run 'clowder herd -j 4'
+        Then the command succeeds
+        And project at <directory> is a git repository
+        And project at <directory> has tracking <branch>
+        And project at <directory> is on <branch>
+        And project at <directory> is clean
+
+        Examples:
+        | directory         | branch |
+        | mu                | knead  |
+        | duke              | purr   |
+        | black-cats/kishka | master |
+        | black-cats/kit    | master |
+        | black-cats/sasha  | master |
+        | black-cats/june   | master |
+
+    @cats
+    Scenario Outline: herd parallel auto jobs
+        Given cats example is initialized
+        And <directory> doesn't exist
+        When I run 'clowder herd -j auto'
+        Then the command succeeds
+        And project at <directory> is a git repository
+        And project at <directory> is on <branch>
+        And project at <directory> is clean
+
+        Examples:
+        | directory         | branch |
+        | mu                | knead  |
+        | duke              | purr   |
+        | black-cats/kishka | master |
+
     @cats @subdirectory
     Scenario Outline: herd subdirectory
         Given cats example is initialized and herded
@@ -35,6 +35,13 @@ Feature: clowder status
         And project at mu has untracked file catnip.txt
 #        And TODO: check the output
 
+    Scenario: status with git profile
+        Given cats example is initialized and herded
+        When I run 'clowder --profile-git status'
+        And I run 'clowder --profile-git --profile-git-json profile.json status'
+        Then the commands succeed
+        And profile.json file exists
+
     @subdirectory
     Scenario: status subdirectory
         Given cats example is initialized and herded
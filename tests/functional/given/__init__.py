@@ -1,3 +1,4 @@
+from .connectivity import *
 from .example_cats import *
 from .file_system import *
 from .git import *
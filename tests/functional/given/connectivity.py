@@ -0,0 +1,25 @@
+"""New syntax test file"""
+
+import socket
+
+from pytest_bdd import given
+
+from clowder.util.connectivity import PROBE_ADDRESS_ENV
+
+
+@given("local connectivity probe listener is running")
+def given_connectivity_probe_listener(monkeypatch, request) -> None:
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen()
+    request.addfinalizer(listener.close)
+    _, port = listener.getsockname()
+    monkeypatch.setenv(PROBE_ADDRESS_ENV, f'127.0.0.1:{port}')
+
+
+@given("local connectivity probe address is unreachable")
+def given_connectivity_probe_unreachable(monkeypatch) -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as unused:
+        unused.bind(('127.0.0.1', 0))
+        _, port = unused.getsockname()
+    monkeypatch.setenv(PROBE_ADDRESS_ENV, f'127.0.0.1:{port}')
@@ -0,0 +1,78 @@
+"""test_git_worker"""
+
+import subprocess
+from pathlib import Path
+from threading import Thread
+from typing import List
+
+from clowder.util.git.worker import GitWorkerPool
+
+
+def _repos(tmp_path: Path, count: int) -> List[Path]:
+    repos = []
+    for i in range(count):
+        path = tmp_path / f'repo-{i}'
+        subprocess.run(['git', 'init', '-q', str(path)], check=True)
+        subprocess.run(['git', '-c', 'user.name=clowder', '-c', 'user.email=clowder@example.com',
+                        'commit', '-q', '--allow-empty', '-m', 'init'], cwd=path, check=True)
+        subprocess.run(['git', 'tag', f'v{i}'], cwd=path, check=True)
+        repos.append(path)
+    return repos
+
+
+def _sha(path: Path, rev: str) -> str:
+    return subprocess.run(['git', 'rev-parse', rev], cwd=path, check=True, stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout.strip()
+
+
+def test_running_workers_are_capped(tmp_path: Path):
+    repos = _repos(tmp_path, 5)
+    pool = GitWorkerPool(max_workers=2)
+    try:
+        for i, path in enumerate(repos):
+            assert pool.resolve(path, f'v{i}^{{commit}}') == _sha(path, f'v{i}')
+            assert pool.running <= 2
+        assert pool.processes == 5
+    finally:
+        pool.close()
+    assert pool.running == 0
+
+
+def test_recently_used_worker_is_kept(tmp_path: Path):
+    first, second, third = _repos(tmp_path, 3)
+    pool = GitWorkerPool(max_workers=2)
+    try:
+        pool.resolve(first, 'HEAD')
+        pool.resolve(second, 'HEAD')
+        pool.resolve(first, 'HEAD')
+        pool.resolve(third, 'HEAD')
+        pool.resolve(first, 'HEAD')
+        assert pool.processes == 3
+        assert pool.queries == 5
+    finally:
+        pool.close()
+
+
+def test_concurrent_lookups_with_eviction(tmp_path: Path):
+    repos = _repos(tmp_path, 4)
+    expected = {path: _sha(path, 'HEAD') for path in repos}
+    pool = GitWorkerPool(max_workers=1)
+    errors = []
+
+    def lookup(path: Path) -> None:
+        for _ in range(20):
+            try:
+                assert pool.resolve(path, 'HEAD') == expected[path]
+            except (OSError, AssertionError) as err:
+                errors.append(err)
+
+    threads = [Thread(target=lookup, args=(path,)) for path in repos]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        assert pool.running <= 1
+    finally:
+        pool.close()
@@ -0,0 +1,101 @@
+"""test_retry"""
+
+from subprocess import CalledProcessError
+
+import pytest
+
+import clowder.util.retry as retry
+from clowder.util.git.retry import is_transient_error
+from clowder.util.retry import RetryPolicy
+
+
+@pytest.mark.parametrize(["returncode", "output"], [
+    (128, "fatal: unable to access 'https://github.com/JrGoodle/cats.git/': Could not resolve host: github.com"),
+    (128, "ssh: connect to host github.com port 22: Connection timed out"),
+    (128, "fatal: the remote end hung up unexpectedly"),
+    (1, "error: RPC failed; curl 56 GnuTLS recv error (-9)"),
+    (255, "kex_exchange_identification: read: Connection reset by peer"),
+    (128, b"fatal: unable to access 'https://github.com/': The requested URL returned error: 503"),
+])
+def test_transient_error_is_retryable(returncode: int, output):
+    assert is_transient_error(CalledProcessError(returncode, ['git', 'fetch'], output=output))
+
+
+@pytest.mark.parametrize(["returncode", "output"], [
+    (128, "fatal: Authentication failed for 'https://github.com/JrGoodle/cats.git/'"),
+    (128, "fatal: repository 'https://github.com/JrGoodle/missing.git/' not found"),
+    (128, "fatal: couldn't find remote ref missing-branch"),
+    (2, "fatal: the remote end hung up unexpectedly"),
+])
+def test_permanent_error_is_not_retryable(returncode: int, output: str):
+    assert not is_transient_error(CalledProcessError(returncode, ['git', 'fetch'], output=output))
+
+
+def test_error_without_output_is_not_retryable():
+    assert not is_transient_error(CalledProcessError(128, ['git', 'fetch'], output=None, stderr=None))
+
+
+def test_error_output_read_from_stderr():
+    error = CalledProcessError(128, ['git', 'fetch'], output=None, stderr="fatal: early EOF")
+    assert is_transient_error(error)
+
+
+def test_other_exception_is_not_retryable():
+    assert not is_transient_error(OSError("Connection reset"))
+
+
+def test_retry_until_attempts_exhausted(monkeypatch):
+    delays = []
+    monkeypatch.setattr(retry.time, 'sleep', delays.append)
+    calls = []
+
+    def fail():
+        calls.append(len(calls))
+        raise CalledProcessError(128, ['git', 'fetch'], output="fatal: early EOF")
+
+    policy = RetryPolicy(attempts=3, backoff=1.0, jitter=0, retryable=is_transient_error)
+    with pytest.raises(CalledProcessError):
+        policy.call(fail)
+    assert len(calls) == 3
+    assert delays == [1.0, 2.0]
+
+
+def test_retry_succeeds_after_transient_error(monkeypatch):
+    monkeypatch.setattr(retry.time, 'sleep', lambda _: None)
+    retries = []
+    results = iter([CalledProcessError(128, ['git', 'fetch'], output="fatal: early EOF"), 'fetched'])
+
+    def fetch():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    policy = RetryPolicy(attempts=3, jitter=0, retryable=is_transient_error)
+    assert policy.call(fetch, on_retry=lambda attempt, error, delay: retries.append(attempt)) == 'fetched'
+    assert retries == [1]
+
+
+def test_non_retryable_error_is_raised_immediately(monkeypatch):
+    monkeypatch.setattr(retry.time, 'sleep', lambda _: pytest.fail('slept before re-raising'))
+    calls = []
+
+    def fail():
+        calls.append(len(calls))
+        raise CalledProcessError(128, ['git', 'fetch'], output="fatal: Authentication failed")
+
+    policy = RetryPolicy(attempts=3, retryable=is_transient_error)
+    with pytest.raises(CalledProcessError):
+        policy.call(fail)
+    assert len(calls) == 1
+
+
+def test_backoff_is_capped():
+    policy = RetryPolicy(attempts=10, backoff=1.0, max_backoff=5.0, jitter=0)
+    assert [policy.delay(attempt) for attempt in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+
+def test_jitter_shortens_delay_within_fraction():
+    policy = RetryPolicy(backoff=4.0, max_backoff=4.0, jitter=0.5)
+    for _ in range(100):
+        assert 2.0 <= policy.delay(3) <= 4.0
@@ -35,3 +35,13 @@ def then_output_file_matches_contents_of_file(shared_datadir: Path, tmp_path: Pa
     test_file = shared_datadir / "yaml" / "command_output" / test_file
     test_content = test_file.read_text()
     assert output.strip() == test_content.strip()
+
+
+@then(parsers.parse("module {module} was not imported"))
+@then("module <module> was not imported")
+def then_module_was_not_imported(command_results: CommandResults, module: str) -> None:
+    assert len(command_results.completed_processes) == 1
+    result = command_results.completed_processes[0]
+    imported = [line.split('|')[2].strip() for line in result.stdout.splitlines() if line.startswith('import time:')]
+    assert imported
+    assert module not in imported
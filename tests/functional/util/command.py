@@ -3,7 +3,7 @@
 import re
 from pathlib import Path
 from subprocess import CompletedProcess
-from typing import List
+from typing import List, Optional
 
 import clowder.util.command as cmd
 from clowder.util.console import CONSOLE
@@ -14,9 +14,9 @@ class CommandResults:
         self.completed_processes: List[CompletedProcess] = []
 
 
-def run_command(command: str, cwd: Path, check: bool = False) -> CompletedProcess:
+def run_command(command: str, cwd: Path, check: bool = False, python_options: Optional[str] = None) -> CompletedProcess:
     env = {"DEBUG": "true"}
-    processed_command = _process_clowder_commands(command)
+    processed_command = _process_clowder_commands(command, python_options=python_options)
     CONSOLE.stdout('echo $PATH')
     result = cmd.run('echo $PATH', cwd=cwd, check=check, print_output=False, print_command=True, env=env)
     CONSOLE.stdout(result.stdout.strip())
@@ -31,10 +31,11 @@ def run_command(command: str, cwd: Path, check: bool = False) -> CompletedProces
     return result
 
 
-def _process_clowder_commands(command: str) -> str:
+def _process_clowder_commands(command: str, python_options: Optional[str] = None) -> str:
 
     pattern = r'^(clowder(.+?))'
-    replace = r'python -m clowder.app '
+    options = '' if python_options is None else f'{python_options} '
+    replace = rf'python {options}-m clowder.app '
     output = re.sub(pattern, replace, command)
 
     return output
@@ -37,6 +37,14 @@ def when_run_command(tmp_path: Path, command: str, command_results: CommandResul
     command_results.completed_processes.append(result)
 
 
+@when(parsers.parse("I run '{command}' with import times"))
+def when_run_command_with_import_times(command: str, command_results: CommandResults,
+                                       scenario_info: ScenarioInfo) -> None:
+    path = scenario_info.cmd_dir
+    result = run_command(command, path, python_options='-X importtime')
+    command_results.completed_processes.append(result)
+
+
 @when(parsers.parse("I run '{command_1}' and '{command_2}'"))
 def when_run_command_and_command(command_1: str, command_2: str,
                                  command_results: CommandResults, scenario_info: ScenarioInfo) -> None: